@@ -0,0 +1,237 @@
+import os
+import queue
+import atexit
+import random
+import signal
+import asyncio
+import logging
+import threading
+import tracing
+from asyncio.subprocess import PIPE
+from executor import PluginRunner, task_key
+from metrics import ProcessTreeSampler
+from streaming import StderrTail, CHUNK_SIZE
+from utils import PluginStatus
+from events import TaskQueued
+
+log = logging.getLogger("AutoVol")
+
+KILL_GRACE = 5.0
+# stderr markers of failures that may pass on another attempt
+TRANSIENT_ERRORS = (
+    "MemoryError",
+    "Cannot allocate memory",
+    "Resource temporarily unavailable",
+    "Too many open files",
+    "ConnectionError",
+    "Connection reset",
+    "Read timed out",
+)
+
+
+def is_transient(returncode, stderr_text):
+    """Killed by a signal (e.g. the OOM killer) or failed with a known resource/network error."""
+    return returncode < 0 or any(marker in stderr_text for marker in TRANSIENT_ERRORS)
+
+
+def signal_group(proc, sig):
+    """Signals a child's whole process group (it runs in its own session)."""
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(proc.pid, sig)
+        else:
+            proc.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+class AsyncExecutor:
+    """Runs a planned executor's tasks as asyncio subprocesses with timeouts, retries and clean cancellation.
+
+    Each plugin runs in a new session, so a timeout, Ctrl-C or global deadline
+    kills its whole vol.py process group instead of leaving orphans. Keeps the
+    execute()/execute_with_status() contract of PluginExecutor.
+    """
+
+    def __init__(self, executor, plugin_timeout=None, timeout=None, retries=1, backoff=5.0):
+        self.executor = executor
+        self.args = executor.args
+        self.status_queue = executor.status_queue
+        self.pool = executor.queue
+        self.plugin_timeout = plugin_timeout
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.runner = PluginRunner(None, executor.args, None, executor.profile, executor.kdbg,
+                                   executor.capabilities, executor.history, executor.metrics_log,
+                                   executor.store, executor.manifest, executor.events)
+        self.events = executor.events
+        self.loop = None
+        self.main_task = None
+        self.thread = None
+
+    # --- one plugin ------------------------------------------------------
+
+    async def _communicate(self, proc, writer, stderr_tail):
+        async def drain_stderr():
+            while True:
+                chunk = await proc.stderr.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                stderr_tail.feed(chunk)
+
+        stderr_job = asyncio.create_task(drain_stderr())
+        try:
+            while True:
+                chunk = await proc.stdout.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                writer.write(chunk)
+            await stderr_job
+        finally:
+            stderr_job.cancel()
+        await proc.wait()
+
+    async def _terminate(self, proc):
+        signal_group(proc, signal.SIGTERM)
+        try:
+            await asyncio.wait_for(proc.wait(), KILL_GRACE)
+        except asyncio.TimeoutError:
+            signal_group(proc, signal.SIGKILL)
+            await proc.wait()
+
+    async def _run_once(self, task):
+        """Runs one attempt; returns (PluginStatus, retryable)."""
+        prepared = self.runner.prepare(task)
+        if prepared is None:
+            return PluginStatus(task.plugin, "error", 1.0, 0.0, 0.0, image=task.image_id), False
+        cmd, out_file = prepared
+
+        log.info(f"🔹 Running plugin: {task.plugin} with command {cmd}")
+        self.runner.started(task)
+        proc = await asyncio.create_subprocess_exec(*cmd, stdout=PIPE, stderr=PIPE, start_new_session=True)
+        sampler = ProcessTreeSampler(proc.pid)
+        sampler.start()
+        stderr_tail = StderrTail(None, on_progress=self.runner.progress_reporter(task))
+        timed_out = False
+        try:
+            with self.runner.open_writer(out_file) as writer:
+                await asyncio.wait_for(self._communicate(proc, writer, stderr_tail), self.plugin_timeout)
+        except asyncio.TimeoutError:
+            timed_out = True
+            log.error(f"⏰ {task.plugin} exceeded {self.plugin_timeout:.0f}s; killing its process group")
+            await self._terminate(proc)
+        except asyncio.CancelledError:
+            signal_group(proc, signal.SIGKILL)
+            await proc.wait()
+            sampler.stop()
+            log.warning(f"🛑 Cancelled {task.plugin}")
+            self.runner.publish(PluginStatus(task.plugin, "cancelled", 0.0, 0.0, 0.0, image=task.image_id))
+            raise
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, sampler.stop)
+        stderr_tail.close()
+
+        metrics = sampler.result(task.plugin, proc.returncode, None)
+        # Ingest and conversion of a large output must not stall the other plugins' pipes
+        status = await loop.run_in_executor(None, self.runner.finish, task, out_file, metrics, writer,
+                                            stderr_tail.text())
+        if timed_out:
+            status.status = "timeout"
+            return status, False
+        return status, status.status == "error" and is_transient(proc.returncode, stderr_tail.text())
+
+    async def _run_task(self, task):
+        # Coroutines interleave on one thread, so tasks are async spans rather than nested ones
+        tracing.begin_async("task", task_key(task))
+        for attempt in range(self.retries + 1):
+            status, retryable = await self._run_once(task)
+            if not retryable or attempt == self.retries:
+                tracing.end_async("task", task_key(task), plugin=task.plugin, attempts=attempt + 1)
+                return self.runner.publish(status)
+            delay = self.backoff * 2 ** attempt * random.uniform(0.8, 1.2)
+            log.warning(f"🔁 {task.plugin} failed transiently; retry {attempt + 1}/{self.retries} in {delay:.0f}s")
+            await asyncio.sleep(delay)
+
+    # --- worker pool ---------------------------------------------------
+
+    async def _worker(self, slot, freed):
+        while True:
+            try:
+                task = self.pool.get(block=False, owner=slot)
+            except queue.Empty:
+                # Nothing fits the memory budget yet; wait for a task to finish
+                freed.clear()
+                try:
+                    await asyncio.wait_for(freed.wait(), self.pool.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                if task is None:
+                    return
+                tracing.end_async("queue wait", task_key(task), plugin=task.plugin)
+                await self._run_task(task)
+            except Exception as e:
+                log.exception(f"❌ Exception in {task.plugin}: {e}")
+            finally:
+                self.pool.task_done(owner=slot)
+                freed.set()
+
+    def _cancel_pending(self):
+        """Reports tasks that never started after a global timeout or interrupt."""
+        while True:
+            try:
+                task = self.pool.get(block=False, owner="cancel")
+            except queue.Empty:
+                return
+            self.pool.task_done(owner="cancel")
+            if task is not None:
+                self.runner.publish(PluginStatus(task.plugin, "cancelled", 0.0, 0.0, 0.0, image=task.image_id))
+
+    async def _main(self):
+        self.loop = asyncio.get_running_loop()
+        self.main_task = asyncio.current_task()
+        workers = max(1, self.args.threads)
+        for task in self.executor.tasks:
+            tracing.begin_async("queue wait", task_key(task))
+            self.pool.put(task)
+            self.events.emit(TaskQueued(task.plugin, task.image_id))
+        for _ in range(workers):
+            self.pool.put(None)
+
+        freed = asyncio.Event()
+        jobs = [asyncio.create_task(self._worker(slot, freed)) for slot in range(workers)]
+        try:
+            await asyncio.wait_for(asyncio.gather(*jobs), self.timeout)
+        except asyncio.TimeoutError:
+            log.error(f"⏰ Global timeout of {self.timeout:.0f}s reached; cancelled the remaining plugins")
+        finally:
+            for job in jobs:
+                job.cancel()
+            await asyncio.gather(*jobs, return_exceptions=True)
+            self._cancel_pending()
+
+    # --- executor contract ---------------------------------------------
+
+    def execute(self):
+        try:
+            asyncio.run(self._main())
+        except KeyboardInterrupt:
+            log.warning("🛑 Interrupted; running plugins were killed")
+            raise
+        log.info("✅ All plugins completed.")
+
+    def execute_with_status(self):
+        self.runner.status_queue = self.status_queue
+        self.thread = threading.Thread(target=asyncio.run, args=(self._main(),), daemon=True)
+        self.thread.start()
+        atexit.register(self.shutdown)
+        return self.status_queue
+
+    def shutdown(self):
+        """Cancels a background run from another thread and waits for its plugins to be killed."""
+        if self.loop and self.main_task and not self.main_task.done():
+            self.loop.call_soon_threadsafe(self.main_task.cancel)
+        if self.thread:
+            self.thread.join(timeout=KILL_GRACE * 2)
@@ -8,8 +8,23 @@ from pyfiglet import Figlet
 import logging
 import platform
 import os
+import csv
+from rich.table import Table
 from executor import PluginExecutor
+from batch import BatchExecutor
+from async_executor import AsyncExecutor
+from cluster import Coordinator, parse_address, run_worker
+from store import ResultStore, STORE_FILE
 from dashboard import run_dashboard
+from progress import ProgressDisplay
+from streaming import HAS_ZSTD, CHUNK_SIZE, open_output, strip_compression
+from convert import safe_convert
+from report import build_report, CHUNK_ROWS
+from symbols import download_symbols, SYMBOL_BASE_URL, SYMBOL_PACKS
+from isfstore import ISFStore
+from monitoring import serve_metrics
+from scanner import HAS_YARA
+import tracing
 
 console = Console()
 log = logging.getLogger("AutoVol")
@@ -23,31 +38,245 @@ def show_banner():
     banner = Figlet(font="slant")
     console.print(banner.renderText("AutoVol"), style="bold green")
 
+def parse_size_mb(value):
+    """Parses sizes like 48G, 2048M or a plain number of MB."""
+    units = {"k": 1 / 1024, "m": 1, "g": 1024, "t": 1024 * 1024}
+    value = value.strip().lower().rstrip("b")
+    try:
+        if value and value[-1] in units:
+            return float(value[:-1]) * units[value[-1]]
+        return float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {value}")
+
 def parse_args():
     parser = argparse.ArgumentParser(description="🎯 AutoVol - Concurrent Memory Forensics Automation")
-    parser.add_argument("-f", "--file", required=True, help="Path to memory dump file")
-    parser.add_argument("-d", "--directory", required=True, help="Output directory")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("-f", "--file", help="Path to memory dump file")
+    source.add_argument("-b", "--batch", help="Directory of memory dumps, or a manifest listing one '<path> [os]' per line")
+    source.add_argument("--worker", metavar="URL",
+                        help="Join a coordinator (e.g. http://host:8765) and run the tasks it hands out")
+    parser.add_argument("-d", "--directory",
+                        help="Output directory (for a worker: the shared output directory, if any)")
     parser.add_argument("-p", "--profile", help="Volatility profile (auto-detected if omitted)")
     parser.add_argument("-c", "--console", help="Comma-separated plugin list to execute")
     # parser.add_argument("-a", "--all", action="store_true", help="Run all known plugins")
     parser.add_argument('-e', '--volatility-path', default='/opt/volatility3/vol.py', help="Path to vol.py")
     parser.add_argument("-t", "--threads", type=int, default=4, help="Number of threads")
+    parser.add_argument("--memory-budget", type=parse_size_mb,
+                        help="Only start a plugin when its expected peak memory fits this budget (e.g. 48G)")
     parser.add_argument("--format", choices=["txt", "json", "html"], default="txt", help="Output format")
+    parser.add_argument("--compress", choices=["none", "gzip", "zstd"], default="none",
+                        help="Compress plugin output as it streams to disk (<plugin>.<ext>.gz / .zst)")
+    parser.add_argument("--compress-level", type=int,
+                        help="Compression level (gzip 1-9, default 6; zstd 1-22, default 3)")
+    parser.add_argument("--ndjson", action="store_true",
+                        help="Also write each JSON output as flattened rows in <plugin>.ndjson")
+    parser.add_argument("--columnar", action="store_true",
+                        help="Also write typed per-column files in <plugin>.columns/ (implies --ndjson)")
+    parser.add_argument("--engine", choices=["subprocess", "async", "inprocess", "forkserver"], default="subprocess",
+                        help="Run each plugin as a vol.py process (threads or asyncio), in-process against one "
+                             "shared Volatility context, or as a fork of a warm server that imported Volatility once")
+    parser.add_argument("--plugin-timeout", type=float, metavar="SECONDS",
+                        help="Kill a plugin's process group after this long (async engine)")
+    parser.add_argument("--timeout", type=float, metavar="SECONDS",
+                        help="Cancel everything still running after this long (async engine)")
+    parser.add_argument("--retries", type=int, default=1,
+                        help="Retries for transient failures such as OOM kills, with exponential backoff (async engine)")
+    parser.add_argument("--no-config-handoff", dest="config_handoff", action="store_false",
+                        help="Skip the kernel config pre-flight and let every plugin rescan for the kernel")
+    parser.add_argument("--coordinator", metavar="[HOST:]PORT",
+                        help="Serve the planned tasks to remote --worker processes instead of running them locally")
+    parser.add_argument("--force", action="store_true",
+                        help="Rerun every task, even those the run manifest records as complete")
+    parser.add_argument("--no-store", dest="store", action="store_false",
+                        help="Don't ingest JSON results into the SQLite store (autovol.db)")
+    parser.add_argument("--report", action="store_true",
+                        help="Build a paginated HTML case report in <dir>/report/ from the JSON outputs after the run")
+    parser.add_argument("--metrics-port", metavar="[HOST:]PORT",
+                        help="Serve live Prometheus metrics on http://HOST:PORT/metrics during the run "
+                             "(default host 127.0.0.1)")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="Record a Chrome trace-event timeline of the run (chrome://tracing, ui.perfetto.dev) "
+                             "and print time per phase")
+    parser.add_argument("--yara-rules", action="append", metavar="FILE",
+                        help="YARA rules to sweep the raw image with (repeatable); also passed to VadYaraScan/VmaYaraScan")
+    parser.add_argument("--scan-pattern", action="append", metavar="REGEX",
+                        help="Regex to sweep the raw image for (repeatable; @FILE reads one per line)")
+    parser.add_argument("--scan-shard-size", type=parse_size_mb, metavar="SIZE",
+                        help="Bytes of the image per scan task, e.g. 64M (default 64M)")
+    parser.add_argument("--scan-overlap", type=parse_size_mb, metavar="SIZE",
+                        help="How far a scan shard reads into the next, i.e. the longest hit kept whole (default 64K)")
+    parser.add_argument("--scan-workers", type=int, metavar="N",
+                        help="Scan processes (default: one per CPU)")
+    parser.add_argument("--no-scan-mapping", action="store_true",
+                        help="Keep scan hits as file offsets; skip the Volatility pass mapping them to processes")
     parser.add_argument("--tui", action="store_true", help="Launch Textual UI dashboard")
     parser.add_argument('--download-symbols', action='store_true', help="Download Volatility 3 Windows symbol packs if not present")
-    return parser.parse_args()
+    parser.add_argument("--isf-store", metavar="DIR",
+                        help="Directory of compressed symbol packs (see 'autovol.py symbols --keep-compressed'); "
+                             "only the ISFs matching the image are unpacked into <dir>/symbols")
+    parser.add_argument("--decompress-symbols", action="store_true",
+                        help="Write the per-case ISFs as plain .json so Volatility skips lzma on every load")
+    parser.add_argument("--symbols-url", help="Symbol pack mirror for --download-symbols (default: $AUTOVOL_SYMBOLS_URL "
+                                              "or the Volatility Foundation server)")
+    args = parser.parse_args()
+    if not args.worker and not args.directory:
+        parser.error("the following arguments are required: -d/--directory")
+    if args.columnar:
+        args.ndjson = True
+    if (args.ndjson or args.columnar) and args.format != "json":
+        parser.error("--ndjson/--columnar need --format json")
+    if args.compress == "zstd" and not HAS_ZSTD:
+        parser.error("--compress zstd needs the 'zstandard' package (pip install zstandard)")
+    if args.yara_rules and not HAS_YARA:
+        parser.error("--yara-rules needs the 'yara-python' package (pip install yara-python)")
+    return args
+
+def query_main(argv):
+    """autovol.py query <db> [sql]: runs SQL against the result store."""
+    parser = argparse.ArgumentParser(prog="autovol.py query", description="🗄️ Query the AutoVol result store")
+    parser.add_argument("db", help=f"Path to {STORE_FILE}, or the output directory containing it")
+    parser.add_argument("sql", nargs="?", help="SQL to run; omit to list the ingested plugins")
+    parser.add_argument("--csv", action="store_true", help="Write CSV to stdout instead of a table")
+    args = parser.parse_args(argv)
+
+    path = os.path.join(args.db, STORE_FILE) if os.path.isdir(args.db) else args.db
+    if not os.path.exists(path):
+        parser.error(f"no result store at {path}")
+    store = ResultStore(path)
+    columns, rows = store.query(args.sql) if args.sql else store.tables()
+    store.close()
+
+    if args.csv:
+        writer = csv.writer(sys.stdout)
+        writer.writerow(columns)
+        writer.writerows(rows)
+        return
+    table = Table(*columns)
+    for row in rows:
+        table.add_row(*("" if v is None else str(v) for v in row))
+    console.print(table)
+    console.print(f"{len(rows)} row(s)", style="dim")
+
+def cat_main(argv):
+    """autovol.py cat <file>...: writes plugin outputs to stdout, decompressing on the fly."""
+    parser = argparse.ArgumentParser(prog="autovol.py cat", description="📄 Print (compressed) plugin output")
+    parser.add_argument("files", nargs="+", help="Plugin output files (.gz and .zst are decompressed)")
+    args = parser.parse_args(argv)
+
+    out = sys.stdout.buffer
+    try:
+        for path in args.files:
+            with open_output(path, "rb") as f:
+                while True:
+                    chunk = f.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    out.write(chunk)
+        out.flush()
+    except BrokenPipeError:
+        # e.g. piped into head; keep Python from complaining on exit
+        sys.stderr.close()
+
+def convert_main(argv):
+    """autovol.py convert <file>...: flattens existing JSON outputs into NDJSON (and columns)."""
+    parser = argparse.ArgumentParser(prog="autovol.py convert", description="🧾 Convert plugin JSON output")
+    parser.add_argument("files", nargs="+", help="Plugin JSON outputs (.json, .json.gz, .json.zst)")
+    parser.add_argument("--columnar", action="store_true", help="Also write typed per-column files")
+    parser.add_argument("--compress-level", type=int, help="Compression level for compressed outputs")
+    args = parser.parse_args(argv)
+
+    for path in args.files:
+        if not strip_compression(path).endswith(".json"):
+            parser.error(f"not a JSON output: {path}")
+        safe_convert(path, args.columnar, args.compress_level)
+
+def report_main(argv):
+    """autovol.py report <dir>: builds the HTML case report from an existing run."""
+    parser = argparse.ArgumentParser(prog="autovol.py report", description="📑 Build the AutoVol case report")
+    parser.add_argument("directory", help="Case output directory")
+    parser.add_argument("-o", "--output", help="Report directory (default: <dir>/report)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="Rows per page and data chunk")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"no such directory: {args.directory}")
+    console.print(f"📑 Report: {build_report(args.directory, args.output, args.chunk_rows)}")
+
+def symbols_main(argv):
+    """autovol.py symbols: downloads and extracts the Volatility 3 symbol packs."""
+    parser = argparse.ArgumentParser(prog="autovol.py symbols", description="📥 Download Volatility 3 symbol packs")
+    parser.add_argument("-o", "--output", default="/opt/volatility3/symbols", help="Symbols directory")
+    parser.add_argument("--url", default=os.environ.get("AUTOVOL_SYMBOLS_URL", SYMBOL_BASE_URL),
+                        help="Base URL holding windows.zip, mac.zip and linux.zip")
+    parser.add_argument("--packs", default=",".join(SYMBOL_PACKS), help="Comma-separated packs to fetch")
+    parser.add_argument("--connections", type=int, default=8, help="Parallel HTTP connections across all packs")
+    parser.add_argument("--force", action="store_true", help="Download even if the pack is already extracted")
+    parser.add_argument("--keep-compressed", action="store_true",
+                        help="Keep the verified zips and index them for --isf-store instead of extracting")
+    args = parser.parse_args(argv)
+
+    results = download_symbols(args.output, args.url, [p.strip() for p in args.packs.split(",") if p.strip()],
+                               args.connections, force=args.force, extract=not args.keep_compressed)
+    if args.keep_compressed:
+        console.print(f"🗃️ {len(ISFStore(args.output))} symbol tables indexed; use --isf-store {args.output}")
+    failed = [pack for pack, result in results.items() if result not in ("installed", "skipped")]
+    if failed:
+        sys.exit(f"❌ Failed to download: {', '.join(failed)} (rerun to resume)")
+
+SUBCOMMANDS = {"query": query_main, "cat": cat_main, "convert": convert_main, "report": report_main,
+               "symbols": symbols_main}
+
+def show_trace_summary(tracer):
+    """Prints --trace's per-phase totals; worker phases overlap, so they can add up to more than the wall time."""
+    if tracer is None:
+        return
+    table = Table("Phase", "Count", "Total (s)", "Mean (ms)", "Max (ms)", title="⏱️ Time per phase")
+    for phase, count, total, average, peak in tracer.summary():
+        table.add_row(phase, str(count), f"{total:.2f}", f"{average * 1000:.1f}", f"{peak * 1000:.1f}")
+    console.print(table)
+
+def run(args):
+    if args.worker:
+        run_worker(args)
+        return
+
+    executor = BatchExecutor(args) if args.batch else PluginExecutor(args)
+    executor.scan()
+    if args.coordinator:
+        executor = Coordinator(executor, *parse_address(args.coordinator))
+    elif args.engine == "async":
+        executor = AsyncExecutor(executor, args.plugin_timeout, args.timeout, args.retries)
+    if args.metrics_port:
+        # Before execute(), so the exporter sees every TaskQueued
+        host, port = parse_address(args.metrics_port, "127.0.0.1")
+        serve_metrics(executor.events, host, port, 1 if getattr(executor, "engine", None) else args.threads)
+    if args.tui:
+        run_dashboard(executor)
+    else:
+        with ProgressDisplay(executor.events, console):
+            executor.execute()
+    if args.report:
+        with tracing.span("report"):
+            build_report(args.directory)
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        SUBCOMMANDS[sys.argv[1]](sys.argv[2:])
+        return
+
     args = parse_args()
     if platform.system().lower() == "windows":
         args.volatility_path = f"python {os.path.normpath(args.volatility_path)}\\vol.py"
     show_banner()
 
-    executor = PluginExecutor(args)
-    if args.tui:
-        run_dashboard(executor)
-    else:
-        executor.execute()
+    if args.trace:
+        tracing.start(args.trace)
+    try:
+        run(args)
+    finally:
+        show_trace_summary(tracing.stop())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,174 @@
+import os
+import re
+import queue
+import logging
+import tracing
+from concurrent.futures import ThreadPoolExecutor
+from subprocess import Popen, PIPE
+from utils import (
+    get_plugins,
+    detect_profile_and_kdbg,
+    write_volatility_config,
+    PluginTask,
+)
+from capabilities import CapabilityIndex
+from scheduler import RuntimeHistory, Scheduler
+from metrics import MetricsLog
+from manifest import RunManifest
+from isfstore import case_symbols_for
+from osdetect import guess_os
+from forkserver import start_forkserver
+from events import EventBus
+from executor import PluginExecutor
+from scanner import without_raw_scans
+
+log = logging.getLogger("AutoVol")
+
+IMAGE_EXTENSIONS = (".raw", ".mem", ".vmem", ".dmp", ".lime", ".bin", ".img", ".core", ".elf", ".vmsn", ".vmss")
+
+
+def discover_images(source):
+    """Returns [(path, os_hint)] from a directory of dumps or a manifest file.
+
+    A manifest lists one image per line as `<path> [windows|linux|mac]`;
+    blank lines and `#` comments are ignored, relative paths are resolved
+    against the manifest's directory.
+    """
+    images = []
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            path = os.path.join(source, name)
+            if os.path.isfile(path) and name.lower().endswith(IMAGE_EXTENSIONS):
+                images.append((path, None))
+        return images
+
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            parts = line.rsplit(None, 1)
+            path, os_hint = line, None
+            if len(parts) == 2 and parts[1].lower() in ("windows", "linux", "mac"):
+                path, os_hint = parts[0], parts[1].lower()
+            images.append((os.path.join(base, path), os_hint))
+    return images
+
+
+def image_ids(paths):
+    """Derives unique, filesystem-safe ids from image file names."""
+    ids, used, seen = [], set(), {}
+    for path in paths:
+        base = re.sub(r"[^\w.-]", "_", os.path.splitext(os.path.basename(path))[0]) or "image"
+        image_id, count = base, seen.get(base, 0)
+        # A generated suffix may itself be another image's name ("host_1-1.raw")
+        while image_id in used:
+            count += 1
+            image_id = f"{base}-{count}"
+        seen[base] = count
+        used.add(image_id)
+        ids.append(image_id)
+    return ids
+
+
+def detect_os(memfile, vol_path, symbol_dir=None):
+    """Best-effort OS category for an image: header and signature scan, then windows.info, then kernel banners."""
+    guess = guess_os(memfile)
+    if guess.os:
+        return guess.os
+    profile, _ = detect_profile_and_kdbg(memfile, vol_path, symbol_dir)
+    if profile:
+        return "windows"
+    try:
+        process = Popen([vol_path, "-q", "-f", memfile, "banners.Banners"], stdout=PIPE, stderr=PIPE)
+        stdout, _ = process.communicate()
+        output = stdout.decode(errors="ignore")
+        if "Darwin Kernel Version" in output:
+            return "mac"
+        if "Linux version" in output:
+            return "linux"
+    except Exception as e:
+        log.warning(f"⚠️ Banner scan failed for {memfile}: {e}")
+    return None
+
+
+class BatchExecutor(PluginExecutor):
+    """Runs (image, plugin) tasks for many images through one shared worker pool."""
+
+    def __init__(self, args):
+        self.args = args
+        self.status_queue = queue.Queue()
+        self.events = EventBus()
+        self.profile = None
+        self.kdbg = None
+        self.engine = None
+        self.forkserver = start_forkserver(args)
+        if getattr(args, "engine", "subprocess") == "inprocess":
+            log.warning("⚠️ --engine inprocess is per image; batch mode runs plugins as subprocesses.")
+
+        images = discover_images(args.batch)
+        if not images:
+            raise FileNotFoundError(f"❌ No memory images found in {args.batch}")
+        log.info(f"🗂️ Batch of {len(images)} images from {args.batch}")
+
+        self.capabilities = CapabilityIndex.load(args.volatility_path)
+        self.history = RuntimeHistory()
+        self.metrics_log = MetricsLog(args.directory)
+        self.store = self._open_store()
+        self.manifest = RunManifest(args.directory, self.capabilities.version, {"format": args.format})
+
+        ids = image_ids([path for path, _ in images])
+        with ThreadPoolExecutor(max_workers=max(1, args.threads)) as pool:
+            plans = list(pool.map(self._plan_image, [(p, h, i) for (p, h), i in zip(images, ids)]))
+
+        self.schedulers = {}
+        self.tasks = []
+        self.images = []
+        for image_id, scheduler, tasks, image in plans:
+            self.schedulers[image_id] = scheduler
+            self.tasks.extend(tasks)
+            self.images.append(image)
+        self.plugins = sorted({task.plugin for task in self.tasks})
+        self.queue = self._make_pool(self.schedulers)
+
+        total = sum(self.schedulers[t.image_id].estimate(t.plugin) for t in self.tasks)
+        log.info(f"🗓️ {len(self.tasks)} tasks over {len(plans)} images on {args.threads} worker(s), "
+                 f"estimated {total / 60 / max(1, args.threads):.1f} min")
+
+    def _plan_image(self, item):
+        """Detects an image's OS, writes its config and returns its scheduled tasks."""
+        with tracing.span("plan image", image=item[2]):
+            return self._plan(*item)
+
+    def _plan(self, path, os_hint, image_id):
+        directory = os.path.join(self.args.directory, image_id)
+        os.makedirs(directory, exist_ok=True)
+
+        console = self.args.console
+        if not console and not os_hint and getattr(self.args, "isf_store", None):
+            # Lets the symbol store look for just this OS's kernel identifier
+            os_hint = guess_os(path).os
+        symbol_dir = case_symbols_for(self.args, path, directory, console or os_hint)
+        if not console:
+            os_name = os_hint or detect_os(path, self.args.volatility_path, symbol_dir)
+            log.info(f"🧠 {image_id}: {os_name or 'unknown OS, using common plugins'}")
+            console = os_name or "common"
+        plugins = without_raw_scans(get_plugins(console), self.args)
+
+        fingerprint = self.manifest.fingerprint(path)
+        os_name = console if console in ("windows", "linux", "mac") else None
+        config_path = None
+        if getattr(self.args, "config_handoff", True):
+            # Per image directory and OS, so one image's kernel config never lands on another's plugins
+            config_path = write_volatility_config(path, self.args.volatility_path, directory, symbol_dir,
+                                                  os_name, fingerprint)
+
+        image_size = os.path.getsize(path)
+        scheduler = Scheduler(self.history, image_size)
+        tasks = self._pending([
+            PluginTask(plugin, path, directory, image_id=image_id, image_size=image_size, config_path=config_path,
+                       fingerprint=fingerprint, symbol_dir=symbol_dir)
+            for plugin in scheduler.order(plugins)
+        ])
+        return image_id, scheduler, tasks, (path, directory, image_id, os_name, symbol_dir)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import random
+
+EXEC_TIME = time.time()
+
+CONFIG_ENV = "AUTOVOL_FAKE_VOL"
+VERSION = "2.7.0"
+RENDERERS = ["quick", "none", "csv", "pretty", "json", "jsonl"]
+BLOCK_SIZE = 64 * 1024
+MB = 1024 * 1024
+
+# Per-plugin behaviour; anything a plugin's profile leaves out comes from "default"
+DEFAULT_PROFILE = {
+    "startup": 0.05,       # seconds before the plugin "starts" (Volatility's own import time)
+    "runtime": 0.2,        # seconds of work, spread evenly over the progress steps
+    "stdout_mb": 0.01,     # rendered output volume
+    "rate_mbps": 0,        # caps the output rate (stretches runtime); 0 means unthrottled
+    "progress_lines": 10,  # stderr "Progress:" lines, one per step
+    "memory_mb": 0,        # memory the process grows to by its last step
+    "failure_rate": 0.0,   # chance of exiting 1 halfway through
+}
+
+
+def load_config():
+    path = os.environ.get(CONFIG_ENV)
+    if not path:
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def profile_for(config, plugin):
+    profile = dict(DEFAULT_PROFILE, **config.get("default", {}))
+    profile.update(config.get("plugins", {}).get(plugin, {}))
+    return profile
+
+
+def record(config, **event):
+    """Appends one timing event for the benchmark to match against AutoVol's view of the run."""
+    path = config.get("events")
+    if not path:
+        return
+    line = json.dumps(dict(event, pid=os.getpid())) + "\n"
+    # A single short O_APPEND write, so concurrent fake plugins never interleave
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line.encode())
+    finally:
+        os.close(fd)
+
+
+def parse_argv(argv):
+    """(options, plugin) for `[-s DIR] [-c FILE] [-r NAME] [--save-config FILE] -f IMAGE [-o DIR] PLUGIN [ARGS]`."""
+    options = {}
+    rest = []
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ("-s", "-c", "-r", "-f", "-o", "--save-config") and i + 1 < len(argv):
+            options[arg] = argv[i + 1]
+            i += 2
+            continue
+        rest.append(arg)
+        i += 1
+    return options, (rest[0] if rest else None)
+
+
+def print_help(config):
+    plugins = sorted(set(config.get("plugins", {})) | {"windows.info.Info"})
+    lines = [f"Volatility 3 Framework {VERSION}",
+             f"  -r RENDERER  Determines how to render the output ({', '.join(RENDERERS)})",
+             "", "Plugins:", "  For plugin specific options, run 'vol.py <plugin> --help'", "",
+             "PLUGIN"]
+    lines += [f"    {name}    Benchmark stand-in for {name}" for name in plugins]
+    print("\n".join(lines))
+
+
+def render_row(renderer, plugin):
+    if renderer == "json":
+        row = json.dumps({"PID": 4, "PPID": 0, "ImageFileName": "System", "Offset(V)": 0xfa8000c9e040,
+                          "Threads": 120, "Handles": 512, "CreateTime": "2024-01-01T00:00:00", "__children": []})
+        return row.encode(), b",\n"
+    row = f"4\t0\tSystem\t0xfa8000c9e040\t120\t512\t2024-01-01 00:00:00.000000\t{plugin}"
+    return row.encode(), b"\n"
+
+
+class RowWriter:
+    """Writes whole rendered rows, BLOCK_SIZE at a time, so the output stays valid at any volume."""
+
+    def __init__(self, out, row, separator):
+        self.out = out
+        self.row = separator + row
+        self.per_block = max(BLOCK_SIZE // len(self.row), 1)
+        self.block = self.row * self.per_block
+        self.first = row
+        self.rows = 0
+
+    def write(self, total_bytes):
+        rows = -(-total_bytes // len(self.row))
+        if rows and not self.rows:
+            # No separator before the first row
+            self.out.write(self.first)
+            self.rows, rows = 1, rows - 1
+        full, rest = divmod(rows, self.per_block)
+        for _ in range(full):
+            self.out.write(self.block)
+        self.out.write(self.row * rest)
+        self.rows += rows
+        self.out.flush()
+
+
+def run_plugin(config, plugin, options):
+    profile = profile_for(config, plugin)
+    # Seeded per plugin, so a mix fails the same plugins on every run
+    rng = random.Random(f"{config.get('seed', 0)}:{plugin}")
+    fails = rng.random() < profile["failure_rate"]
+
+    time.sleep(profile["startup"])
+    started = time.time()
+    record(config, plugin=plugin, event="start", time=started, exec_time=EXEC_TIME)
+
+    total_bytes = int(profile["stdout_mb"] * MB)
+    duration = profile["runtime"]
+    if profile["rate_mbps"]:
+        duration = max(duration, profile["stdout_mb"] / profile["rate_mbps"])
+    steps = max(int(profile["progress_lines"]), 1)
+    renderer = options.get("-r", "quick")
+    out = sys.stdout.buffer
+    rows = RowWriter(out, *render_row(renderer, plugin))
+    memory = []
+
+    out.write(b"[\n" if renderer == "json" else
+              f"Volatility 3 Framework {VERSION}\n\nPID\tPPID\tImageFileName\tOffset(V)\tThreads\tHandles\t"
+              f"CreateTime\tPlugin\n".encode())
+    for step in range(steps):
+        if fails and step >= steps // 2:
+            record(config, plugin=plugin, event="end", time=time.time(), status=1)
+            sys.stderr.write("Volatility was unable to read a requested page:\nPage error 0x0 in layer primary\n")
+            sys.exit(1)
+        rows.write(total_bytes * (step + 1) // steps - total_bytes * step // steps)
+        if profile["memory_mb"]:
+            # Written (not just reserved) so the pages count towards RSS
+            memory.append(b"\x01" * int(profile["memory_mb"] * MB / steps))
+        percent = 100.0 * (step + 1) / steps
+        sent = time.time()
+        # Exactly what Volatility's PrintedProgress writes: the line is redrawn in place and ends in \r
+        sys.stderr.write(f"\rProgress: {percent: 7.2f}\t\tScanning primary using PageMapScanner\r")
+        sys.stderr.flush()
+        record(config, plugin=plugin, event="progress", time=sent, percent=round(percent, 2))
+        # Absolute deadlines keep the total runtime on target whatever the writes cost
+        delay = started + duration * (step + 1) / steps - time.time()
+        if delay > 0:
+            time.sleep(delay)
+    out.write(b"\n]\n" if renderer == "json" else b"\n")
+    out.flush()
+    sys.stderr.write("\n")
+    record(config, plugin=plugin, event="end", time=time.time(), status=0)
+
+
+def main():
+    config = load_config()
+    if "-h" in sys.argv[1:] or "--help" in sys.argv[1:]:
+        print_help(config)
+        return
+    options, plugin = parse_argv(sys.argv[1:])
+    if plugin is None:
+        sys.exit("vol.py: error: no plugin given")
+    if "--save-config" in options:
+        # What a plugin with a `kernel` module requirement saves once automagic has resolved it
+        layer = "kernel.layer_name"
+        with open(options["--save-config"], "w", encoding="utf-8") as f:
+            json.dump({"kernel.class": "volatility3.framework.contexts.Module",
+                       f"{layer}.class": "volatility3.framework.layers.intel.WindowsIntel32e",
+                       f"{layer}.memory_layer.class": "volatility3.framework.layers.physical.FileLayer",
+                       f"{layer}.memory_layer.location": f"file://{options.get('-f', '')}",
+                       f"{layer}.page_map_offset": 1744896,
+                       "kernel.offset": 0xf80002a5f000,
+                       "kernel.symbol_table_name.class":
+                           "volatility3.framework.symbols.windows.WindowsKernelIntermedSymbols",
+                       "kernel.symbol_table_name.isf_url": "file:///symbols/windows/ntkrnlmp.pdb/3844DBB9.json.xz"},
+                      f)
+    if plugin == "windows.info.Info" or plugin == "windows.info":
+        print(f"Volatility 3 Framework {VERSION}\n\nVariable\tValue\n\n"
+              "Kernel Base\t0xf80002a5f000\n"
+              "Symbols\tfile:///symbols/windows/ntkrnlmp.pdb/3844DBB920174967BE7AA4A2C20430FA-2.json.xz\n"
+              "KdVersionBlock\t0xf80002c50e18")
+        return
+    run_plugin(config, plugin, options)
+
+
+if __name__ == "__main__":
+    main()
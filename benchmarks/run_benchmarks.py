@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import queue
+import shutil
+import atexit
+import logging
+import platform
+import argparse
+import tempfile
+import threading
+import subprocess
+from statistics import mean, median
+from types import SimpleNamespace
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, PROJECT_ROOT)
+
+# The plugin history and capability cache live under ~ and are located at import time;
+# point them at a scratch home so runs neither read nor pollute the user's
+BENCH_HOME = tempfile.mkdtemp(prefix="autovol-bench-home-")
+os.environ["HOME"] = BENCH_HOME
+atexit.register(shutil.rmtree, BENCH_HOME, True)
+
+import psutil  # noqa: E402
+from rich.console import Console  # noqa: E402
+from rich.table import Table  # noqa: E402
+from executor import PluginExecutor  # noqa: E402
+from events import TaskStarted, TaskProgress, TaskFinished, TaskFailed  # noqa: E402
+from metrics import METRICS_FILE  # noqa: E402
+from scheduler import HISTORY_FILE  # noqa: E402
+
+console = Console()
+log = logging.getLogger("AutoVol")
+
+FAKE_VOL = os.path.join(BENCH_DIR, "fake_vol.py")
+IMAGE_SIZE = 16 * 1024 * 1024
+RSS_INTERVAL = 0.02
+
+LIGHT = {"runtime": 0.2, "stdout_mb": 0.02, "progress_lines": 5}
+MEDIUM = {"runtime": 0.6, "stdout_mb": 1, "progress_lines": 20, "memory_mb": 50}
+HEAVY = {"runtime": 1.5, "stdout_mb": 16, "progress_lines": 50, "memory_mb": 200}
+
+# mix -> {plugin: fake_vol profile}; plugins must be names get_plugins() knows
+MIXES = {
+    "smoke": {
+        "windows.pslist.PsList": {"runtime": 0.05, "progress_lines": 3},
+        "windows.cmdline.CmdLine": {"runtime": 0.05, "progress_lines": 3},
+        "windows.dlllist.DllList": {"runtime": 0.05, "progress_lines": 3},
+    },
+    "uniform": {plugin: LIGHT for plugin in (
+        "windows.pslist.PsList", "windows.pstree.PsTree", "windows.psscan.PsScan", "windows.cmdline.CmdLine",
+        "windows.dlllist.DllList", "windows.envars.Envars", "windows.getsids.GetSIDs", "windows.privileges.Privs",
+        "windows.modules.Modules", "windows.driverscan.DriverScan", "windows.svcscan.SvcScan",
+        "windows.sessions.Sessions", "windows.callbacks.Callbacks", "windows.ssdt.SSDT",
+        "windows.registry.hivelist.HiveList", "windows.netstat.NetStat")},
+    "mixed": {
+        "windows.filescan.FileScan": HEAVY,
+        "windows.handles.Handles": dict(HEAVY, runtime=1.0, stdout_mb=8),
+        "windows.netscan.NetScan": MEDIUM,
+        "windows.malfind.Malfind": MEDIUM,
+        "windows.svcscan.SvcScan": MEDIUM,
+        "windows.pslist.PsList": LIGHT,
+        "windows.pstree.PsTree": LIGHT,
+        "windows.cmdline.CmdLine": LIGHT,
+        "windows.dlllist.DllList": dict(LIGHT, stdout_mb=0.5),
+        "windows.envars.Envars": LIGHT,
+        "windows.getsids.GetSIDs": LIGHT,
+        "windows.modules.Modules": LIGHT,
+    },
+    "output": {plugin: {"runtime": 0.0, "stdout_mb": 64, "progress_lines": 64} for plugin in (
+        "windows.filescan.FileScan", "windows.handles.Handles", "windows.dlllist.DllList",
+        "windows.strings.Strings")},
+    "flaky": {plugin: dict(LIGHT, runtime=0.3, failure_rate=0.3) for plugin in (
+        "windows.pslist.PsList", "windows.pstree.PsTree", "windows.psscan.PsScan", "windows.cmdline.CmdLine",
+        "windows.dlllist.DllList", "windows.envars.Envars", "windows.getsids.GetSIDs", "windows.privileges.Privs")},
+}
+
+
+def scaled(profiles, scale):
+    """Stretches (or shrinks) every plugin's runtime and startup by scale."""
+    result = {}
+    for plugin, profile in profiles.items():
+        profile = dict(profile)
+        for key in ("runtime", "startup"):
+            if key in profile:
+                profile[key] *= scale
+        result[plugin] = profile
+    return result
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(int(round(fraction * (len(values) - 1))), len(values) - 1)]
+
+
+def summarize(values, scale=1.0):
+    """{mean, p50, p95, max} of a list, scaled (e.g. to ms); None when there are no samples."""
+    if not values:
+        return None
+    return {"mean": round(mean(values) * scale, 3), "p50": round(median(values) * scale, 3),
+            "p95": round(percentile(values, 0.95) * scale, 3), "max": round(max(values) * scale, 3)}
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=PROJECT_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class RSSSampler(threading.Thread):
+    """Samples AutoVol's own RSS (not its children's) until stopped."""
+
+    def __init__(self, interval=RSS_INTERVAL):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.process = psutil.Process()
+        self.baseline = self.process.memory_info().rss
+        self.peak = self.baseline
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            self.peak = max(self.peak, self.process.memory_info().rss)
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        self.peak = max(self.peak, self.process.memory_info().rss)
+
+
+class EventRecorder(threading.Thread):
+    """Receives executor events through a queue the way the TUI's EventBridge does, timestamping each on arrival."""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.queue = queue.SimpleQueue()
+        self.received = []
+
+    def push(self, event):
+        self.queue.put(event)
+
+    def run(self):
+        while True:
+            event = self.queue.get()
+            if event is None:
+                break
+            self.received.append((event, time.time()))
+
+    def stop(self):
+        self.queue.put(None)
+        self.join()
+
+
+def load_jsonl(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class Scenario:
+    """One (mix, threads, format) combination, run against the fake vol.py in a scratch case directory."""
+
+    def __init__(self, root, mix, threads, fmt, scale=1.0, seed=0, warm_history=False):
+        self.root = root
+        self.mix = mix
+        self.threads = threads
+        self.format = fmt
+        self.profiles = scaled(MIXES[mix], scale)
+        self.seed = seed
+        self.warm_history = warm_history
+        self.vol_path = os.path.join(root, "vol.py")
+        self.image = os.path.join(root, "mem.raw")
+        if not os.path.exists(self.image):
+            with open(self.image, "wb") as f:
+                f.truncate(IMAGE_SIZE)
+        if not os.path.exists(self.vol_path):
+            # Pinned to this interpreter, as vol.py would be to Volatility's
+            with open(FAKE_VOL, "r", encoding="utf-8") as src, open(self.vol_path, "w", encoding="utf-8") as dst:
+                dst.write(f"#!{sys.executable}\n" + src.read().split("\n", 1)[1])
+            os.chmod(self.vol_path, 0o755)
+
+    @property
+    def key(self):
+        return {"mix": self.mix, "threads": self.threads, "format": self.format}
+
+    def run(self, number):
+        case = os.path.join(self.root, f"{self.mix}-t{self.threads}-{self.format}-{number}")
+        os.makedirs(case)
+        events_path = os.path.join(case, "fake_vol_events.jsonl")
+        config_path = os.path.join(case, "fake_vol.json")
+        with open(config_path, "w", encoding="utf-8") as f:
+            json.dump({"plugins": self.profiles, "events": events_path, "seed": self.seed}, f)
+        os.environ["AUTOVOL_FAKE_VOL"] = config_path
+        if not self.warm_history and os.path.exists(HISTORY_FILE):
+            os.remove(HISTORY_FILE)
+
+        args = SimpleNamespace(file=self.image, directory=case, profile=None, console="+".join(self.profiles),
+                               volatility_path=self.vol_path, threads=self.threads, format=self.format,
+                               compress="none", engine="subprocess", force=True, download_symbols=False)
+        rss = RSSSampler()
+        rss.start()
+        recorder = EventRecorder()
+        recorder.start()
+
+        started = time.time()
+        executor = PluginExecutor(args)
+        executor.events.subscribe(recorder.push)
+        setup = time.time() - started
+        started = time.time()
+        executor.execute()
+        makespan = time.time() - started
+        recorder.stop()
+        rss.stop()
+
+        if executor.store:
+            executor.store.close()
+        result = self.measure(recorder.received, load_jsonl(events_path),
+                              load_jsonl(os.path.join(case, METRICS_FILE)))
+        result.update(setup_s=round(setup, 3), makespan_s=round(makespan, 3),
+                      autovol_peak_rss_mb=round(rss.peak / (1024 * 1024), 1),
+                      autovol_rss_growth_mb=round((rss.peak - rss.baseline) / (1024 * 1024), 1))
+        if result["ideal_makespan_s"]:
+            result["efficiency"] = round(result["ideal_makespan_s"] / makespan, 3)
+        shutil.rmtree(case, ignore_errors=True)
+        return result
+
+    def measure(self, received, fake_events, metrics):
+        """Per-task timings from AutoVol's events matched against what the fake plugins say they did."""
+        fake = {}
+        progress_sent = {}
+        for event in fake_events:
+            fake.setdefault(event["plugin"], {})[event["event"]] = event
+            if event["event"] == "progress":
+                progress_sent[(event["plugin"], event["percent"])] = event["time"]
+
+        started, finished = {}, {}
+        progress_latency, finish_latency = [], []
+        for event, arrived in received:
+            if isinstance(event, TaskStarted):
+                started[event.plugin] = event
+            elif isinstance(event, (TaskFinished, TaskFailed)):
+                finished[event.plugin] = event
+                end = fake.get(event.plugin, {}).get("end")
+                if end:
+                    finish_latency.append(arrived - end["time"])
+            elif isinstance(event, TaskProgress):
+                sent = progress_sent.get((event.plugin, round(event.progress * 100, 2)))
+                if sent:
+                    progress_latency.append(arrived - sent)
+
+        launch, drain, busy = [], [], []
+        for plugin, start in started.items():
+            run = fake.get(plugin, {})
+            if "start" in run:
+                launch.append(run["start"]["exec_time"] - start.time)
+            if "end" in run and plugin in finished:
+                drain.append(finished[plugin].time - run["end"]["time"])
+                busy.append(run["end"]["time"] - run["start"]["exec_time"])
+
+        # Idle time a worker spends between finishing one task and starting its next
+        gaps = []
+        by_worker = {}
+        for plugin, start in started.items():
+            if plugin in finished:
+                by_worker.setdefault(start.worker, []).append((start.time, finished[plugin].time))
+        for spans in by_worker.values():
+            spans.sort()
+            gaps += [spans[i + 1][0] - spans[i][1] for i in range(len(spans) - 1)]
+
+        output_bytes = sum(m.get("output_bytes", 0) for m in metrics)
+        rates = []
+        for m in metrics:
+            run = fake.get(m["plugin"], {})
+            if m.get("output_bytes", 0) >= 1024 * 1024 and "start" in run and m["plugin"] in finished:
+                elapsed = finished[m["plugin"]].time - run["start"]["time"]
+                rates.append(m["output_bytes"] / (1024 * 1024) / max(elapsed, 1e-6))
+
+        makespan_bound = max(max(busy), sum(busy) / self.threads) if busy else None
+        return {
+            "tasks": len(started),
+            "done": sum(isinstance(e, TaskFinished) for e in finished.values()),
+            "failed": sum(isinstance(e, TaskFailed) for e in finished.values()),
+            "ideal_makespan_s": round(makespan_bound, 3) if makespan_bound else None,
+            "launch_ms": summarize(launch, 1000),
+            "drain_ms": summarize(drain, 1000),
+            "dispatch_gap_ms": summarize(gaps, 1000),
+            "overhead_per_task_ms": round(mean(a + b for a, b in zip(launch, drain)) * 1000, 3) if drain else None,
+            "output_mb": round(output_bytes / (1024 * 1024), 2),
+            "task_write_mb_s": summarize(rates),
+            "progress_latency_ms": summarize(progress_latency, 1000),
+            "progress_events": len(progress_latency),
+            "finish_latency_ms": summarize(finish_latency, 1000),
+        }
+
+
+def median_of(runs):
+    """Element-wise median of run results (nested summaries included), for comparing noisy repeats."""
+    merged = {}
+    for key, value in runs[0].items():
+        values = [run.get(key) for run in runs if run.get(key) is not None]
+        if isinstance(value, dict):
+            merged[key] = median_of([v for v in values if isinstance(v, dict)]) if values else None
+        elif isinstance(value, (int, float)) and values:
+            merged[key] = round(median(values), 3)
+        else:
+            merged[key] = value
+    return merged
+
+
+def flatten(result, prefix=""):
+    flat = {}
+    for key, value in (result or {}).items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+# Metrics where bigger is better; a drop in these is the regression
+HIGHER_IS_BETTER = ("efficiency", "task_write_mb_s")
+# Checked against --max-regression
+GATED_METRICS = ("makespan_s", "overhead_per_task_ms", "dispatch_gap_ms.mean", "progress_latency_ms.p95",
+                 "autovol_peak_rss_mb")
+
+
+def compare(results, baseline_path, max_regression=None):
+    """Prints gated metrics against a baseline results file; returns the regressions past max_regression."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    previous = {json.dumps(s["scenario"], sort_keys=True): s["median"] for s in baseline["scenarios"]}
+
+    table = Table("Scenario", "Metric", "Baseline", "Current", "Change",
+                  title=f"vs {baseline['meta'].get('commit') or baseline_path}")
+    regressions = []
+    for scenario in results["scenarios"]:
+        old = previous.get(json.dumps(scenario["scenario"], sort_keys=True))
+        if old is None:
+            continue
+        name = "{mix}/t{threads}/{format}".format(**scenario["scenario"])
+        old, new = flatten(old), flatten(scenario["median"])
+        for metric in GATED_METRICS:
+            if not old.get(metric) or new.get(metric) is None:
+                continue
+            change = (new[metric] - old[metric]) / old[metric] * 100
+            worse = -change if metric.split(".")[0] in HIGHER_IS_BETTER else change
+            style = "red" if max_regression is not None and worse > max_regression else None
+            if style:
+                regressions.append(f"{name} {metric} {change:+.1f}%")
+            table.add_row(name, metric, f"{old[metric]:g}", f"{new[metric]:g}", f"{change:+.1f}%", style=style)
+    console.print(table)
+    return regressions
+
+
+def print_summary(results):
+    table = Table("Mix", "Threads", "Format", "Makespan (s)", "Ideal (s)", "Overhead/task (ms)",
+                  "Gap p95 (ms)", "Out (MB/s)", "Progress p95 (ms)", "Peak RSS (MB)", "Done/Failed",
+                  title="AutoVol benchmark (median of repeats)")
+    for scenario in results["scenarios"]:
+        m = scenario["median"]
+        gap = (m["dispatch_gap_ms"] or {}).get("p95")
+        rate = (m["task_write_mb_s"] or {}).get("mean")
+        latency = (m["progress_latency_ms"] or {}).get("p95")
+        table.add_row(scenario["scenario"]["mix"], str(scenario["scenario"]["threads"]), scenario["scenario"]["format"],
+                      f"{m['makespan_s']:.2f}", f"{m['ideal_makespan_s'] or 0:.2f}",
+                      f"{m['overhead_per_task_ms'] or 0:.1f}", "-" if gap is None else f"{gap:.1f}",
+                      "-" if rate is None else f"{rate:.0f}", "-" if latency is None else f"{latency:.1f}",
+                      f"{m['autovol_peak_rss_mb']:.0f}", f"{m['done']:g}/{m['failed']:g}")
+    console.print(table)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="⏱️ Benchmark AutoVol's executor against a synthetic vol.py")
+    parser.add_argument("--mix", default="mixed",
+                        help=f"Comma-separated plugin mixes ({', '.join(MIXES)})")
+    parser.add_argument("--threads", default="1,2,4,8", help="Comma-separated worker counts")
+    parser.add_argument("--format", default="txt", help="Comma-separated output formats (txt, json)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario; results report the median")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplies every fake plugin's runtime")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the fake plugins' failures")
+    parser.add_argument("--warm-history", action="store_true",
+                        help="Keep the plugin runtime history between runs so longest-first ordering kicks in")
+    parser.add_argument("-o", "--output", default="autovol_benchmark.json", help="Results JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="Results JSON from an earlier commit to diff against")
+    parser.add_argument("--max-regression", type=float, metavar="PCT",
+                        help="With --compare, exit 1 if a gated metric gets worse by more than PCT percent")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Show AutoVol's own logging")
+    args = parser.parse_args(argv)
+    unknown = [mix for mix in args.mix.split(",") if mix not in MIXES]
+    if unknown:
+        parser.error(f"unknown mix: {', '.join(unknown)}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format="%(message)s")
+
+    results = {
+        "meta": {
+            "commit": git_revision(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "repeat": args.repeat,
+            "scale": args.scale,
+            "seed": args.seed,
+            "warm_history": args.warm_history,
+        },
+        "scenarios": [],
+    }
+    root = tempfile.mkdtemp(prefix="autovol-bench-")
+    try:
+        for mix in args.mix.split(","):
+            for fmt in args.format.split(","):
+                for threads in (int(t) for t in args.threads.split(",")):
+                    scenario = Scenario(root, mix, threads, fmt, args.scale, args.seed, args.warm_history)
+                    runs = []
+                    for number in range(args.repeat):
+                        console.print(f"⏱️ {mix} | {threads} thread(s) | {fmt} | run {number + 1}/{args.repeat}")
+                        runs.append(scenario.run(number))
+                    results["scenarios"].append({"scenario": scenario.key, "median": median_of(runs), "runs": runs})
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print_summary(results)
+    console.print(f"💾 Results written to {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.max_regression)
+        if regressions:
+            console.print(f"❌ {len(regressions)} regression(s) over {args.max_regression}%: " + "; ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
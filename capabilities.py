@@ -0,0 +1,185 @@
+import os
+import re
+import glob
+import json
+import shutil
+import importlib.metadata
+import logging
+import tracing
+from subprocess import Popen, PIPE
+
+log = logging.getLogger("AutoVol")
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "autovol")
+
+# AutoVol --format -> Volatility 3 renderer
+FORMAT_RENDERERS = {
+    "txt": "quick",
+    "json": "json",
+    "html": "html",
+}
+
+
+def _interpreter(script):
+    """The Python a script's shebang runs (resolving `/usr/bin/env python3`), or None."""
+    try:
+        with open(script, "rb") as f:
+            line = f.readline(256).decode(errors="ignore")
+    except OSError:
+        return None
+    if not line.startswith("#!"):
+        return None
+    words = line[2:].split()
+    if words and os.path.basename(words[0]) == "env":
+        words = [w for w in words[1:] if not w.startswith("-")]
+        return shutil.which(words[0]) if words else None
+    return words[0] if words else None
+
+
+def installed_versions(script):
+    """volatility3 distributions installed for a script's interpreter, plus the one importable here.
+
+    A pip console script or pyenv shim is untouched by an upgrade; the
+    version-named dist-info directory is not.
+    """
+    versions = []
+    try:
+        versions.append(f"volatility3-{importlib.metadata.version('volatility3')}")
+    except importlib.metadata.PackageNotFoundError:
+        pass
+    interpreter = _interpreter(script)
+    if interpreter:
+        # A venv's python symlinks to the base install; both prefixes may hold site-packages
+        prefixes = {os.path.dirname(os.path.dirname(path)) for path in (interpreter, os.path.realpath(interpreter))}
+        for prefix in sorted(prefixes):
+            for site in ("lib/python*/site-packages", "Lib/site-packages"):
+                for path in glob.glob(os.path.join(prefix, site, "volatility3-*.dist-info")):
+                    versions.append(os.path.basename(path)[:-len(".dist-info")])
+    return sorted(set(versions))
+
+
+def volatility_fingerprint(vol_path):
+    """Identifies a Volatility install cheaply from the script, its version file stats and installed versions."""
+    script = vol_path if os.path.exists(vol_path) else shutil.which(vol_path)
+    if not script:
+        return "|".join([vol_path] + installed_versions(vol_path))
+    script = os.path.realpath(script)
+    parts = [script] + installed_versions(script)
+    candidates = [script, os.path.join(os.path.dirname(script), "volatility3", "framework", "constants", "_version.py")]
+    for path in candidates:
+        try:
+            st = os.stat(path)
+            parts.append(f"{st.st_size}:{int(st.st_mtime)}")
+        except OSError:
+            continue
+    return "|".join(parts)
+
+
+def parse_volatility_help(output):
+    """Parses `vol -h` into the framework version, renderers and per-plugin entries."""
+    index = {"version": None, "renderers": [], "plugins": {}, "unavailable": []}
+
+    match_version = re.search(r"Volatility 3 Framework\s+(\S+)", output)
+    if match_version:
+        index["version"] = match_version.group(1)
+
+    match_renderers = re.search(r"Determines how to render the output\s*\(([^)]*)\)", output)
+    if match_renderers:
+        index["renderers"] = [r.strip() for r in " ".join(match_renderers.group(1).split()).split(",") if r.strip()]
+
+    # Plugins whose dependencies (e.g. yara) are missing are only named in the epilog
+    match_failed = re.search(r"could not be loaded[^:]*:\s*(.*)", output, re.S)
+    if match_failed:
+        modules = " ".join(match_failed.group(1).split()).split(",")
+        index["unavailable"] = sorted(m.strip().replace("volatility3.plugins.", "") for m in modules if m.strip())
+
+    in_plugins = False
+    current = None
+    for line in output.splitlines():
+        if line.strip() == "PLUGIN":
+            in_plugins = True
+            continue
+        if not in_plugins:
+            continue
+        if line and not line.startswith(" "):
+            break
+        match_plugin = re.match(r"^    (\w[\w.]*\.\w+)(?:\s+(.*))?$", line)
+        if match_plugin:
+            name = match_plugin.group(1)
+            index["plugins"][name] = {
+                "category": name.split(".")[0] if name.split(".")[0] in ("windows", "linux", "mac") else "common",
+                "description": (match_plugin.group(2) or "").strip(),
+            }
+            current = index["plugins"][name]
+        elif current is not None and line.strip():
+            current["description"] = f"{current['description']} {line.strip()}".strip()
+
+    return index
+
+
+def build_capability_index(vol_path):
+    """Runs `vol -h` once and parses it into a capability index."""
+    try:
+        with tracing.span("capability probe (vol -h)"):
+            process = Popen([vol_path, "-h"], stdout=PIPE, stderr=PIPE)
+            stdout, stderr = process.communicate()
+        return parse_volatility_help(stdout.decode(errors="ignore") + "\n" + stderr.decode(errors="ignore"))
+    except Exception as e:
+        log.warning(f"⚠️ Could not index plugin capabilities: {e}")
+        return {"version": None, "renderers": [], "plugins": {}}
+
+
+class CapabilityIndex:
+    """Plugin capability lookups built from one `vol -h` call and cached on disk."""
+
+    def __init__(self, index):
+        self.version = index.get("version")
+        self.renderers = set(index.get("renderers", []))
+        self.plugins = index.get("plugins", {})
+        self.unavailable = set(index.get("unavailable", []))
+
+    @classmethod
+    def load(cls, vol_path, cache_dir=CACHE_DIR):
+        key = volatility_fingerprint(vol_path)
+        cache_file = os.path.join(cache_dir, "capabilities.json")
+
+        cache = {}
+        try:
+            with open(cache_file, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+        if key in cache:
+            log.debug(f"Using cached plugin capabilities for {key}")
+            return cls(cache[key])
+
+        log.info("🔎 Indexing Volatility plugin capabilities...")
+        index = build_capability_index(vol_path)
+        if index["plugins"]:
+            # Only the current install is worth keeping
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+                with open(tmp_file, "w", encoding="utf-8") as f:
+                    json.dump({key: index}, f)
+                os.replace(tmp_file, cache_file)
+            except OSError as e:
+                log.warning(f"⚠️ Could not cache plugin capabilities: {e}")
+        return cls(index)
+
+    def get(self, plugin):
+        return self.plugins.get(plugin)
+
+    def category(self, plugin):
+        entry = self.plugins.get(plugin)
+        return entry["category"] if entry else None
+
+    def is_available(self, plugin):
+        """False only for plugins Volatility reported as failing to load."""
+        return plugin.rsplit(".", 1)[0] not in self.unavailable
+
+    def renderer_for(self, fmt):
+        """Returns the Volatility renderer for an AutoVol format, or None if unsupported."""
+        renderer = FORMAT_RENDERERS.get(fmt)
+        return renderer if renderer in self.renderers else None
@@ -0,0 +1,404 @@
+import os
+import copy
+import time
+import json
+import uuid
+import queue
+import shutil
+import socket
+import logging
+import tempfile
+import threading
+from collections import deque
+from dataclasses import asdict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+import requests
+from utils import PluginStatus, PluginTask
+from events import TaskQueued, TaskStarted, TaskProgress, status_event
+from capabilities import CapabilityIndex
+from scheduler import RuntimeHistory
+from executor import PluginRunner
+from convert import conversion_requested, convert_for_args
+from streaming import find_output, strip_compression
+
+log = logging.getLogger("AutoVol")
+
+LEASE_SECONDS = 60
+HEARTBEAT_SECONDS = 15
+MAX_ATTEMPTS = 3
+MAX_UNREACHABLE = 3
+CHUNK_SIZE = 1 << 16
+
+
+def parse_address(value, default_host="0.0.0.0"):
+    """Parses PORT or HOST:PORT."""
+    host, _, port = value.rpartition(":")
+    return host or default_host, int(port)
+
+
+def interleave(tasks):
+    """Round-robins tasks across images, keeping each image's own order."""
+    per_image = {}
+    for task in tasks:
+        per_image.setdefault(task.image_id, deque()).append(task)
+    ordered = []
+    while per_image:
+        for image_id in list(per_image):
+            ordered.append(per_image[image_id].popleft())
+            if not per_image[image_id]:
+                del per_image[image_id]
+    return ordered
+
+
+class Coordinator:
+    """Serves an executor's (image, plugin) plan to remote workers over HTTP.
+
+    Workers lease one task at a time and must heartbeat before the lease
+    expires; expired leases go back to the front of the queue, up to
+    MAX_ATTEMPTS times. Exposes the same execute()/execute_with_status()
+    contract as PluginExecutor so the CLI and TUI work unchanged.
+    """
+
+    def __init__(self, executor, host="0.0.0.0", port=8765, lease_seconds=LEASE_SECONDS):
+        self.args = executor.args
+        self.status_queue = executor.status_queue
+        self.events = executor.events
+        self.store = getattr(executor, "store", None)
+        self.manifest = getattr(executor, "manifest", None)
+        self.root = os.path.abspath(executor.args.directory)
+        self.lease_seconds = lease_seconds
+        self.tasks = {}
+        self.pending = deque()
+        for task in interleave(executor.tasks):
+            task_id = uuid.uuid4().hex
+            self.tasks[task_id] = task
+            self.pending.append(task_id)
+        self.attempts = {}
+        self.leases = {}
+        self.finished = set()
+        self.cond = threading.Condition()
+        self.server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.server.daemon_threads = True
+        self._threads = []
+
+    @property
+    def address(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    # --- task state -----------------------------------------------------
+
+    def lease(self, worker):
+        with self.cond:
+            if len(self.finished) == len(self.tasks):
+                return "finished"
+            if not self.pending:
+                return None
+            task_id = self.pending.popleft()
+            lease_id = uuid.uuid4().hex
+            self.leases[lease_id] = {"task_id": task_id, "worker": worker, "expires": time.monotonic() + self.lease_seconds}
+            self.attempts[task_id] = self.attempts.get(task_id, 0) + 1
+
+        task = self.tasks[task_id]
+        log.info(f"📤 Leased {task.image_id or 'image'}/{task.plugin} to {worker}")
+        self.events.emit(TaskStarted(task.plugin, task.image_id, worker=worker))
+        payload = asdict(task)
+        payload["relative_dir"] = os.path.relpath(os.path.abspath(task.directory), self.root)
+        return {"lease": lease_id, "lease_seconds": self.lease_seconds, "format": self.args.format, "task": payload}
+
+    def _task_for(self, lease_id):
+        with self.cond:
+            lease = self.leases.get(lease_id)
+            return self.tasks[lease["task_id"]] if lease else None
+
+    def heartbeat(self, lease_id):
+        with self.cond:
+            lease = self.leases.get(lease_id)
+            if not lease:
+                return False
+            lease["expires"] = time.monotonic() + self.lease_seconds
+            return True
+
+    def report(self, lease_id, status):
+        if self._task_for(lease_id) is None:
+            return False
+        status = PluginStatus(**status)
+        self.status_queue.put(status)
+        self.events.emit(TaskProgress(status.name, status.image, progress=status.progress, stage=status.stage,
+                                      eta=status.eta))
+        return True
+
+    def upload(self, lease_id, name, stream, length):
+        task = self._task_for(lease_id)
+        if task is None or not name or os.path.basename(name) != name or name in (".", ".."):
+            return False
+        output_dir = os.path.join(task.directory, task.plugin)
+        os.makedirs(output_dir, exist_ok=True)
+        with open(os.path.join(output_dir, name), "wb") as f:
+            while length > 0:
+                chunk = stream.read(min(CHUNK_SIZE, length))
+                if not chunk:
+                    break
+                f.write(chunk)
+                length -= len(chunk)
+        return length == 0
+
+    def complete(self, lease_id, status):
+        with self.cond:
+            lease = self.leases.pop(lease_id, None)
+            if not lease:
+                return False
+            task = self.tasks[lease["task_id"]]
+        status = PluginStatus(**status)
+        output_dir = os.path.join(task.directory, task.plugin)
+        out_file = find_output(output_dir, task.plugin, (self.args.format, "txt"))
+        if out_file and self.store and status.status == "done" and strip_compression(out_file).endswith(".json"):
+            self.store.safe_ingest(task.plugin, out_file, task.image_id)
+        if out_file and status.status == "done" and conversion_requested(self.args) \
+                and strip_compression(out_file).endswith(".json"):
+            convert_for_args(self.args, out_file)
+        if out_file and self.manifest:
+            self.manifest.record(task, status.status, out_file)
+        with self.cond:
+            self.finished.add(lease["task_id"])
+            self.cond.notify_all()
+        self.status_queue.put(status)
+        self.events.emit(status_event(status))
+        return True
+
+    def _reap(self):
+        """Requeues tasks whose workers stopped heartbeating."""
+        while True:
+            now = time.monotonic()
+            with self.cond:
+                if len(self.finished) == len(self.tasks):
+                    return
+                for lease_id, lease in list(self.leases.items()):
+                    if lease["expires"] > now:
+                        continue
+                    del self.leases[lease_id]
+                    task_id = lease["task_id"]
+                    task = self.tasks[task_id]
+                    if self.attempts[task_id] >= MAX_ATTEMPTS:
+                        log.error(f"❌ {task.plugin} on {task.image_id or 'image'} lost {MAX_ATTEMPTS} workers; giving up")
+                        self.finished.add(task_id)
+                        status = PluginStatus(task.plugin, "error", 1.0, 0.0, 0.0, image=task.image_id)
+                        self.status_queue.put(status)
+                        self.events.emit(status_event(status))
+                        self.cond.notify_all()
+                    else:
+                        log.warning(f"⚠️ Lease on {task.plugin} from {lease['worker']} expired; requeueing")
+                        self.pending.appendleft(task_id)
+                self.cond.wait(1.0)
+
+    # --- executor contract ---------------------------------------------
+
+    def start(self):
+        log.info(f"🛰️ Coordinator serving {len(self.tasks)} tasks on {self.address}")
+        for task_id in self.pending:
+            task = self.tasks[task_id]
+            self.events.emit(TaskQueued(task.plugin, task.image_id))
+        for target in (self.server.serve_forever, self._reap):
+            t = threading.Thread(target=target, daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def wait(self):
+        with self.cond:
+            while len(self.finished) < len(self.tasks):
+                self.cond.wait()
+        # Give workers a moment to lease once more and learn the run is over
+        time.sleep(1.0)
+        self.server.shutdown()
+        self.server.server_close()
+
+    def execute(self):
+        self.start()
+        self.wait()
+        log.info("✅ All plugins completed.")
+
+    def execute_with_status(self):
+        self.start()
+        threading.Thread(target=self.wait, daemon=True).start()
+        return self.status_queue
+
+
+def _make_handler(coordinator):
+    class CoordinatorHandler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):
+            log.debug("coordinator: " + fmt % args)
+
+        def _json_body(self):
+            length = int(self.headers.get("Content-Length", 0))
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def _reply(self, code, payload=None):
+            body = json.dumps(payload).encode() if payload is not None else b""
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            route = urlparse(self.path).path
+            body = self._json_body()
+            if route == "/lease":
+                result = coordinator.lease(body.get("worker", self.client_address[0]))
+                if result == "finished":
+                    self._reply(410, {"finished": True})
+                elif result is None:
+                    self._reply(204)
+                else:
+                    self._reply(200, result)
+            elif route == "/heartbeat":
+                self._reply(200 if coordinator.heartbeat(body.get("lease")) else 404, {})
+            elif route == "/status":
+                self._reply(200 if coordinator.report(body.get("lease"), body.get("status", {})) else 404, {})
+            elif route == "/complete":
+                self._reply(200 if coordinator.complete(body.get("lease"), body.get("status", {})) else 404, {})
+            else:
+                self._reply(404, {})
+
+        def do_PUT(self):
+            url = urlparse(self.path)
+            params = parse_qs(url.query)
+            if url.path != "/upload":
+                self._reply(404, {})
+                return
+            ok = coordinator.upload(params.get("lease", [None])[0], params.get("name", [None])[0],
+                                    self.rfile, int(self.headers.get("Content-Length", 0)))
+            self._reply(200 if ok else 404, {})
+
+    return CoordinatorHandler
+
+
+class Worker:
+    """Leases tasks from a coordinator and runs each one with a local PluginRunner.
+
+    With a local output directory (shared storage) results are written in
+    place; otherwise they go to a scratch directory and are uploaded back.
+    """
+
+    def __init__(self, url, args, worker_id=None, poll_interval=2.0):
+        self.url = url.rstrip("/")
+        self.args = args
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.poll_interval = poll_interval
+        self.capabilities = CapabilityIndex.load(args.volatility_path)
+        self.history = RuntimeHistory()
+
+    def make_runner(self, args, status_queue):
+        return PluginRunner(None, args, status_queue, capabilities=self.capabilities, history=self.history)
+
+    def run(self):
+        slots = [threading.Thread(target=self._slot, daemon=True) for _ in range(max(1, self.args.threads))]
+        log.info(f"🛠️ Worker {self.worker_id} joining {self.url} with {len(slots)} slot(s)")
+        for t in slots:
+            t.start()
+        for t in slots:
+            t.join()
+        log.info("✅ Coordinator reports the run is finished.")
+
+    def _slot(self):
+        session = requests.Session()
+        connected = False
+        failures = 0
+        while True:
+            try:
+                resp = session.post(f"{self.url}/lease", json={"worker": self.worker_id}, timeout=30)
+            except requests.RequestException as e:
+                failures += 1
+                # A coordinator we already talked to shuts down once the run is over; an idle slot may miss the 410
+                if connected and failures >= MAX_UNREACHABLE:
+                    log.info(f"🛑 Coordinator gone after {failures} attempts; assuming the run is finished")
+                    return
+                log.warning(f"⚠️ Coordinator unreachable: {e}")
+                time.sleep(self.poll_interval)
+                continue
+            connected = True
+            failures = 0
+            if resp.status_code == 410:
+                return
+            if resp.status_code != 200:
+                time.sleep(self.poll_interval)
+                continue
+            self._run_lease(session, resp.json())
+
+    def _run_lease(self, session, lease):
+        lease_id = lease["lease"]
+        task_fields = {k: v for k, v in lease["task"].items() if k != "relative_dir"}
+        scratch = None
+        if self.args.directory:
+            task_fields["directory"] = os.path.join(self.args.directory, lease["task"]["relative_dir"])
+        else:
+            scratch = tempfile.mkdtemp(prefix="autovol-")
+            task_fields["directory"] = scratch
+        # Coordinator-side paths only help when the worker shares the coordinator's filesystem
+        for field in ("config_path", "symbol_dir"):
+            if task_fields.get(field) and not os.path.exists(task_fields[field]):
+                task_fields[field] = None
+        task = PluginTask(**task_fields)
+
+        stop = threading.Event()
+        status_queue = queue.Queue()
+
+        def heartbeat():
+            while not stop.wait(min(HEARTBEAT_SECONDS, lease["lease_seconds"] / 3)):
+                try:
+                    if session.post(f"{self.url}/heartbeat", json={"lease": lease_id}, timeout=10).status_code == 404:
+                        log.warning(f"⚠️ Lost lease on {task.plugin}; the coordinator has requeued it")
+                except requests.RequestException:
+                    pass
+
+        def forward():
+            while True:
+                status = status_queue.get()
+                if status is None:
+                    return
+                # Terminal statuses travel with /complete
+                if status.status in ("done", "error"):
+                    continue
+                try:
+                    session.post(f"{self.url}/status", json={"lease": lease_id, "status": asdict(status)}, timeout=10)
+                except requests.RequestException:
+                    pass
+
+        threads = [threading.Thread(target=heartbeat, daemon=True), threading.Thread(target=forward, daemon=True)]
+        for t in threads:
+            t.start()
+
+        args = _worker_args(self.args, lease["format"])
+        try:
+            status = self.make_runner(args, status_queue).run_task(task)
+        except Exception as e:
+            log.exception(f"❌ Exception in {task.plugin}: {e}")
+            status = PluginStatus(task.plugin, "error", 1.0, 0.0, 0.0, image=task.image_id)
+        finally:
+            stop.set()
+            status_queue.put(None)
+
+        try:
+            if scratch:
+                output_dir = os.path.join(scratch, task.plugin)
+                for name in sorted(os.listdir(output_dir)) if os.path.isdir(output_dir) else []:
+                    with open(os.path.join(output_dir, name), "rb") as f:
+                        session.put(f"{self.url}/upload", params={"lease": lease_id, "name": name}, data=f, timeout=None)
+            session.post(f"{self.url}/complete", json={"lease": lease_id, "status": asdict(status)}, timeout=30)
+        except requests.RequestException as e:
+            log.error(f"❌ Could not report {task.plugin} back to the coordinator: {e}")
+        finally:
+            if scratch:
+                shutil.rmtree(scratch, ignore_errors=True)
+
+
+def _worker_args(args, fmt):
+    """Copies the worker's CLI args, taking the output format from the coordinator."""
+    worker_args = copy.copy(args)
+    worker_args.format = fmt
+    return worker_args
+
+
+def run_worker(args):
+    Worker(args.worker, args).run()
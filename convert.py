@@ -0,0 +1,299 @@
+import os
+import re
+import json
+import struct
+import logging
+from streaming import open_output, strip_compression, CHUNK_SIZE
+
+log = logging.getLogger("AutoVol")
+
+NDJSON_EXT = "ndjson"
+COLUMNS_SUFFIX = ".columns"
+SCHEMA_FILE = "schema.json"
+_WHITESPACE = re.compile(r"[ \t\r\n]*")
+_NUMBER_CHARS = set("0123456789.eE+-")
+
+
+class _Reader:
+    """Pull parser over a text stream that keeps only a sliding window of it in memory."""
+
+    def __init__(self, fh, chunk_size=CHUNK_SIZE):
+        self.fh = fh
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        if self.eof:
+            return False
+        chunk = self.fh.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop what has been consumed so the window stays about one chunk long
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def next(self):
+        char = self.peek()
+        self.pos += 1
+        return char
+
+    def expect(self, char):
+        found = self.next()
+        if found != char:
+            raise ValueError(f"expected {char!r} but found {found!r} in JSON stream")
+
+    def whole_object(self):
+        """Decodes the object starting here if all of it is already in the window, else returns None."""
+        if len(self.buf) - self.pos < self.chunk_size:
+            self._fill()
+        try:
+            value, end = self.decoder.raw_decode(self.buf, self.pos)
+        except json.JSONDecodeError:
+            return None
+        self.pos = end
+        return value
+
+    def value(self):
+        """Decodes one complete JSON value, reading more input until it is whole."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # A number cut off by the end of the window ("26", "2600.") may continue in the next chunk
+                if self.eof or (end < len(self.buf) and self.buf[end] not in _NUMBER_CHARS):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            if not self._fill() and not self.eof:
+                raise ValueError("truncated JSON stream")
+
+
+def iter_json_rows(fh, chunk_size=CHUNK_SIZE):
+    """Yields Volatility JSON TreeGrid rows one at a time with __id/__parent/__depth, dropping __children.
+
+    Memory stays bounded by one chunk plus the open rows on the current tree
+    path, however large the output. __id follows document order; a row is
+    yielded once its object closes, so children come before their parent.
+    """
+    reader = _Reader(fh, chunk_size)
+    counter = [0]
+
+    def rows(parent, depth):
+        reader.expect("[")
+        if reader.peek() == "]":
+            reader.next()
+            return
+        while True:
+            yield from row(parent, depth)
+            separator = reader.next()
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError(f"unexpected {separator!r} in JSON array")
+
+    def tree(node, parent, depth):
+        counter[0] += 1
+        row_id = counter[0]
+        for child in node.pop("__children", None) or []:
+            yield from tree(child, row_id, depth + 1)
+        node["__id"], node["__parent"], node["__depth"] = row_id, parent, depth
+        yield node
+
+    def row(parent, depth):
+        if reader.peek() == "{":
+            # Fast path: rows (and small subtrees) that fit in the window are decoded in C
+            node = reader.whole_object()
+            if node is not None:
+                yield from tree(node, parent, depth)
+                return
+        counter[0] += 1
+        row_id = counter[0]
+        values = {}
+        reader.expect("{")
+        if reader.peek() == "}":
+            reader.next()
+        else:
+            while True:
+                key = reader.value()
+                reader.expect(":")
+                if key == "__children" and reader.peek() == "[":
+                    yield from rows(row_id, depth + 1)
+                else:
+                    values[key] = reader.value()
+                separator = reader.next()
+                if separator == "}":
+                    break
+                if separator != ",":
+                    raise ValueError(f"unexpected {separator!r} in JSON object")
+        values["__id"], values["__parent"], values["__depth"] = row_id, parent, depth
+        yield values
+
+    first = reader.peek()
+    if first == "[":
+        yield from rows(None, 0)
+    elif first == "{":
+        yield from row(None, 0)
+    elif first:
+        raise ValueError(f"unexpected {first!r} at start of JSON output")
+
+
+def ndjson_path(json_path):
+    """windows.pslist.PsList.json.zst -> windows.pslist.PsList.ndjson.zst"""
+    plain = strip_compression(json_path)
+    return re.sub(r"\.json$", f".{NDJSON_EXT}", plain) + json_path[len(plain):]
+
+
+def to_ndjson(json_path, out_path=None, level=None):
+    """Streams a plugin's JSON output into newline-delimited flat rows; returns (path, rows, column types)."""
+    out_path = out_path or ndjson_path(json_path)
+    types = {}
+    count = 0
+    with open_output(json_path, "rt", encoding="utf-8") as src, \
+            open_output(out_path, "wt", level, encoding="utf-8") as dst:
+        for values in iter_json_rows(src):
+            for key, value in values.items():
+                if value is not None:
+                    types.setdefault(key, set()).add(_kind(value))
+                else:
+                    types.setdefault(key, set())
+            dst.write(json.dumps(values) + "\n")
+            count += 1
+    return out_path, count, {key: _column_type(kinds) for key, kinds in types.items()}
+
+
+def _kind(value):
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int64" if -2 ** 63 <= value < 2 ** 63 else "string"
+    if isinstance(value, float):
+        return "float64"
+    return "string"
+
+
+def _column_type(kinds):
+    if not kinds:
+        return "string"
+    if len(kinds) == 1:
+        return next(iter(kinds))
+    if kinds <= {"int64", "float64"}:
+        return "float64"
+    return "string"
+
+
+def _string(value):
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+class _ColumnWriter:
+    """One column: a validity byte per row plus fixed-width values, or offsets + UTF-8 bytes for strings."""
+
+    FORMATS = {"int64": "<q", "float64": "<d", "bool": "<?"}
+
+    def __init__(self, directory, index, name, col_type):
+        self.name = name
+        self.type = col_type
+        self.base = f"c{index:03d}"
+        self.valid = open(os.path.join(directory, f"{self.base}.valid"), "wb")
+        self.data = open(os.path.join(directory, f"{self.base}.data"), "wb")
+        self.offsets = None
+        self.offset = 0
+        if col_type == "string":
+            self.offsets = open(os.path.join(directory, f"{self.base}.offsets"), "wb")
+            self.offsets.write(struct.pack("<Q", 0))
+        else:
+            self.pack = struct.Struct(self.FORMATS[col_type]).pack
+
+    def append(self, value):
+        self.valid.write(b"\x00" if value is None else b"\x01")
+        if self.offsets is not None:
+            encoded = b"" if value is None else _string(value).encode("utf-8")
+            self.data.write(encoded)
+            self.offset += len(encoded)
+            self.offsets.write(struct.pack("<Q", self.offset))
+        elif value is None:
+            self.data.write(self.pack(0))
+        else:
+            self.data.write(self.pack(float(value) if self.type == "float64" else value))
+
+    def close(self):
+        for f in (self.valid, self.data, self.offsets):
+            if f:
+                f.close()
+
+    def schema(self):
+        files = {"valid": f"{self.base}.valid", "data": f"{self.base}.data"}
+        if self.offsets is not None:
+            files["offsets"] = f"{self.base}.offsets"
+        return {"name": self.name, "type": self.type, "files": files}
+
+
+def to_columnar(ndjson_file, types, directory):
+    """Second pass: rewrites NDJSON rows as one set of binary files per column plus schema.json.
+
+    int64/float64/bool columns are little-endian fixed-width arrays; string
+    columns are a uint64 offsets array (rows + 1 entries) into UTF-8 data.
+    Every column has a .valid file with one byte per row (0 = null), so each
+    file maps directly onto e.g. numpy.fromfile.
+    """
+    os.makedirs(directory, exist_ok=True)
+    writers = [_ColumnWriter(directory, i, name, col_type) for i, (name, col_type) in enumerate(types.items())]
+    count = 0
+    try:
+        with open_output(ndjson_file, "rt", encoding="utf-8") as src:
+            for line in src:
+                values = json.loads(line)
+                for writer in writers:
+                    writer.append(values.get(writer.name))
+                count += 1
+    finally:
+        for writer in writers:
+            writer.close()
+    schema = {"format": "autovol-columnar", "version": 1, "rows": count, "columns": [w.schema() for w in writers]}
+    with open(os.path.join(directory, SCHEMA_FILE), "w", encoding="utf-8") as f:
+        json.dump(schema, f, indent=1)
+    return directory
+
+
+def convert_output(json_path, columnar=False, level=None):
+    """Post-processes one plugin JSON output into NDJSON (and optionally columnar files)."""
+    ndjson_file, count, types = to_ndjson(json_path, level=level)
+    log.info(f"🧾 Flattened {count} rows of {os.path.basename(json_path)} into {os.path.basename(ndjson_file)}")
+    if columnar:
+        directory = strip_compression(ndjson_file)[:-len(NDJSON_EXT) - 1] + COLUMNS_SUFFIX
+        to_columnar(ndjson_file, types, directory)
+        log.info(f"🧱 Wrote {len(types)} columns to {directory}")
+    return ndjson_file
+
+
+def conversion_requested(args):
+    return getattr(args, "ndjson", False) or getattr(args, "columnar", False)
+
+
+def convert_for_args(args, json_path):
+    """Runs the --ndjson/--columnar post-processing for one finished JSON output."""
+    return safe_convert(json_path, getattr(args, "columnar", False), getattr(args, "compress_level", None))
+
+
+def safe_convert(json_path, columnar=False, level=None):
+    """Converts, logging instead of raising so a bad file never fails the run."""
+    try:
+        return convert_output(json_path, columnar, level)
+    except (OSError, ValueError) as e:
+        log.warning(f"⚠️ Could not convert {json_path}: {e}")
+        return None
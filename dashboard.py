@@ -1,9 +1,94 @@
+import time
+import queue
+import threading
 from textual.app import App, ComposeResult
-from textual.widgets import Header, Footer, DataTable
-from textual.reactive import reactive
-from textual.containers import Vertical
-from rich.table import Table
-from time import sleep
+from textual.message import Message
+from textual.widgets import Header, Footer, DataTable, Static
+from events import TaskQueued, TaskStarted, TaskProgress, TaskFinished, TaskFailed
+from progress import STALL_SECONDS, format_duration
+
+COLUMNS = [
+    ("Plugin", "plugin"),
+    ("Status", "status"),
+    ("Progress", "progress"),
+    ("Stage", "stage"),
+    ("ETA", "eta"),
+    ("Peak Memory (MB)", "memory"),
+    ("CPU (%)", "cpu"),
+    ("Wall (s)", "wall"),
+    ("Exit", "exit"),
+]
+
+
+class TaskEvents(Message):
+    """A coalesced batch of executor events, newest per task."""
+
+    def __init__(self, events):
+        super().__init__()
+        self.events = events
+
+
+class EventBridge(threading.Thread):
+    """Collects events from worker threads and posts them to the app in batches.
+
+    Each batch holds only the newest event per task, so a burst of thousands
+    of updates costs one message and at most one table update per row.
+    """
+
+    def __init__(self, app, interval=0.1):
+        super().__init__(daemon=True)
+        self.app = app
+        self.interval = interval
+        self.queue = queue.SimpleQueue()
+
+    def push(self, event):
+        self.queue.put(event)
+
+    def run(self):
+        while True:
+            events = [self.queue.get()]
+            time.sleep(self.interval)  # let the rest of the burst arrive
+            while True:
+                try:
+                    events.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            latest = {}
+            for event in events:
+                latest[event.key] = event
+            self.app.post_message(TaskEvents(list(latest.values())))
+
+
+def drain(status_queue):
+    """Discards everything put on an executor's status queue."""
+    while True:
+        status_queue.get()
+
+
+def row_cells(event, previous=None):
+    """Table cells for a task's newest event, keeping earlier values where it has none."""
+    cells = dict(previous or {})
+    if isinstance(event, TaskQueued):
+        cells.update(status="queued", progress="0%")
+    elif isinstance(event, TaskStarted):
+        cells.update(status="running")
+    elif isinstance(event, TaskProgress):
+        cells.update(status="running", progress=f"{event.progress:.0%}", stage=event.stage,
+                     eta=format_duration(event.eta))
+    elif isinstance(event, (TaskFinished, TaskFailed)):
+        status = event.status
+        cells.update(
+            status=status.status,
+            progress=f"{status.progress:.0%}",
+            stage="",
+            eta="",
+            memory=f"{status.memory_used_mb:.2f}",
+            cpu=f"{status.cpu_used_percent:.2f}",
+            wall=f"{status.wall_time:.1f}",
+            exit="" if status.exit_code is None else str(status.exit_code),
+        )
+    return cells
+
 
 class VolDashboard(App):
     CSS_PATH = None
@@ -13,28 +98,72 @@ class VolDashboard(App):
         super().__init__(**kwargs)
         self.executor = executor
         self.table = None
+        self.summary = None
+        self.rows = {}
+        # Running task key -> monotonic time of its last event, to spot stalls
+        self.running = {}
+        self.started_at = time.monotonic()
 
     def compose(self) -> ComposeResult:
         yield Header()
+        self.summary = Static("")
+        yield self.summary
         self.table = DataTable()
         yield self.table
         yield Footer()
 
     def on_mount(self):
-        self.table.add_columns("Plugin", "Status", "Progress", "Memory (MB)", "CPU (%)")
-        self.status_queue = self.executor.execute_with_status()
-        self.set_interval(0.5, self.update_status)
-
-    def update_status(self):
-        while not self.status_queue.empty():
-            status = self.status_queue.get_nowait()
-            self.table.add_row(
-                status.name,
-                status.status,
-                f"{status.progress:.0%}",
-                f"{status.memory_used_mb:.2f}",
-                f"{status.cpu_used_percent:.2f}"
-            )
+        for label, key in COLUMNS:
+            self.table.add_column(label, key=key)
+        bridge = EventBridge(self)
+        bridge.start()
+        self.executor.events.subscribe(bridge.push)
+        status_queue = self.executor.execute_with_status()
+        # The table is fed from events; nobody else reads the status queue, so keep it from growing all run
+        threading.Thread(target=drain, args=(status_queue,), daemon=True).start()
+        self.set_interval(1.0, self.update_summary)
+        self.set_interval(5.0, self.flag_stalls)
+
+    def on_task_events(self, message):
+        for event in message.events:
+            key = event.key
+            previous = self.rows.get(key)
+            cells = row_cells(event, previous)
+            cells["plugin"] = key
+            if previous is None:
+                self.table.add_row(*(cells.get(column, "") for _, column in COLUMNS), key=key)
+            else:
+                for column, value in cells.items():
+                    if previous.get(column) != value:
+                        self.table.update_cell(key, column, value)
+            self.rows[key] = cells
+            if cells["status"] == "running":
+                self.running[key] = time.monotonic()
+            else:
+                self.running.pop(key, None)
+        self.update_summary()
+
+    def flag_stalls(self):
+        now = time.monotonic()
+        for key, last in self.running.items():
+            if now - last > STALL_SECONDS:
+                cell = f"no progress for {format_duration(now - last)}"
+                self.table.update_cell(key, "eta", cell)
+                self.rows[key]["eta"] = cell
+
+    def update_summary(self):
+        counts = {}
+        for cells in self.rows.values():
+            counts[cells.get("status")] = counts.get(cells.get("status"), 0) + 1
+        finished = sum(n for status, n in counts.items() if status not in ("queued", "running"))
+        elapsed = time.monotonic() - self.started_at
+        self.summary.update(
+            f"✅ {counts.get('done', 0)} done  ❌ {finished - counts.get('done', 0)} failed  "
+            f"▶ {counts.get('running', 0)} running  ⏳ {counts.get('queued', 0)} queued  "
+            f"| {finished}/{len(self.rows)} complete | {finished / max(elapsed, 1e-6) * 60:.1f} plugins/min "
+            f"| {elapsed / 60:.1f} min elapsed"
+        )
+
 
 def run_dashboard(executor):
     VolDashboard(executor).run()
@@ -0,0 +1,238 @@
+import os
+import io
+import json
+import html
+import logging
+import datetime
+import threading
+from streaming import open_output
+
+try:
+    import volatility3.plugins
+    import volatility3.symbols
+    from volatility3 import framework
+    from volatility3.framework import constants
+    from volatility3.framework import automagic, contexts, interfaces, plugins, renderers
+    from volatility3.framework.configuration import requirements
+    from volatility3.framework.renderers import format_hints
+    HAS_VOLATILITY = True
+except ImportError:
+    HAS_VOLATILITY = False
+
+log = logging.getLogger("AutoVol")
+
+# Cheap plugins whose construction resolves the kernel layer/symbols for each OS
+BOOTSTRAP_PLUGINS = {
+    "windows": "windows.info.Info",
+    "linux": "linux.pslist.PsList",
+    "mac": "mac.pslist.PsList",
+}
+
+
+def _file_handler(output_dir):
+    """Builds a Volatility file handler class that saves plugin dumps into output_dir."""
+
+    class AutoVolFileHandler(io.BytesIO, interfaces.plugins.FileHandlerInterface):
+        def __init__(self, filename):
+            io.BytesIO.__init__(self)
+            interfaces.plugins.FileHandlerInterface.__init__(self, filename)
+
+        def close(self):
+            if self.closed:
+                return
+            os.makedirs(output_dir, exist_ok=True)
+            base = self.sanitize_filename(self.preferred_filename)
+            name, counter = base, 1
+            while os.path.exists(os.path.join(output_dir, name)):
+                name = f"{base}-{counter}"
+                counter += 1
+            with open(os.path.join(output_dir, name), "wb") as f:
+                f.write(self.getvalue())
+            self.preferred_filename = name
+            super().close()
+
+    return AutoVolFileHandler
+
+
+def format_value(value):
+    """Converts a TreeGrid cell into a JSON-serialisable value."""
+    if HAS_VOLATILITY and isinstance(value, interfaces.renderers.BaseAbsentValue):
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex(" ")
+    if isinstance(value, (bool, int, float, str)) or value is None:
+        return value
+    return str(value)
+
+
+def _text_value(value):
+    if HAS_VOLATILITY and isinstance(value, interfaces.renderers.BaseAbsentValue):
+        return "N/A" if isinstance(value, renderers.NotApplicableValue) else "-"
+    if HAS_VOLATILITY and isinstance(value, format_hints.Hex):
+        return hex(value)
+    value = format_value(value)
+    return "" if value is None else str(value)
+
+
+class TreeGridWriter:
+    """Streams TreeGrid rows to a file in AutoVol's txt/json/html layouts."""
+
+    def __init__(self, fmt, fh):
+        self.fmt = fmt
+        self.fh = fh
+        self.columns = []
+        self.depth = 0
+        self.first = [True]
+        self.rows = 0
+
+    def begin(self, columns):
+        self.columns = list(columns)
+        if self.fmt == "json":
+            self.fh.write("[")
+        elif self.fmt == "html":
+            header = "".join(f"<th>{html.escape(c)}</th>" for c in self.columns)
+            self.fh.write(f"<html><body><table border=\"1\">\n<tr>{header}</tr>\n")
+        else:
+            self.fh.write("\t".join(self.columns) + "\n\n")
+
+    def row(self, depth, values):
+        self.rows += 1
+        if self.fmt == "json":
+            # Close any deeper siblings before opening this node
+            while self.depth >= depth:
+                self.fh.write("]}")
+                self.first.pop()
+                self.depth -= 1
+            if not self.first[-1]:
+                self.fh.write(",")
+            self.first[-1] = False
+            node = {c: format_value(v) for c, v in zip(self.columns, values)}
+            self.fh.write(json.dumps(node, sort_keys=True)[:-1] + ', "__children": [')
+            self.first.append(True)
+            self.depth = depth
+        elif self.fmt == "html":
+            cells = "".join(f"<td>{html.escape(_text_value(v))}</td>" for v in values)
+            indent = "&nbsp;" * 4 * (depth - 1)
+            self.fh.write(f"<tr>{cells.replace('<td>', '<td>' + indent, 1)}</tr>\n")
+        else:
+            prefix = "*" * (depth - 1) + (" " if depth > 1 else "")
+            self.fh.write(prefix + "\t".join(_text_value(v) for v in values) + "\n")
+
+    def end(self):
+        if self.fmt == "json":
+            self.fh.write("]}" * self.depth + "]\n")
+            self.depth = 0
+        elif self.fmt == "html":
+            self.fh.write("</table></body></html>\n")
+
+
+class VolatilityEngine:
+    """Drives volatility3.framework directly, sharing one context per image.
+
+    The kernel layer, symbol tables and module are resolved once by a bootstrap
+    plugin; every later plugin has its layer/symbol/module requirements pointed
+    at those objects so automagic has nothing left to scan.
+    """
+
+    def __init__(self, memfile, os_hint=None, symbol_dir=None):
+        if not HAS_VOLATILITY:
+            raise RuntimeError("❌ volatility3 is not importable; install it or use --engine subprocess")
+        if symbol_dir:
+            # Same effect as vol.py -s
+            volatility3.symbols.__path__ = [os.path.abspath(symbol_dir)] + constants.SYMBOL_BASEPATHS
+        framework.require_interface_version(2, 0, 0)
+        failures = framework.import_files(volatility3.plugins, True)
+        if failures:
+            log.debug(f"Volatility plugins that failed to load: {', '.join(sorted(failures))}")
+        self.plugin_list = framework.list_plugins()
+        self.context = contexts.Context()
+        self.context.config["automagic.LayerStacker.single_location"] = \
+            requirements.URIRequirement.location_from_file(memfile)
+        self.automagics = automagic.available(self.context)
+        self.os_hint = os_hint
+        self.shared = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _config_path(plugin_name):
+        # Plugins are keyed by their full dotted name so windows/linux PsList never collide
+        return interfaces.configuration.path_join("plugins", *plugin_name.split(".")[:-1])
+
+    def _prime(self, plugin_cls, base_config_path):
+        """Points a plugin's layer/symbol/module requirements at already-built objects."""
+        plugin_path = interfaces.configuration.path_join(base_config_path, plugin_cls.__name__)
+        for req in plugin_cls.get_requirements():
+            path = interfaces.configuration.path_join(plugin_path, req.name)
+            if self.context.config.get(path) is not None:
+                continue
+            if isinstance(req, requirements.ModuleRequirement) and "module" in self.shared:
+                self.context.config[path] = self.shared["module"]
+            elif isinstance(req, requirements.TranslationLayerRequirement) and "layer" in self.shared:
+                self.context.config[path] = self.shared["layer"]
+            elif isinstance(req, requirements.SymbolTableRequirement) and "symbols" in self.shared:
+                self.context.config[path] = self.shared["symbols"]
+
+    def _harvest(self, constructed):
+        """Remembers the kernel objects resolved while constructing a plugin."""
+        if "module" in self.shared:
+            return
+        for req in constructed.get_requirements():
+            value = constructed.config.get(req.name)
+            if not isinstance(value, str):
+                continue
+            if isinstance(req, requirements.ModuleRequirement) and value in self.context.modules:
+                module = self.context.modules[value]
+                self.shared.update(module=value, layer=module.layer_name, symbols=module.symbol_table_name)
+            elif isinstance(req, requirements.TranslationLayerRequirement) and value in self.context.layers:
+                self.shared.setdefault("layer", value)
+
+    def construct(self, plugin_name, output_dir=None, progress=None):
+        plugin_cls = self.plugin_list.get(plugin_name)
+        if plugin_cls is None:
+            raise KeyError(f"Unknown Volatility plugin: {plugin_name}")
+        base_config_path = self._config_path(plugin_name)
+        self._prime(plugin_cls, base_config_path)
+        chosen = automagic.choose_automagic(self.automagics, plugin_cls)
+        constructed = plugins.construct_plugin(
+            self.context, chosen, plugin_cls, base_config_path, progress,
+            _file_handler(output_dir) if output_dir else None,
+        )
+        self._harvest(constructed)
+        return constructed
+
+    def prepare(self):
+        """Resolves the kernel once using the bootstrap plugin for the image's OS."""
+        candidates = [self.os_hint] if self.os_hint in BOOTSTRAP_PLUGINS else list(BOOTSTRAP_PLUGINS)
+        for os_name in candidates:
+            try:
+                with self.lock:
+                    self.construct(BOOTSTRAP_PLUGINS[os_name])
+                log.info(f"🧠 In-process engine resolved {os_name} kernel: {self.shared.get('symbols')}")
+                return os_name
+            except Exception as e:
+                log.debug(f"Bootstrap {BOOTSTRAP_PLUGINS[os_name]} failed: {e}")
+        log.warning("⚠️ Could not resolve a kernel up front; each plugin will run its own automagic.")
+        return None
+
+    def run_plugin(self, plugin_name, out_file, fmt="txt", progress=None, level=None):
+        """Runs one plugin against the shared context and writes its TreeGrid to out_file.
+
+        progress, if given, is called with (fraction, stage) as Volatility reports it.
+        """
+        callback = (lambda percent, stage: progress(percent / 100.0, stage)) if progress else None
+        with self.lock:
+            constructed = self.construct(plugin_name, os.path.dirname(out_file), callback)
+            grid = constructed.run()
+            with open_output(out_file, "wt", level, encoding="utf-8") as f:
+                writer = TreeGridWriter(fmt, f)
+                writer.begin([c.name for c in grid.columns])
+
+                def visitor(node, accumulator):
+                    writer.row(node.path_depth, node.values)
+                    return accumulator
+
+                grid.populate(visitor, None)
+                writer.end()
+            return writer.rows
@@ -0,0 +1,70 @@
+import time
+import logging
+import threading
+from dataclasses import dataclass, field
+from utils import PluginStatus
+
+log = logging.getLogger("AutoVol")
+
+
+@dataclass
+class TaskEvent:
+    plugin: str
+    image: str = ""
+    time: float = field(default_factory=time.time)
+
+    @property
+    def key(self):
+        return f"{self.image}/{self.plugin}" if self.image else self.plugin
+
+
+@dataclass
+class TaskQueued(TaskEvent):
+    pass
+
+
+@dataclass
+class TaskStarted(TaskEvent):
+    worker: str = ""
+
+
+@dataclass
+class TaskProgress(TaskEvent):
+    progress: float = 0.0
+    stage: str = ""
+    eta: float = None
+
+
+@dataclass
+class TaskFinished(TaskEvent):
+    status: PluginStatus = None
+
+
+@dataclass
+class TaskFailed(TaskEvent):
+    status: PluginStatus = None
+
+
+def status_event(status):
+    """Wraps a final PluginStatus in TaskFinished or TaskFailed."""
+    cls = TaskFinished if status.status == "done" else TaskFailed
+    return cls(status.name, status.image, status=status)
+
+
+class EventBus:
+    """Fans executor events out to listeners; emit() is safe to call from any thread."""
+
+    def __init__(self):
+        self.listeners = []
+        self.lock = threading.Lock()
+
+    def subscribe(self, listener):
+        with self.lock:
+            self.listeners = self.listeners + [listener]
+
+    def emit(self, event):
+        for listener in self.listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                log.warning(f"⚠️ Event listener failed on {type(event).__name__}: {e}")
@@ -4,84 +4,303 @@ import queue
 import threading
 import logging
 import psutil
+import tracing
 from subprocess import Popen, PIPE
 from utils import (
     get_plugins,
     detect_profile_and_kdbg,
+    config_profile_and_kdbg,
+    write_volatility_config,
     download_and_extract_symbols,
     PluginStatus,
+    PluginTask,
 )
+from engine import VolatilityEngine
+from capabilities import CapabilityIndex
+from scheduler import RuntimeHistory, Scheduler, TaskPool, estimate_eta
+from convert import conversion_requested, convert_for_args
+from streaming import OutputWriter, StderrTail, copy_stream, compressed_path, strip_compression
+from metrics import MetricsLog, ProcessTreeSampler, wait_with_rusage
+from store import ResultStore
+from manifest import RunManifest
+from isfstore import case_symbols_for
+from osdetect import guess_os
+from forkserver import start_forkserver
+from events import EventBus, TaskQueued, TaskStarted, TaskProgress, status_event
+from scanner import SCAN_NAME, scan_requested, scan_for_args, plugin_arguments, without_raw_scans
 
 log = logging.getLogger("AutoVol")
 
+PROGRESS_INTERVAL = 0.5
+
+
+def task_key(task):
+    return f"{task.image_id}/{task.plugin}" if task.image_id else task.plugin
+
+
+class ProgressReporter:
+    """Publishes a running task's (fraction, stage) updates with an ETA, at most every interval seconds."""
+
+    def __init__(self, task, status_queue=None, events=None, history=None, interval=PROGRESS_INTERVAL):
+        self.task = task
+        self.status_queue = status_queue
+        self.events = events
+        self.interval = interval
+        self.expected = history.estimate(task.plugin, task.image_size) if history else None
+        self.started = time.monotonic()
+        self.last = 0.0
+        self.stage = None
+
+    def __call__(self, fraction, stage=""):
+        now = time.monotonic()
+        # A new stage always gets through so short stages are not hidden
+        if stage == self.stage and now - self.last < self.interval:
+            return
+        self.stage, self.last = stage, now
+        elapsed = now - self.started
+        eta = estimate_eta(elapsed, fraction, self.expected)
+        task = self.task
+        if self.status_queue:
+            self.status_queue.put(PluginStatus(task.plugin, "running", fraction, 0.0, 0.0, elapsed,
+                                               image=task.image_id, stage=stage, eta=eta))
+        if self.events:
+            self.events.emit(TaskProgress(task.plugin, task.image_id, progress=fraction, stage=stage, eta=eta))
+
 
 class PluginRunner(threading.Thread):
-    def __init__(self, queue, args, status_queue=None, profile=None, kdbg=None):
+    def __init__(self, queue, args, status_queue=None, profile=None, kdbg=None, capabilities=None,
+                 history=None, metrics_log=None, store=None, manifest=None, events=None, forkserver=None):
         super().__init__()
         self.queue = queue
         self.args = args
+        self.forkserver = forkserver
         self.status_queue = status_queue
         self.profile = profile
         self.kdbg = kdbg
+        self.capabilities = capabilities
+        self.history = history
+        self.metrics_log = metrics_log
+        self.store = store
+        self.manifest = manifest
+        self.events = events
+
+    def run(self):
+        while True:
+            task = self.queue.get()
+            if task is None:  # one sentinel per worker marks the end of the work
+                self.queue.task_done()
+                break
+            tracing.end_async("queue wait", task_key(task), plugin=task.plugin)
+
+            try:
+                self.run_task(task)
+            except Exception as e:
+                log.exception(f"❌ Exception in {task.plugin}: {e}")
+            finally:
+                self.queue.task_done()
+
+    def prepare(self, task):
+        """Returns (cmd, out_file) for a task, or None if Volatility cannot load the plugin."""
+        plugin = task.plugin
+        output_dir = os.path.join(task.directory, plugin)
+        os.makedirs(output_dir, exist_ok=True)
+
+        if self.capabilities and not self.capabilities.is_available(plugin):
+            log.error(f"❌ Plugin {plugin} could not be loaded by Volatility (missing dependency?). Skipping.")
+            return None
+
+        cmd = [self.args.volatility_path]
+        if task.symbol_dir:
+            cmd += ["-s", task.symbol_dir]
+        # Reuse the kernel layer/offset/symbols resolved by the config pre-flight
+        if task.config_path:
+            cmd += ["-c", task.config_path]
+
+        renderer = None
+        if self.args.format != "txt":
+            renderer = self.capabilities.renderer_for(self.args.format) if self.capabilities else None
+            if renderer:
+                cmd += ["-r", renderer]
+            else:
+                log.warning(f"⚠️ Volatility has no {self.args.format} renderer for {plugin}. Falling back to raw text.")
+
+        cmd += ["-f", task.image, plugin] + plugin_arguments(plugin, self.args, task.directory)
+
+        out_ext = self.args.format if renderer else "txt"
+        out_file = os.path.join(output_dir, f"{plugin}.{out_ext}")
+        return cmd, compressed_path(out_file, getattr(self.args, "compress", "none"))
+
+    def open_writer(self, out_file):
+        return OutputWriter(out_file, getattr(self.args, "compress_level", None))
+
+    def progress_reporter(self, task):
+        return ProgressReporter(task, self.status_queue, self.events, self.history)
+
+    def started(self, task):
+        if self.events:
+            self.events.emit(TaskStarted(task.plugin, task.image_id, worker=self.name))
+
+    def publish(self, status):
+        if self.status_queue:
+            self.status_queue.put(status)
+        if self.events:
+            self.events.emit(status_event(status))
+        return status
+
+    def finish(self, task, out_file, metrics, writer, stderr_text):
+        """Logs, records and publishes a finished plugin process; returns its PluginStatus."""
+        with tracing.span("finish"):
+            return self._finish(task, out_file, metrics, writer, stderr_text)
+
+    def _finish(self, task, out_file, metrics, writer, stderr_text):
+        plugin = task.plugin
+        status_args = (metrics.peak_rss_mb, metrics.cpu_percent, metrics.wall_time, metrics.exit_code)
+
+        if metrics.exit_code != 0:
+            log.error(f"❌ Plugin {plugin} failed with error:\n{stderr_text}")
+            status = PluginStatus(plugin, "error", 1.0, *status_args, image=task.image_id,
+                                  output_bytes=writer.bytes_written)
+        else:
+            stored = ""
+            if out_file != strip_compression(out_file):
+                stored = f" ({writer.stored_bytes / (1024 * 1024):.2f}MB stored)"
+            log.info(f"✅ Completed {plugin} | WALL: {metrics.wall_time:.2f}s | CPU: {metrics.cpu_time:.2f}s | "
+                     f"PEAK: {metrics.peak_rss_mb:.2f}MB | "
+                     f"OUT: {writer.bytes_written / (1024 * 1024):.2f}MB, {writer.lines} lines{stored}")
+            status = PluginStatus(plugin, "done", 1.0, *status_args, image=task.image_id,
+                                  output_bytes=writer.bytes_written)
+            if self.store and strip_compression(out_file).endswith(".json"):
+                # Ingest as each plugin finishes so the database is queryable mid-run
+                with tracing.span("ingest"):
+                    self.store.safe_ingest(plugin, out_file, task.image_id)
+            if conversion_requested(self.args) and strip_compression(out_file).endswith(".json"):
+                with tracing.span("convert"):
+                    convert_for_args(self.args, out_file)
+
+        if self.metrics_log:
+            self.metrics_log.write(metrics, image=task.image_id, output_bytes=writer.bytes_written,
+                                   output_lines=writer.lines, stored_bytes=writer.stored_bytes)
+
+        if self.history:
+            self.history.record(plugin, task.image_size, metrics.wall_time, metrics.cpu_time,
+                                metrics.peak_rss_mb, metrics.exit_code == 0)
+
+        if self.manifest:
+            with tracing.span("manifest"):
+                self.manifest.record(task, status.status, out_file, writer.checksum)
+
+        return status
+
+    def run_task(self, task):
+        """Runs one plugin task to completion and returns its final PluginStatus."""
+        with tracing.span(task.plugin, phase="task", image=task.image_id):
+            return self._run_task(task)
+
+    def _run_task(self, task):
+        with tracing.span("prepare"):
+            prepared = self.prepare(task)
+        if prepared is None:
+            return self.publish(PluginStatus(task.plugin, "error", 1.0, 0.0, 0.0, image=task.image_id))
+        cmd, out_file = prepared
+
+        log.info(f"🔹 Running plugin: {task.plugin} with command {cmd}")
+        self.started(task)
+
+        with tracing.span("spawn"):
+            proc = None
+            if self.forkserver:
+                # A warm fork server skips the interpreter start and plugin discovery of a fresh vol.py
+                try:
+                    proc = self.forkserver.popen(cmd[1:])
+                except OSError as e:
+                    log.warning(f"⚠️ Fork server unavailable ({e}); starting {task.plugin} as a new process")
+            if proc is None:
+                proc = Popen(cmd, stdout=PIPE, stderr=PIPE)
+        with proc:
+            # Follow the child's whole process tree, not AutoVol itself
+            sampler = ProcessTreeSampler(proc.pid)
+            sampler.start()
+            # Stream stdout to disk; keep only the tail of stderr
+            stderr_tail = StderrTail(proc.stderr, on_progress=self.progress_reporter(task))
+            stderr_tail.start()
+            with tracing.span("execute"):
+                with self.open_writer(out_file) as writer:
+                    copy_stream(proc.stdout, writer)
+            with tracing.span("reap"):
+                rusage = wait_with_rusage(proc)
+                sampler.stop()
+                stderr_tail.join()
+        tracing.add("output write", writer.write_seconds)
+
+        metrics = sampler.result(task.plugin, proc.returncode, rusage)
+        return self.publish(self.finish(task, out_file, metrics, writer, stderr_tail.text()))
+
+
+class InProcessRunner(threading.Thread):
+    """Runs plugins against a shared in-process Volatility context."""
+
+    def __init__(self, queue, args, engine, status_queue=None, store=None, manifest=None, events=None):
+        super().__init__()
+        self.queue = queue
+        self.args = args
+        self.engine = engine
+        self.status_queue = status_queue
+        self.store = store
+        self.manifest = manifest
+        self.events = events
         self.process_info = psutil.Process()
 
     def run(self):
-        while not self.queue.empty():
-            plugin = self.queue.get()
+        while True:
+            task = self.queue.get()
+            if task is None:  # one sentinel per worker marks the end of the work
+                self.queue.task_done()
+                break
 
+            plugin = task.plugin
+            tracing.end_async("queue wait", task_key(task), plugin=plugin)
             try:
-                output_dir = os.path.join(self.args.directory, plugin)
-                os.makedirs(output_dir, exist_ok=True)                    
-
-                cmd = [self.args.volatility_path, "-f", self.args.file, plugin]
-                
-                out_ext = self.args.format if "--output" in cmd else "txt"
-                out_file = os.path.join(output_dir, f"{plugin}.{out_ext}")
-
-
-                # Only add --output if supported
-                if self.args.format != "txt":
-                    help_cmd = [self.args.volatility_path, plugin, "-h"]
-                    try:
-                        proc = Popen(help_cmd, stdout=PIPE, stderr=PIPE)
-                        stdout, _ = proc.communicate()
-                        if b"--output" in stdout:
-                            cmd += ["--output", self.args.format]
-                        else:
-                            log.warning(f"⚠️ Plugin {plugin} does not support --output={self.args.format}. Falling back to raw text.")
-                    except Exception as e:
-                        log.warning(f"Could not check output support for {plugin}: {e}")
-
-
-                # Append auto-detected profile and kdbg if needed
-                # if "windows" in plugin and self.profile:
-                #     cmd += ["--profile", self.profile]
-                # if "windows" in plugin and self.kdbg:
-                #     cmd += ["--kdbg", self.kdbg]
-
-                log.info(f"🔹 Running plugin: {plugin} with command {cmd}")
-                before_cpu = self.process_info.cpu_times()
+                output_dir = os.path.join(task.directory, plugin)
+                os.makedirs(output_dir, exist_ok=True)
+                out_file = compressed_path(os.path.join(output_dir, f"{plugin}.{self.args.format}"),
+                                           getattr(self.args, "compress", "none"))
 
-                with Popen(cmd, stdout=PIPE, stderr=PIPE) as proc:
-                    stdout, stderr = proc.communicate()
+                log.info(f"🔹 Running plugin in-process: {plugin}")
+                if self.events:
+                    self.events.emit(TaskStarted(plugin, task.image_id, worker=self.name))
+                before_cpu = self.process_info.cpu_times()
+                try:
+                    progress = ProgressReporter(task, self.status_queue, self.events)
+                    with tracing.span(plugin, phase="task", image=task.image_id):
+                        rows = self.engine.run_plugin(plugin, out_file, self.args.format, progress,
+                                                      getattr(self.args, "compress_level", None))
+                    error = None
+                except Exception as e:
+                    rows, error = 0, e
 
                 after_cpu = self.process_info.cpu_times()
                 cpu_used = after_cpu.user - before_cpu.user
                 mem_usage = self.process_info.memory_info().rss / (1024 * 1024)  # MB
 
-                # Save output
-                with open(out_file, "w", encoding="utf-8") as f:
-                    f.write(stdout.decode(errors="replace"))
-
-                if proc.returncode != 0:
-                    log.error(f"❌ Plugin {plugin} failed with error:\n{stderr.decode(errors='replace')}")
+                if error is not None:
+                    log.error(f"❌ Plugin {plugin} failed with error:\n{error}")
                     status = PluginStatus(plugin, "error", 1.0, mem_usage, cpu_used)
                 else:
-                    log.info(f"✅ Completed {plugin} | CPU: {cpu_used:.2f}s | MEM: {mem_usage:.2f}MB")
-                    status = PluginStatus(plugin, "done", 1.0, mem_usage, cpu_used)
+                    log.info(f"✅ Completed {plugin} | {rows} rows | CPU: {cpu_used:.2f}s | MEM: {mem_usage:.2f}MB")
+                    status = PluginStatus(plugin, "done", 1.0, mem_usage, cpu_used,
+                                          output_bytes=os.path.getsize(out_file) if os.path.exists(out_file) else 0)
+                    if self.store and self.args.format == "json":
+                        self.store.safe_ingest(plugin, out_file, task.image_id)
+                    if conversion_requested(self.args) and self.args.format == "json":
+                        convert_for_args(self.args, out_file)
+
+                if self.manifest:
+                    self.manifest.record(task, status.status, out_file)
 
                 if self.status_queue:
                     self.status_queue.put(status)
+                if self.events:
+                    self.events.emit(status_event(status))
 
             except Exception as e:
                 log.exception(f"❌ Exception in {plugin}: {e}")
@@ -89,19 +308,100 @@ class PluginRunner(threading.Thread):
                 self.queue.task_done()
 
 
+def profile_skip_reason(console, plugins, guessed_os):
+    """Why windows.info (a full Volatility run) is not needed, or None to run it.
+
+    A -c selection with Windows plugins always runs it, whatever the fast
+    OS guess says; the guess only decides when the plugins follow from it.
+    """
+    if console:
+        if not any(p.startswith("windows.") for p in plugins):
+            return "no Windows plugins selected"
+        return None
+    if guessed_os not in (None, "windows"):
+        return f"the image looks like {guessed_os}"
+    return None
+
+
 class PluginExecutor:
     def __init__(self, args, download_symbols=False):
         self.args = args
-        self.queue = queue.Queue()
         self.status_queue = queue.Queue()
-        self.plugins = get_plugins(args.console)
+        self.events = EventBus()
+        with tracing.span("os detect"):
+            self.os_guess = guess_os(args.file)
+        self.plugins = without_raw_scans(get_plugins(args.console, os_name=self.os_guess.os), args)
 
         self.profile = args.profile
         self.kdbg = None
+        # An explicit -c selection outranks the signature guess
+        selected = {p.split(".")[0] for p in self.plugins} & {"windows", "linux", "mac"}
+        os_name = next(iter(selected)) if args.console and len(selected) == 1 else self.os_guess.os
+        # Only the ISFs this image needs, pulled from the compressed packs in --isf-store
+        with tracing.span("case symbols"):
+            self.symbol_dir = case_symbols_for(args, args.file, args.directory, os_name)
+
+        if download_symbols or getattr(args, "download_symbols", False):
+            log.info("📥 Downloading required Volatility 3 symbols...")
+            download_and_extract_symbols("/opt/volatility3/symbols", getattr(args, "symbols_url", None))
+
+        with tracing.span("capabilities"):
+            self.capabilities = CapabilityIndex.load(args.volatility_path)
+        self.history = RuntimeHistory()
+        self.metrics_log = MetricsLog(args.directory)
+        self.store = self._open_store()
+        self.manifest = RunManifest(args.directory, self.capabilities.version, {"format": args.format})
+        image_size = os.path.getsize(args.file)
+        self.scheduler = Scheduler(self.history, image_size)
+
+        with tracing.span("fingerprint"):
+            fingerprint = self.manifest.fingerprint(args.file)
+        self.config_path = None
+        if getattr(args, "engine", "subprocess") != "inprocess" and getattr(args, "config_handoff", True):
+            self.config_path = write_volatility_config(args.file, args.volatility_path, args.directory,
+                                                       self.symbol_dir, os_name, fingerprint)
+        self._detect_profile(os_name)
 
-        if not self.profile:
-            log.info("🔍 Detecting memory profile and KDBG offset...")
-            self.profile, self.kdbg = detect_profile_and_kdbg(args.file, args.volatility_path)
+        with tracing.span("fork server start"):
+            self.forkserver = start_forkserver(args)
+        self.engine = None
+        if getattr(args, "engine", "subprocess") == "inprocess":
+            log.info("⚙️ Building in-process Volatility context...")
+            os_hint = next((p.split(".")[0] for p in self.plugins if p.split(".")[0] in ("windows", "linux", "mac")), None)
+            with tracing.span("engine prepare"):
+                self.engine = VolatilityEngine(args.file, os_hint, self.symbol_dir)
+                self.engine.prepare()
+
+        self.plugins = self.scheduler.order(self.plugins)
+        self.tasks = self._pending([
+            PluginTask(plugin, args.file, args.directory, image_size=image_size, config_path=self.config_path,
+                       fingerprint=fingerprint, symbol_dir=self.symbol_dir)
+            for plugin in self.plugins
+        ])
+        self.plugins = [task.plugin for task in self.tasks]
+        self.queue = self._make_pool({"": self.scheduler})
+        # (path, output directory, image id, OS hint, symbol dir) for the sharded scan
+        self.images = [(args.file, args.directory, "", os_name, self.symbol_dir)]
+
+        workers = 1 if self.engine else self.args.threads
+        makespan = self.scheduler.predict_makespan(self.plugins, workers)
+        log.info(f"🗓️ {len(self.plugins)} plugins on {workers} worker(s), predicted makespan: {makespan / 60:.1f} min")
+
+    def _detect_profile(self, os_name):
+        """Fills in profile/KDBG, reading the config pre-flight's windows.info output when there is one."""
+        skip = profile_skip_reason(self.args.console, self.plugins, self.os_guess.os)
+        if skip:
+            log.info(f"⏭️ Skipping Windows profile/KDBG detection: {skip}")
+        elif not self.profile:
+            if self.os_guess.os not in (None, "windows"):
+                log.warning(f"⚠️ Windows plugins selected but the image looks like {self.os_guess.os}; "
+                            f"detecting the profile anyway")
+            if self.config_path:
+                self.profile, self.kdbg = config_profile_and_kdbg(self.args.directory)
+            else:
+                log.info("🔍 Detecting memory profile and KDBG offset...")
+                self.profile, self.kdbg = detect_profile_and_kdbg(self.args.file, self.args.volatility_path,
+                                                                  self.symbol_dir)
 
         # if not self.profile:
         #     raise RuntimeError("❌ Profile could not be detected. Use --profile manually to proceed.")
@@ -110,33 +410,74 @@ class PluginExecutor:
         if self.kdbg:
             log.info(f"🎯 Using KDBG offset: {self.kdbg}")
 
-        if download_symbols:
-            log.info("📥 Downloading required Volatility 3 symbols...")
-            download_and_extract_symbols("/opt/volatility3/symbols")
+    def _open_store(self):
+        """Opens the SQLite result store when plugins produce JSON."""
+        if getattr(self.args, "format", "txt") != "json" or not getattr(self.args, "store", True):
+            return None
+        store = ResultStore.open(self.args.directory)
+        log.info(f"🗄️ Ingesting results into {store.path}")
+        return store
 
-    def execute(self):
-        """Run plugins using worker threads"""
-        for plugin in self.plugins:
-            self.queue.put(plugin)
+    def _pending(self, tasks):
+        """Tasks still to run: all of them with --force, otherwise those the manifest lacks."""
+        if getattr(self.args, "force", False):
+            return tasks
+        return self.manifest.pending(tasks)
+
+    def _make_pool(self, schedulers):
+        """Builds the work pool; schedulers maps image id -> Scheduler for memory estimates."""
+        budget = getattr(self.args, "memory_budget", None)
+        if budget:
+            log.info(f"🧮 Admitting plugins against a {budget:.0f}MB memory budget")
+        return TaskPool(budget, lambda task: schedulers[task.image_id].estimate_peak_mb(task.plugin))
+
+    def scan(self):
+        """Runs the parallel sharded regex/YARA scan over every image, before the plugins."""
+        if not scan_requested(self.args):
+            return
+        for path, directory, image_id, os_hint, symbol_dir in self.images:
+            with tracing.span("sharded scan", image=image_id or os.path.basename(path)):
+                hits_file = scan_for_args(self.args, path, directory, os_hint, symbol_dir)
+            if hits_file and self.store:
+                self.store.safe_ingest(SCAN_NAME, hits_file, image_id)
+
+    def _start_workers(self, status_queue):
+        workers = 1 if self.engine else self.args.threads
+        for task in self.tasks:
+            tracing.begin_async("queue wait", task_key(task))
+            self.queue.put(task)
+            self.events.emit(TaskQueued(task.plugin, task.image_id))
+        for _ in range(workers):
+            self.queue.put(None)
 
-        for _ in range(self.args.threads):
-            t = PluginRunner(self.queue, self.args, None, self.profile, self.kdbg)
+        if self.engine:
+            # The shared context is not thread-safe, so a single runner drains the queue
+            t = InProcessRunner(self.queue, self.args, self.engine, status_queue, self.store, self.manifest,
+                                self.events)
+            t.name = "worker-1"
+            t.daemon = True
+            t.start()
+            return
+
+        for number in range(workers):
+            t = PluginRunner(self.queue, self.args, status_queue, self.profile, self.kdbg,
+                             self.capabilities, self.history, self.metrics_log, self.store, self.manifest,
+                             self.events, self.forkserver)
+            # Names the worker's track in --trace output
+            t.name = f"worker-{number + 1}"
             t.daemon = True
             t.start()
             time.sleep(0.1)
 
-        self.queue.join()
+    def execute(self):
+        """Run plugins using worker threads"""
+        with tracing.span("run plugins"):
+            self._start_workers(None)
+            self.queue.join()
         log.info("✅ All plugins completed.")
 
     def execute_with_status(self):
         """Run plugins and return a queue for TUI status updates"""
-        for plugin in self.plugins:
-            self.queue.put(plugin)
-
-        for _ in range(self.args.threads):
-            t = PluginRunner(self.queue, self.args, self.status_queue, self.profile, self.kdbg)
-            t.daemon = True
-            t.start()
-            time.sleep(0.1)
+        self._start_workers(self.status_queue)
 
         return self.status_queue
@@ -0,0 +1,292 @@
+import os
+import sys
+import json
+import time
+import atexit
+import signal
+import socket
+import logging
+import selectors
+import tempfile
+import subprocess
+from types import SimpleNamespace
+
+log = logging.getLogger("AutoVol")
+
+HAS_FORKSERVER = hasattr(os, "fork") and hasattr(socket, "send_fds") and hasattr(socket, "AF_UNIX")
+
+
+class ForkedProcess:
+    """Popen-like handle for a child forked by the server: pid, stdout, stderr, wait(), kill()."""
+
+    def __init__(self, socket_path, argv, cwd=None):
+        out_r, out_w = os.pipe()
+        err_r, err_w = os.pipe()
+        self.conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.conn.connect(socket_path)
+            request = json.dumps({"argv": list(argv), "cwd": cwd or os.getcwd()}).encode() + b"\n"
+            socket.send_fds(self.conn, [request], [out_w, err_w])
+        except OSError:
+            for fd in (out_r, err_r):
+                os.close(fd)
+            self.conn.close()
+            raise
+        finally:
+            os.close(out_w)
+            os.close(err_w)
+        self.stdout = open(out_r, "rb")
+        self.stderr = open(err_r, "rb")
+        self.reader = self.conn.makefile("rb")
+        self.returncode = None
+        self.rusage = None
+        reply = self._receive()
+        if "error" in reply:
+            self._close()
+            raise OSError(f"fork server could not start the plugin: {reply['error']}")
+        self.pid = reply["pid"]
+
+    def _receive(self):
+        line = self.reader.readline()
+        if not line:
+            return {"exit": -signal.SIGKILL, "rusage": None}
+        return json.loads(line)
+
+    def wait(self):
+        if self.returncode is None:
+            reply = self._receive()
+            self.returncode = reply["exit"]
+            if reply.get("rusage"):
+                self.rusage = SimpleNamespace(**reply["rusage"])
+            self.reader.close()
+            self.conn.close()
+        return self.returncode
+
+    def wait_rusage(self):
+        """Exit status plus the child's rusage as measured by the server that reaped it."""
+        self.wait()
+        return self.rusage
+
+    def send_signal(self, sig):
+        if self.returncode is not None:
+            return
+        try:
+            # Children lead their own session, so this reaches anything they spawned too
+            os.killpg(self.pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def terminate(self):
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        self.send_signal(signal.SIGKILL)
+
+    def _close(self):
+        for f in (self.stdout, self.stderr, self.reader, self.conn):
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stdout.close()
+        self.stderr.close()
+        self.wait()
+
+
+class ForkServer:
+    """Starts and talks to the warm server; popen(argv) runs `vol.py <argv>` in a fresh fork.
+
+    The server process imports volatility3 and its plugin registry once, then
+    forks an isolated child per plugin run. Each request hands over the write
+    ends of the caller's stdout/stderr pipes (SCM_RIGHTS), so output and
+    progress stream straight from the child exactly as they would from vol.py.
+    """
+
+    def __init__(self, vol_path):
+        self.directory = tempfile.mkdtemp(prefix="autovol-fork-")
+        self.socket_path = os.path.join(self.directory, "server.sock")
+        started = time.monotonic()
+        # The server exits when its stdin closes, i.e. when AutoVol goes away for any reason
+        self.process = subprocess.Popen([sys.executable, os.path.abspath(__file__), self.socket_path, vol_path],
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        ready = self.process.stdout.readline().decode().strip()
+        if ready != "ready":
+            self.close()
+            raise RuntimeError(f"fork server failed to start: {ready or 'no response'}")
+        log.info(f"🔥 Warm fork server ready in {time.monotonic() - started:.1f}s (volatility3 imported once)")
+        atexit.register(self.close)
+
+    def popen(self, argv, cwd=None):
+        return ForkedProcess(self.socket_path, argv, cwd)
+
+    def close(self):
+        if self.process.poll() is None:
+            self.process.stdin.close()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        for path in (self.socket_path, self.directory):
+            try:
+                os.rmdir(path) if path == self.directory else os.unlink(path)
+            except OSError:
+                pass
+
+
+def start_forkserver(args):
+    """ForkServer for --engine forkserver, or None (with a warning) where it cannot run."""
+    if getattr(args, "engine", "subprocess") != "forkserver":
+        return None
+    if not HAS_FORKSERVER:
+        log.warning("⚠️ The fork server needs fork() and Unix sockets; falling back to one vol.py per plugin")
+        return None
+    try:
+        return ForkServer(args.volatility_path)
+    except (OSError, RuntimeError) as e:
+        log.warning(f"⚠️ {e}; falling back to one vol.py per plugin")
+        return None
+
+
+# --- server side -----------------------------------------------------------------
+
+def _import_volatility(vol_path):
+    """Imports the CLI and every plugin module once, so forked children start warm."""
+    if vol_path.endswith(".py"):
+        sys.path.insert(0, os.path.dirname(os.path.abspath(vol_path)))
+    import volatility3.cli
+    import volatility3.plugins
+    from volatility3 import framework
+    framework.require_interface_version(2, 0, 0)
+    framework.import_files(volatility3.plugins, True)
+    return volatility3.cli
+
+
+def _run_child(cli, request, fds, listener, conns):
+    """In the forked child: become vol.py with the client's pipes as stdout/stderr."""
+    try:
+        listener.close()
+        for conn in conns:
+            conn.close()
+        os.setsid()
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.dup2(fds[0], 1)
+        os.dup2(fds[1], 2)
+        for fd in (devnull, *fds):
+            os.close(fd)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        os.chdir(request["cwd"])
+        sys.argv = ["vol"] + request["argv"]
+        cli.main()
+        code = 0
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except BaseException as e:
+        print(f"fork server child failed: {e!r}", file=sys.stderr)
+        code = 1
+    try:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    finally:
+        os._exit(code)
+
+
+def serve(socket_path, vol_path):
+    cli = _import_volatility(vol_path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen(64)
+    selector = selectors.DefaultSelector()
+    selector.register(listener, selectors.EVENT_READ, "accept")
+    selector.register(sys.stdin, selectors.EVENT_READ, "parent")
+    conns = {}     # conn -> child pid, or None while waiting for its request
+    children = {}  # child pid -> conn
+    sys.stdout.write("ready\n")
+    sys.stdout.flush()
+
+    while True:
+        # Single-threaded on purpose: forking from a threaded process is unsafe
+        for key, _ in selector.select(timeout=0.05):
+            if key.data == "parent":
+                for pid in children:
+                    try:
+                        os.killpg(pid, signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass
+                return
+            if key.data == "accept":
+                conn, _ = listener.accept()
+                conns[conn] = None
+                selector.register(conn, selectors.EVENT_READ, "conn")
+                continue
+            conn = key.fileobj
+            try:
+                message, fds, _, _ = socket.recv_fds(conn, 1 << 16, 2)
+            except OSError:
+                message, fds = b"", []
+            pid = conns.get(conn)
+            if pid is not None or not message:
+                # The client went away (or misbehaved): don't leave its child running
+                selector.unregister(conn)
+                conns.pop(conn, None)
+                conn.close()
+                for fd in fds:
+                    os.close(fd)
+                if pid is not None and pid in children:
+                    try:
+                        os.killpg(pid, signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass
+                continue
+            try:
+                request = json.loads(message)
+                if len(fds) != 2:
+                    raise ValueError("expected stdout and stderr descriptors")
+            except ValueError as e:
+                conn.sendall(json.dumps({"error": str(e)}).encode() + b"\n")
+                for fd in fds:
+                    os.close(fd)
+                continue
+            sys.stdout.flush()
+            sys.stderr.flush()
+            pid = os.fork()
+            if pid == 0:
+                _run_child(cli, request, fds, listener, list(conns))
+            for fd in fds:
+                os.close(fd)
+            conns[conn] = pid
+            children[pid] = conn
+            conn.sendall(json.dumps({"pid": pid}).encode() + b"\n")
+
+        while children:
+            try:
+                pid, status, rusage = os.wait4(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            conn = children.pop(pid, None)
+            if conn is None or conn not in conns:
+                continue
+            reply = {"exit": os.waitstatus_to_exitcode(status),
+                     "rusage": {"ru_utime": rusage.ru_utime, "ru_stime": rusage.ru_stime,
+                                "ru_maxrss": rusage.ru_maxrss}}
+            try:
+                conn.sendall(json.dumps(reply).encode() + b"\n")
+            except OSError:
+                pass
+            selector.unregister(conn)
+            conns.pop(conn)
+            conn.close()
+
+
+if __name__ == "__main__":
+    try:
+        serve(sys.argv[1], sys.argv[2])
+    except Exception as e:
+        # Reaches the parent's readline() in place of "ready"
+        print(f"{type(e).__name__}: {e}", flush=True)
+        sys.exit(1)
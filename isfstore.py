@@ -0,0 +1,262 @@
+import os
+import re
+import json
+import lzma
+import time
+import base64
+import shutil
+import logging
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from osdetect import REGION_SIZE, SCAN_LIMIT
+
+log = logging.getLogger("AutoVol")
+
+INDEX_FILE = "autovol_isf_index.json"
+CASE_SYMBOLS_DIR = "symbols"
+# Windows ISF members are named windows/<pdb name>/<GUID>-<age>.json[.xz]
+WINDOWS_MEMBER = re.compile(r"(?:^|/)windows/([^/]+\.pdb)/([0-9A-Fa-f]{32})-(\d+)\.json(?:\.xz)?$")
+# CodeView debug records of the kernel images that Volatility resolves symbols for
+RSDS_PATTERN = re.compile(rb"RSDS(.{16})(.{4})((?:ntkrnlmp|ntoskrnl|ntkrnlpa|ntkrpamp)\.pdb)\x00", re.S | re.I)
+BANNER_PATTERNS = {
+    "linux": re.compile(rb"Linux version [0-9][^\x00\n]{10,400}"),
+    "mac": re.compile(rb"Darwin Kernel Version [0-9][^\x00\n]{10,400}"),
+}
+IDENTIFIER_PATTERNS = dict(windows=RSDS_PATTERN, **BANNER_PATTERNS)
+# Literal start of each record; bytes.find() skips to candidates far faster than the regex engine scans
+IDENTIFIER_PREFIXES = {"windows": b"RSDS", "linux": b"Linux version ", "mac": b"Darwin Kernel Version "}
+# Longest identifier record; each region reads this far into the next
+IDENTIFIER_OVERLAP = 512
+# Stop collecting once an image has offered this many candidates of one kind
+MAX_CANDIDATES = 64
+
+
+def windows_key(pdb_name, guid, age):
+    return f"{pdb_name.lower()}|{guid.upper()}|{int(age)}"
+
+
+def normalize_banner(banner):
+    if isinstance(banner, bytes):
+        banner = banner.decode("latin-1")
+    return banner.rstrip("\x00\r\n ")
+
+
+def rsds_key(match):
+    """windows_key() for an RSDS record: the GUID's first three fields are little-endian."""
+    raw, age, pdb_name = match.group(1), match.group(2), match.group(3)
+    guid = (f"{int.from_bytes(raw[0:4], 'little'):08X}{int.from_bytes(raw[4:6], 'little'):04X}"
+            f"{int.from_bytes(raw[6:8], 'little'):04X}{raw[8:].hex().upper()}")
+    return windows_key(pdb_name.decode("latin-1"), guid, int.from_bytes(age, "little"))
+
+
+def _identifier(os_name, match):
+    return rsds_key(match) if os_name == "windows" else normalize_banner(match.group(0))
+
+
+def scan_region_identifiers(image, offset, length, patterns):
+    """{os: [identifier]} for records starting in one region (read overlaps the next region slightly)."""
+    with open(image, "rb") as f:
+        f.seek(offset)
+        data = f.read(length + IDENTIFIER_OVERLAP)
+    found = {}
+    for os_name, pattern in patterns.items():
+        prefix = IDENTIFIER_PREFIXES[os_name]
+        position = data.find(prefix, 0, length + len(prefix) - 1)
+        while position != -1:
+            match = pattern.match(data, position)
+            if match:
+                found.setdefault(os_name, []).append(_identifier(os_name, match))
+            position = data.find(prefix, position + 1, length + len(prefix) - 1)
+    return found
+
+
+def scan_identifiers(image, os_name=None, region_size=REGION_SIZE, limit=SCAN_LIMIT, workers=8):
+    """Kernel identifiers found in an image: {"windows": [pdb|GUID|age], "linux": [banner], "mac": [banner]}.
+
+    Only the given OS's identifier is searched for when it is known. Like
+    osdetect, regions are read `workers` at a time from the start of the
+    image, stopping after the first round with any hit, and never past limit.
+    """
+    found = {"windows": [], "linux": [], "mac": []}
+    patterns = {os_name: IDENTIFIER_PATTERNS[os_name]} if os_name in IDENTIFIER_PATTERNS else IDENTIFIER_PATTERNS
+    offsets = list(range(0, min(os.path.getsize(image), limit), region_size))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for start in range(0, len(offsets), workers):
+            batch = offsets[start:start + workers]
+            for hits in pool.map(lambda offset: scan_region_identifiers(image, offset, region_size, patterns), batch):
+                for name, keys in hits.items():
+                    for key in keys:
+                        if key not in found[name] and len(found[name]) < MAX_CANDIDATES:
+                            found[name].append(key)
+            if any(found.values()):
+                break
+    return found
+
+
+def _read_member(archive, member):
+    data = archive.read(member)
+    return lzma.decompress(data) if member.endswith(".xz") else data
+
+
+def _banner_of(archive, member):
+    """The linux_banner/version constant Volatility itself identifies a Linux/mac ISF by."""
+    symbols = json.loads(_read_member(archive, member)).get("symbols", {})
+    for name in ("linux_banner", "version"):
+        data = symbols.get(name, {}).get("constant_data")
+        if data:
+            return normalize_banner(base64.b64decode(data))
+    return None
+
+
+def _banners(archive_path, members):
+    """{member: banner} for one slice of an archive, reading it through a single open handle."""
+    banners = {}
+    with zipfile.ZipFile(archive_path) as archive:
+        for member in members:
+            try:
+                banners[member] = _banner_of(archive, member)
+            except (OSError, ValueError, lzma.LZMAError, zipfile.BadZipFile) as e:
+                log.debug(f"Skipping {member} in {archive_path}: {e}")
+    return banners
+
+
+class ISFStore:
+    """Index from kernel identifiers to members of compressed symbol packs (windows.zip, linux.zip, mac.zip).
+
+    Windows members are indexed from their file names alone; Linux and mac
+    members are opened once to read their banner. The index is cached in
+    INDEX_FILE next to the packs and rebuilt only for archives that changed.
+    """
+
+    def __init__(self, directory, workers=8):
+        self.directory = directory
+        self.workers = workers
+        self.index_path = os.path.join(directory, INDEX_FILE)
+        self.archives = self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                cached = json.load(f).get("archives", {})
+        except (OSError, ValueError):
+            cached = {}
+        archives = {}
+        changed = False
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(".zip"):
+                continue
+            path = os.path.join(self.directory, name)
+            stat = os.stat(path)
+            entry = cached.get(name)
+            if not entry or entry["size"] != stat.st_size or entry["mtime"] != stat.st_mtime:
+                entry = self._index_archive(path)
+                entry.update(size=stat.st_size, mtime=stat.st_mtime)
+                changed = True
+            archives[name] = entry
+        if changed or set(archives) != set(cached):
+            self._save(archives)
+        return archives
+
+    def _save(self, archives):
+        try:
+            tmp_file = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump({"archives": archives}, f)
+            os.replace(tmp_file, self.index_path)
+        except OSError as e:
+            log.warning(f"⚠️ Could not save symbol index {self.index_path}: {e}")
+
+    def _index_archive(self, path):
+        started = time.monotonic()
+        identifiers = {}
+        others = []
+        with zipfile.ZipFile(path) as archive:
+            for member in archive.namelist():
+                if not (member.endswith(".json") or member.endswith(".json.xz")):
+                    continue
+                match = WINDOWS_MEMBER.search(member)
+                if match:
+                    identifiers[windows_key(*match.groups())] = member
+                elif "/windows/" not in f"/{member}":
+                    others.append(member)
+        if others:
+            # lzma releases the GIL, so threads decompress in parallel
+            slices = [others[i::self.workers] for i in range(self.workers)]
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for banners in pool.map(lambda members: _banners(path, members), slices):
+                    identifiers.update((banner, member) for member, banner in banners.items() if banner)
+        log.info(f"🗃️ Indexed {len(identifiers)} symbol tables in {os.path.basename(path)} "
+                 f"in {time.monotonic() - started:.1f}s")
+        return {"identifiers": identifiers}
+
+    def __len__(self):
+        return sum(len(entry["identifiers"]) for entry in self.archives.values())
+
+    def lookup(self, identifiers):
+        """[(archive path, member)] for every identifier the packs have an ISF for."""
+        matches = []
+        for os_name in ("windows", "linux", "mac"):
+            for identifier in identifiers.get(os_name, []):
+                for name, entry in self.archives.items():
+                    member = entry["identifiers"].get(identifier)
+                    if member:
+                        matches.append((os.path.join(self.directory, name), member))
+        return matches
+
+    def materialize(self, matches, directory, decompress=False):
+        """Copies matched members into a Volatility symbol directory, optionally as plain .json."""
+        written = []
+        for archive_path, member in matches:
+            relative = member[member.index(_os_root(member)):]
+            target = os.path.join(directory, *relative.split("/"))
+            if decompress and target.endswith(".xz"):
+                target = target[:-3]
+            if not os.path.exists(target):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                tmp_file = f"{target}.{os.getpid()}.tmp"
+                with zipfile.ZipFile(archive_path) as archive:
+                    if decompress:
+                        with open(tmp_file, "wb") as f:
+                            f.write(_read_member(archive, member))
+                    else:
+                        with archive.open(member) as src, open(tmp_file, "wb") as dst:
+                            shutil.copyfileobj(src, dst)
+                os.replace(tmp_file, target)
+            written.append(target)
+        return written
+
+
+def _os_root(member):
+    """Members may sit under a prefix (e.g. symbols/windows/...); Volatility wants them from the OS folder."""
+    for os_name in ("windows/", "linux/", "mac/"):
+        if member.startswith(os_name) or f"/{os_name}" in member:
+            return os_name
+    return member.rsplit("/", 1)[-1]
+
+
+def case_symbols(store_dir, image, case_dir, decompress=False, os_name=None):
+    """Materializes only the ISFs an image needs into <case>/symbols; returns that directory or None."""
+    started = time.monotonic()
+    try:
+        store = ISFStore(store_dir)
+        matches = store.lookup(scan_identifiers(image, os_name))
+    except (OSError, zipfile.BadZipFile) as e:
+        log.warning(f"⚠️ Symbol store {store_dir} unavailable: {e}")
+        return None
+    if not matches:
+        log.warning(f"⚠️ No symbol table in {store_dir} matches {os.path.basename(image)}; "
+                    f"Volatility will fall back to its own symbol search")
+        return None
+    directory = os.path.join(case_dir, CASE_SYMBOLS_DIR)
+    written = store.materialize(matches, directory, decompress)
+    log.info(f"🧬 Materialized {len(written)} symbol table(s) for {os.path.basename(image)} into {directory} "
+             f"in {time.monotonic() - started:.2f}s")
+    return directory
+
+
+def case_symbols_for(args, image, case_dir, os_name=None):
+    """case_symbols() when --isf-store is set, else None."""
+    store_dir = getattr(args, "isf_store", None)
+    if not store_dir:
+        return None
+    return case_symbols(store_dir, image, case_dir, getattr(args, "decompress_symbols", False), os_name)
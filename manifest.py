@@ -0,0 +1,171 @@
+import os
+import json
+import mmap
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from streaming import open_output
+
+log = logging.getLogger("AutoVol")
+
+MANIFEST_FILE = "autovol_manifest.json"
+# Records since the last compaction, one JSON object per line, folded into MANIFEST_FILE on load
+JOURNAL_FILE = "autovol_manifest.jsonl"
+HASH_CHUNK = 64 * 1024 * 1024
+
+
+def _hash_chunk(view):
+    # hashlib releases the GIL on large buffers, so chunks hash in parallel on threads
+    return hashlib.blake2b(view, digest_size=32).digest()
+
+
+def fingerprint_image(path, chunk_size=HASH_CHUNK, workers=None):
+    """Content hash of an image: blake2b over fixed chunks of the mmapped file, hashed in parallel."""
+    size = os.path.getsize(path)
+    outer = hashlib.blake2b(str(size).encode(), digest_size=32)
+    if size:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                chunks = (view[start:start + chunk_size] for start in range(0, size, chunk_size))
+                with ThreadPoolExecutor(max_workers=workers or min(32, os.cpu_count() or 1)) as pool:
+                    for digest in pool.map(_hash_chunk, chunks):
+                        outer.update(digest)
+            finally:
+                view.release()
+    return f"blake2b:{outer.hexdigest()}"
+
+
+def file_checksum(path, chunk_size=1 << 20):
+    """blake2b of a file's (uncompressed) contents, in the same form OutputWriter reports."""
+    digest = hashlib.blake2b(digest_size=32)
+    with open_output(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return f"blake2b:{digest.hexdigest()}"
+
+
+def task_key(fingerprint, plugin, plugin_args):
+    return f"{fingerprint}|{plugin}|{json.dumps(plugin_args, sort_keys=True)}"
+
+
+def load_manifest(directory):
+    """A case's manifest: the MANIFEST_FILE snapshot with the journal replayed on top."""
+    data = {"images": {}, "tasks": {}}
+    try:
+        with open(os.path.join(directory, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            data.update(json.load(f))
+    except (OSError, ValueError):
+        pass
+    try:
+        with open(os.path.join(directory, JOURNAL_FILE), "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn last line of a crashed run
+                data[record["section"]][record["key"]] = record["entry"]
+    except OSError:
+        pass
+    return data
+
+
+class RunManifest:
+    """Per-case record of every task's inputs, status and output checksum, so reruns only do the delta.
+
+    Each record is appended to a JSONL journal rather than rewriting the
+    whole manifest; opening the manifest compacts the journal into it.
+    """
+
+    def __init__(self, directory, vol_version=None, plugin_args=None):
+        self.directory = directory
+        self.vol_version = vol_version
+        self.plugin_args = plugin_args or {}
+        self.path = os.path.join(directory, MANIFEST_FILE)
+        self.journal_path = os.path.join(directory, JOURNAL_FILE)
+        self.lock = threading.Lock()
+        self.data = load_manifest(directory)
+        if os.path.exists(self.journal_path):
+            self._compact()
+
+    def _compact(self):
+        """Writes the replayed manifest as the new snapshot and starts an empty journal."""
+        try:
+            tmp_file = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(self.data, f, indent=1)
+            os.replace(tmp_file, self.path)
+            # Replaying a journal twice is harmless, so a crash before this just compacts again next time
+            os.remove(self.journal_path)
+        except OSError as e:
+            log.warning(f"⚠️ Could not compact run manifest: {e}")
+
+    def _append(self, section, key, entry):
+        self.data[section][key] = entry
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"section": section, "key": key, "entry": entry}) + "\n")
+        except OSError as e:
+            log.warning(f"⚠️ Could not save run manifest: {e}")
+
+    def fingerprint(self, image):
+        """Image fingerprint, reused from the manifest while the file's size and mtime are unchanged."""
+        path = os.path.abspath(image)
+        stat = os.stat(path)
+        with self.lock:
+            cached = self.data["images"].get(path)
+        if cached and cached["size"] == stat.st_size and cached["mtime"] == stat.st_mtime:
+            return cached["fingerprint"]
+
+        started = time.monotonic()
+        fingerprint = fingerprint_image(path)
+        elapsed = time.monotonic() - started
+        log.info(f"🔑 Fingerprinted {os.path.basename(path)} in {elapsed:.1f}s "
+                 f"({stat.st_size / (1024 * 1024) / max(elapsed, 1e-6):.0f}MB/s)")
+        with self.lock:
+            self._append("images", path, {"size": stat.st_size, "mtime": stat.st_mtime, "fingerprint": fingerprint})
+        return fingerprint
+
+    def is_complete(self, fingerprint, plugin):
+        """True if the task finished under this Volatility version and its output is intact."""
+        with self.lock:
+            entry = self.data["tasks"].get(task_key(fingerprint, plugin, self.plugin_args))
+        if not entry or entry["status"] != "done" or entry["vol_version"] != self.vol_version:
+            return False
+        output = os.path.join(self.directory, entry["output"])
+        try:
+            return os.path.getsize(output) == entry["output_bytes"] and file_checksum(output) == entry["checksum"]
+        except OSError:
+            return False
+
+    def record(self, task, status, output, checksum=None):
+        if checksum is None and os.path.exists(output):
+            checksum = file_checksum(output)
+        entry = {
+            "image": os.path.abspath(task.image),
+            "image_fingerprint": task.fingerprint,
+            "plugin": task.plugin,
+            "args": self.plugin_args,
+            "vol_version": self.vol_version,
+            "status": status,
+            "output": os.path.relpath(os.path.abspath(output), os.path.abspath(self.directory)),
+            "output_bytes": os.path.getsize(output) if os.path.exists(output) else 0,
+            "checksum": checksum,
+            "finished_at": time.time(),
+        }
+        with self.lock:
+            self._append("tasks", task_key(task.fingerprint, task.plugin, self.plugin_args), entry)
+
+    def pending(self, tasks):
+        """Drops tasks that are already complete and valid, logging how many were skipped."""
+        remaining = [t for t in tasks if not self.is_complete(t.fingerprint, t.plugin)]
+        skipped = len(tasks) - len(remaining)
+        if skipped:
+            log.info(f"⏭️ Skipping {skipped} task(s) already completed in {self.path}")
+        return remaining
@@ -0,0 +1,138 @@
+import os
+import json
+import time
+import logging
+import threading
+import psutil
+from dataclasses import dataclass, asdict
+
+log = logging.getLogger("AutoVol")
+
+METRICS_FILE = "autovol_metrics.jsonl"
+
+
+@dataclass
+class ProcessMetrics:
+    plugin: str
+    pid: int
+    exit_code: int
+    wall_time: float
+    cpu_user: float
+    cpu_system: float
+    peak_rss_mb: float
+    read_bytes: int
+    write_bytes: int
+
+    @property
+    def cpu_time(self):
+        return self.cpu_user + self.cpu_system
+
+    @property
+    def cpu_percent(self):
+        return 100.0 * self.cpu_time / self.wall_time if self.wall_time > 0 else 0.0
+
+
+class ProcessTreeSampler(threading.Thread):
+    """Samples RSS, CPU and I/O of a child process and all of its descendants."""
+
+    def __init__(self, pid, interval=0.25):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss = 0
+        self.started = time.monotonic()
+        self.finished = None
+        # Last values seen per pid, so exited descendants still count
+        self._cpu = {}
+        self._io = {}
+        self._done = threading.Event()
+
+    def sample(self):
+        try:
+            root = psutil.Process(self.pid)
+            procs = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return
+        rss = 0
+        for proc in procs:
+            try:
+                with proc.oneshot():
+                    rss += proc.memory_info().rss
+                    cpu = proc.cpu_times()
+                    self._cpu[proc.pid] = (cpu.user, cpu.system)
+                    try:
+                        io = proc.io_counters()
+                        self._io[proc.pid] = (io.read_bytes, io.write_bytes)
+                    except (psutil.AccessDenied, AttributeError):
+                        pass
+            except psutil.Error:
+                continue
+        self.peak_rss = max(self.peak_rss, rss)
+
+    def run(self):
+        while not self._done.is_set():
+            self.sample()
+            self._done.wait(self.interval)
+
+    def stop(self):
+        self.finished = time.monotonic()
+        self._done.set()
+        if self.is_alive():
+            self.join()
+
+    def result(self, plugin, exit_code, rusage=None):
+        wall_time = (self.finished or time.monotonic()) - self.started
+        cpu_user = sum(u for u, _ in self._cpu.values())
+        cpu_system = sum(s for _, s in self._cpu.values())
+        peak_rss = self.peak_rss
+        if rusage is not None:
+            # The kernel's accounting covers the final moments the sampler missed
+            cpu_user = max(cpu_user, rusage.ru_utime)
+            cpu_system = max(cpu_system, rusage.ru_stime)
+            peak_rss = max(peak_rss, rusage.ru_maxrss * 1024)  # KiB on Linux
+        return ProcessMetrics(
+            plugin=plugin,
+            pid=self.pid,
+            exit_code=exit_code,
+            wall_time=round(wall_time, 3),
+            cpu_user=round(cpu_user, 3),
+            cpu_system=round(cpu_system, 3),
+            peak_rss_mb=round(peak_rss / (1024 * 1024), 2),
+            read_bytes=sum(r for r, _ in self._io.values()),
+            write_bytes=sum(w for _, w in self._io.values()),
+        )
+
+
+def wait_with_rusage(proc):
+    """Waits for a Popen child and returns its resource usage where the OS reports it."""
+    if hasattr(proc, "wait_rusage"):
+        # Fork server children are reaped by the server, which reports their rusage
+        return proc.wait_rusage()
+    if not hasattr(os, "wait4"):
+        proc.wait()
+        return None
+    try:
+        _, status, rusage = os.wait4(proc.pid, 0)
+    except ChildProcessError:
+        proc.wait()
+        return None
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return rusage
+
+
+class MetricsLog:
+    """Appends one JSON line of ProcessMetrics per finished plugin."""
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, METRICS_FILE)
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, metrics, **extra):
+        record = dict(asdict(metrics), **extra)
+        with self.lock:
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+            except OSError as e:
+                log.warning(f"⚠️ Could not write metrics for {metrics.plugin}: {e}")
@@ -0,0 +1,226 @@
+import time
+import logging
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from events import TaskQueued, TaskStarted, TaskFinished, TaskFailed
+
+log = logging.getLogger("AutoVol")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DURATION_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200, 14400)
+QUEUE_WAIT_BUCKETS = (0.1, 1, 5, 15, 60, 300, 900, 1800, 3600, 7200, 14400, 28800)
+RSS_BUCKETS = tuple(mb * 1024 * 1024 for mb in (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + list(extra or [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """A metric family: one value (or histogram) per label combination, rendered in Prometheus text format."""
+
+    kind = "untyped"
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.series = {}
+
+    def _samples(self):
+        for values, value in sorted(self.series.items()):
+            yield self.name, _labels(self.labels, values), value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines += [f"{name}{labels} {_number(value)}" for name, labels, value in self._samples()]
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *values, amount=1):
+        self.series[values] = self.series.get(values, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, *values, value):
+        self.series[values] = value
+
+    def inc(self, *values, amount=1):
+        self.series[values] = self.series.get(values, 0) + amount
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DURATION_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets) + (float("inf"),)
+
+    def observe(self, *values, value):
+        # [per-bucket counts, sum, count]; buckets are cumulative only when rendered
+        counts, total, count = self.series.get(values) or ([0] * len(self.buckets), 0.0, 0)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        self.series[values] = (counts, total + value, count + 1)
+
+    def _samples(self):
+        for values, (counts, total, count) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, counts):
+                cumulative += bucket
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                yield f"{self.name}_bucket", _labels(self.labels, values, [("le", le)]), cumulative
+            yield f"{self.name}_sum", _labels(self.labels, values), total
+            yield f"{self.name}_count", _labels(self.labels, values), count
+
+
+class RunMetrics:
+    """Turns executor events into Prometheus metrics; subscribe it to an EventBus.
+
+    Works for every engine (and the coordinator) because it only sees the
+    TaskQueued/Started/Progress/Finished/Failed events the CLI and TUI get.
+    """
+
+    def __init__(self, workers=1):
+        self.lock = threading.Lock()
+        self.queued_at = {}
+        self.started_at = {}
+        self.tasks_queued = Counter("autovol_tasks_queued_total", "Tasks put on the work queue.")
+        self.tasks_finished = Counter("autovol_tasks_finished_total",
+                                      "Tasks that ended, by final status (done, error, timeout, cancelled).",
+                                      ("status",))
+        self.pending = Gauge("autovol_tasks_pending", "Tasks queued and not started yet.")
+        self.running = Gauge("autovol_tasks_running", "Tasks currently running.")
+        self.workers = Gauge("autovol_workers", "Configured worker slots.")
+        self.busy_seconds = Counter("autovol_worker_busy_seconds_total",
+                                    "Seconds workers spent running tasks; rate() over autovol_workers is utilization.")
+        self.duration = Histogram("autovol_plugin_duration_seconds", "Wall time of finished tasks by plugin.",
+                                  ("plugin", "status"), DURATION_BUCKETS)
+        self.queue_wait = Histogram("autovol_queue_wait_seconds", "Time from queueing a task to starting it.",
+                                    (), QUEUE_WAIT_BUCKETS)
+        self.peak_rss = Histogram("autovol_plugin_peak_rss_bytes", "Peak RSS of a plugin's process tree.",
+                                  ("plugin",), RSS_BUCKETS)
+        self.output_bytes = Counter("autovol_output_bytes_total", "Plugin output bytes written, by plugin.",
+                                    ("plugin",))
+        self.last_event = Gauge("autovol_last_event_timestamp_seconds",
+                                "Unix time of the latest task event; alert on it going stale.")
+        self.started = Gauge("autovol_start_time_seconds", "Unix time the run started.")
+        self.families = [self.tasks_queued, self.tasks_finished, self.pending, self.running, self.workers,
+                         self.busy_seconds, self.duration, self.queue_wait, self.peak_rss, self.output_bytes,
+                         self.last_event, self.started]
+        now = time.time()
+        self.workers.set(value=workers)
+        self.started.set(value=now)
+        self.last_event.set(value=now)
+        self.pending.set(value=0)
+        self.running.set(value=0)
+
+    def __call__(self, event):
+        with self.lock:
+            self.last_event.set(value=event.time)
+            if isinstance(event, TaskQueued):
+                self.queued_at[event.key] = event.time
+                self.tasks_queued.inc()
+                self.pending.inc()
+            elif isinstance(event, TaskStarted):
+                queued = self.queued_at.pop(event.key, None)
+                if queued is not None:
+                    self.queue_wait.observe(value=max(event.time - queued, 0.0))
+                    self.pending.inc(amount=-1)
+                # A retry starts the same task again without it ever finishing
+                if event.key not in self.started_at:
+                    self.running.inc()
+                self.started_at[event.key] = event.time
+            elif isinstance(event, (TaskFinished, TaskFailed)):
+                self._finished(event)
+
+    def _finished(self, event):
+        status = event.status
+        started = self.started_at.pop(event.key, None)
+        if started is not None:
+            self.running.inc(amount=-1)
+            wall = max(event.time - started, 0.0)
+            self.busy_seconds.inc(amount=wall)
+            self.duration.observe(event.plugin, status.status, value=wall)
+        elif self.queued_at.pop(event.key, None) is not None:
+            # Cancelled (or skipped) before it ever started
+            self.pending.inc(amount=-1)
+        self.tasks_finished.inc(status.status)
+        if status.memory_used_mb:
+            self.peak_rss.observe(event.plugin, value=status.memory_used_mb * 1024 * 1024)
+        if status.output_bytes:
+            self.output_bytes.inc(event.plugin, amount=status.output_bytes)
+
+    def render(self):
+        with self.lock:
+            return "\n".join(family.render() for family in self.families) + "\n"
+
+
+class MetricsServer:
+    """Serves RunMetrics on http://HOST:PORT/metrics from a background thread."""
+
+    def __init__(self, metrics, host="127.0.0.1", port=9464):
+        self.metrics = metrics
+        self.server = ThreadingHTTPServer((host, port), _make_handler(metrics))
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def address(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self):
+        self.thread.start()
+        log.info(f"📈 Prometheus metrics on {self.address}")
+        return self
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _make_handler(metrics):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):
+            log.debug("metrics: " + fmt % args)
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return MetricsHandler
+
+
+def serve_metrics(events, host, port, workers=1):
+    """Subscribes RunMetrics to an executor's EventBus and starts the /metrics server."""
+    metrics = RunMetrics(workers)
+    events.subscribe(metrics)
+    return MetricsServer(metrics, host, port).start()
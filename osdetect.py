@@ -0,0 +1,136 @@
+import os
+import time
+import logging
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger("AutoVol")
+
+# (magic at offset 0, container, OS it implies or None when the contents decide)
+HEADER_MAGICS = [
+    (b"PAGEDU64", "crashdump64", "windows"),
+    (b"PAGEDUMP", "crashdump32", "windows"),
+    (b"hibr", "hiberfil", "windows"),
+    (b"HIBR", "hiberfil", "windows"),
+    (b"wake", "hiberfil", "windows"),
+    (b"WAKE", "hiberfil", "windows"),
+    (b"RSTR", "hiberfil", "windows"),
+    (b"rstr", "hiberfil", "windows"),
+    (b"EMiL", "lime", "linux"),
+    (b"\x7fELF", "elf", None),
+    (b"\xd0\xbe\xd2\xbe", "vmware", None),
+    (b"\xd1\xba\xd1\xba", "vmware", None),
+    (b"\xd2\xbe\xd2\xbe", "vmware", None),
+    (b"\xd3\xbe\xd3\xbe", "vmware", None),
+]
+SIGNATURES = {
+    "windows": [b"KDBG", b"ntkrnlmp.pdb\x00", b"ntoskrnl.pdb\x00", b"ntkrnlpa.pdb\x00", b"ntkrpamp.pdb\x00"],
+    "linux": [b"Linux version "],
+    "mac": [b"Darwin Kernel Version "],
+}
+REGION_SIZE = 16 * 1024 * 1024
+# Kernels sit in low physical memory; give up (and leave it to Volatility) after this much
+SCAN_LIMIT = 2 * 1024 * 1024 * 1024
+OVERLAP = max(len(sig) for sigs in SIGNATURES.values() for sig in sigs)
+# A guess needs this many hits and this many times the runner-up's; weaker evidence keeps scanning
+MIN_HITS = 3
+MIN_MARGIN = 2
+
+
+@dataclass
+class OSGuess:
+    os: str = None
+    container: str = "raw"
+    hits: dict = field(default_factory=dict)
+    scanned: int = 0
+    elapsed: float = 0.0
+
+
+def read_header(image, size=4096):
+    with open(image, "rb") as f:
+        return f.read(size)
+
+
+def container_of(header):
+    for magic, container, os_name in HEADER_MAGICS:
+        if header.startswith(magic):
+            return container, os_name
+    return "raw", None
+
+
+def scan_region(image, offset, length):
+    """Signature hit counts per OS in one bounded region (read overlaps the next region slightly)."""
+    with open(image, "rb") as f:
+        f.seek(offset)
+        data = f.read(length + OVERLAP)
+    hits = {}
+    for os_name, signatures in SIGNATURES.items():
+        count = sum(data.count(sig) for sig in signatures)
+        if count:
+            hits[os_name] = count
+    return hits
+
+
+def leading_os(hits):
+    """The OS whose signatures clearly dominate, or None while the evidence is weak or mixed."""
+    if not hits:
+        return None
+    ranked = sorted(hits.items(), key=lambda item: item[1], reverse=True)
+    os_name, count = ranked[0]
+    runner_up = ranked[1][1] if len(ranked) > 1 else 0
+    if count >= MIN_HITS and count >= MIN_MARGIN * runner_up:
+        return os_name
+    return None
+
+
+def detect_image_os(image, region_size=REGION_SIZE, limit=SCAN_LIMIT, workers=8):
+    """Guesses an image's OS from its container header, then from kernel signatures in its first regions.
+
+    Regions are read by a thread pool `workers` at a time (file reads release
+    the GIL, so cold images are fetched in parallel), stopping at the first
+    round where one OS clearly leads (see leading_os). Evidence that is
+    still weak or mixed at `limit` returns os=None, as does no hit at all,
+    so callers fall back to Volatility's own detection.
+    """
+    started = time.monotonic()
+    container, os_name = container_of(read_header(image))
+    guess = OSGuess(os_name, container)
+    if os_name:
+        guess.elapsed = time.monotonic() - started
+        return guess
+
+    size = os.path.getsize(image)
+    offsets = list(range(0, min(size, limit), region_size))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for start in range(0, len(offsets), workers):
+            batch = offsets[start:start + workers]
+            for hits in pool.map(lambda offset: scan_region(image, offset, region_size), batch):
+                for name, count in hits.items():
+                    guess.hits[name] = guess.hits.get(name, 0) + count
+            guess.scanned += sum(min(region_size, size - offset) for offset in batch)
+            guess.os = leading_os(guess.hits)
+            if guess.os:
+                break
+    guess.elapsed = time.monotonic() - started
+    return guess
+
+
+def guess_os(image):
+    """detect_image_os() with logging; never raises, returns an OSGuess with os=None on failure."""
+    try:
+        guess = detect_image_os(image)
+    except OSError as e:
+        log.warning(f"⚠️ Fast OS detection failed for {image}: {e}")
+        return OSGuess()
+    if guess.os:
+        evidence = ", ".join(f"{name}: {count}" for name, count in guess.hits.items()) or "header"
+        log.info(f"🔎 {os.path.basename(image)}: {guess.container} image, looks like {guess.os} "
+                 f"({evidence}) in {guess.elapsed * 1000:.0f}ms")
+    elif guess.hits:
+        evidence = ", ".join(f"{name}: {count}" for name, count in guess.hits.items())
+        log.info(f"🔎 {os.path.basename(image)}: {guess.container} image, kernel signatures too weak to decide "
+                 f"({evidence}) in the first {guess.scanned / (1024 * 1024):.0f}MB ({guess.elapsed * 1000:.0f}ms)")
+    else:
+        log.info(f"🔎 {os.path.basename(image)}: {guess.container} image, no kernel signature in the first "
+                 f"{guess.scanned / (1024 * 1024):.0f}MB ({guess.elapsed * 1000:.0f}ms)")
+    return guess
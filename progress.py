@@ -0,0 +1,75 @@
+import time
+import threading
+from rich.progress import Progress, ProgressColumn, TextColumn, BarColumn, TaskProgressColumn
+from rich.text import Text
+from events import TaskQueued, TaskStarted, TaskProgress, TaskFinished, TaskFailed
+
+# A running plugin with no progress update for this long is flagged as possibly stuck
+STALL_SECONDS = 120
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return "—"
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class EtaColumn(ProgressColumn):
+    """ETA from the task's last update, or how long it has been silent once that looks like a stall."""
+
+    def render(self, task):
+        updated = task.fields.get("updated")
+        if updated is not None and time.monotonic() - updated > STALL_SECONDS:
+            return Text(f"no progress for {format_duration(time.monotonic() - updated)}", style="bold red")
+        eta = task.fields.get("eta")
+        return Text(f"ETA {format_duration(eta)}" if eta is not None else "", style="cyan")
+
+
+class ProgressDisplay:
+    """Rich progress bars for the plain CLI: one per running plugin plus an overall bar, fed from executor events."""
+
+    def __init__(self, events, console=None):
+        self.progress = Progress(
+            TextColumn("{task.description}"),
+            BarColumn(),
+            TaskProgressColumn(),
+            TextColumn("{task.fields[stage]}", style="dim"),
+            EtaColumn(),
+            console=console,
+        )
+        self.lock = threading.Lock()
+        self.tasks = {}
+        self.queued = 0
+        self.overall = self.progress.add_task("All plugins", total=0, stage="", eta=None, updated=None)
+        events.subscribe(self.handle)
+
+    def handle(self, event):
+        with self.lock:
+            if isinstance(event, TaskQueued):
+                self.queued += 1
+                self.progress.update(self.overall, total=self.queued)
+            elif isinstance(event, (TaskStarted, TaskProgress)):
+                task_id = self.tasks.get(event.key)
+                if task_id is None:
+                    task_id = self.tasks[event.key] = self.progress.add_task(
+                        event.key, total=1.0, stage="", eta=None, updated=time.monotonic())
+                if isinstance(event, TaskProgress):
+                    self.progress.update(task_id, completed=event.progress, stage=event.stage, eta=event.eta,
+                                         updated=time.monotonic())
+            elif isinstance(event, (TaskFinished, TaskFailed)):
+                task_id = self.tasks.pop(event.key, None)
+                if task_id is not None:
+                    self.progress.remove_task(task_id)
+                self.progress.advance(self.overall)
+
+    def __enter__(self):
+        self.progress.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.progress.stop()
@@ -0,0 +1,346 @@
+import os
+import re
+import json
+import time
+import heapq
+import logging
+from convert import iter_json_rows
+from manifest import load_manifest
+from metrics import METRICS_FILE
+from streaming import open_output, strip_compression
+
+log = logging.getLogger("AutoVol")
+
+REPORT_DIR = "report"
+DATA_DIR = "data"
+CHUNK_ROWS = 1000
+TOKEN_GROUP = 16  # chunks per token index shard
+TOKEN_PATTERN = re.compile(r"[0-9a-z_]{2,}")
+
+
+def tokens(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def _write_js(path, key, payload):
+    """Data files are JSONP so the report also works when opened straight from disk (file://)."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"AutoVol.receive({json.dumps(key)}, ")
+        json.dump(payload, f, separators=(",", ":"))
+        f.write(");\n")
+
+
+def find_json_outputs(directory):
+    """Yields (image_id, plugin, path) for every <plugin>/<plugin>.json[.gz|.zst] under the case directory."""
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if d != REPORT_DIR)
+        plugin = os.path.basename(root)
+        for name in sorted(files):
+            if strip_compression(name) == f"{plugin}.json":
+                image = os.path.relpath(os.path.dirname(root), directory)
+                yield ("" if image == "." else image), plugin, os.path.join(root, name)
+
+
+def load_run_info(directory):
+    """Per-(image, plugin) status from the run manifest and runtimes from the metrics log, where present."""
+    info = {}
+    for entry in load_manifest(directory)["tasks"].values():
+        image = os.path.dirname(os.path.dirname(entry["output"]))
+        info.setdefault((image, entry["plugin"]), {})["status"] = entry["status"]
+
+    try:
+        with open(os.path.join(directory, METRICS_FILE), "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                # Later lines are later runs of the same task
+                info.setdefault((record.get("image", ""), record["plugin"]), {}).update(
+                    wall_time=record.get("wall_time"), peak_rss_mb=record.get("peak_rss_mb"),
+                    exit_code=record.get("exit_code"))
+    except OSError:
+        pass
+    return info
+
+
+def parents_first(rows):
+    """Puts iter_json_rows() output (children before their parent) back in document order by __id.
+
+    Only rows of a subtree whose root is still open are held back.
+    """
+    pending = []
+    next_id = 1
+    for row in rows:
+        heapq.heappush(pending, (row["__id"], row))
+        while pending and pending[0][0] == next_id:
+            yield heapq.heappop(pending)[1]
+            next_id += 1
+    while pending:
+        yield heapq.heappop(pending)[1]
+
+
+def write_plugin_data(json_path, directory, chunk_rows=CHUNK_ROWS, token_group=TOKEN_GROUP):
+    """One streaming pass over a plugin output: fixed-size row chunks plus a sharded token index.
+
+    Returns (columns, rows, chunks). Rows are stored as arrays in column
+    order; a column first seen in a later row is appended, so earlier rows
+    are simply shorter. tokens<n>.js holds the token lists of chunks
+    n*token_group up to (n+1)*token_group, so search loads the index a
+    shard at a time too.
+    """
+    os.makedirs(directory, exist_ok=True)
+    key = os.path.basename(directory)
+    columns, positions = [], {}
+    chunk, chunk_tokens, shard = [], set(), []
+    chunks = count = 0
+
+    def flush_shard():
+        n = (chunks - 1) // token_group
+        _write_js(os.path.join(directory, f"tokens{n:05d}.js"), f"{key}/tokens/{n}", shard)
+
+    def flush():
+        nonlocal chunks
+        _write_js(os.path.join(directory, f"chunk{chunks:05d}.js"), f"{key}/{chunks}", chunk)
+        shard.append(" ".join(sorted(chunk_tokens)))
+        chunks += 1
+        if len(shard) == token_group:
+            flush_shard()
+            shard.clear()
+
+    with open_output(json_path, "rt", encoding="utf-8") as f:
+        for row in parents_first(iter_json_rows(f)):
+            cells = []
+            for name, value in row.items():
+                if name not in positions:
+                    positions[name] = len(columns)
+                    columns.append(name)
+                position = positions[name]
+                if position >= len(cells):
+                    cells.extend([""] * (position + 1 - len(cells)))
+                cells[position] = text = _cell(value)
+                chunk_tokens.update(tokens(text))
+            chunk.append(cells)
+            count += 1
+            if len(chunk) == chunk_rows:
+                flush()
+                chunk, chunk_tokens = [], set()
+    if chunk:
+        flush()
+    if shard:
+        flush_shard()
+    return columns, count, chunks
+
+
+def build_report(directory, out_dir=None, chunk_rows=CHUNK_ROWS, token_group=TOKEN_GROUP):
+    """Builds <dir>/report/index.html over every JSON plugin output in a case directory."""
+    out_dir = out_dir or os.path.join(directory, REPORT_DIR)
+    data_dir = os.path.join(out_dir, DATA_DIR)
+    os.makedirs(data_dir, exist_ok=True)
+    info = load_run_info(directory)
+    plugins = []
+    started = time.monotonic()
+
+    for image, plugin, path in find_json_outputs(directory):
+        key = f"p{len(plugins):04d}"
+        entry = {"id": key, "image": image, "plugin": plugin, "output": os.path.relpath(path, directory)}
+        entry.update(info.pop((image, plugin), {}))
+        entry.setdefault("status", "done")
+        try:
+            entry["columns"], entry["rows"], entry["chunks"] = write_plugin_data(
+                path, os.path.join(data_dir, key), chunk_rows, token_group)
+        except (OSError, ValueError) as e:
+            log.warning(f"⚠️ Could not add {path} to the report: {e}")
+            entry.update(columns=[], rows=0, chunks=0, error=str(e))
+        plugins.append(entry)
+
+    # Tasks that left no JSON output (failed, timed out, non-JSON format) still get a line
+    for (image, plugin), extra in sorted(info.items()):
+        plugins.append(dict({"id": None, "image": image, "plugin": plugin, "columns": [], "rows": 0,
+                             "chunks": 0, "status": "unknown"}, **extra))
+
+    summary = {"case": os.path.abspath(directory), "generated": time.strftime("%Y-%m-%d %H:%M:%S"),
+               "chunk_rows": chunk_rows, "token_group": token_group, "plugins": plugins}
+    _write_js(os.path.join(data_dir, "summary.js"), "summary", summary)
+    index_path = os.path.join(out_dir, "index.html")
+    with open(index_path, "w", encoding="utf-8") as f:
+        f.write(INDEX_HTML)
+    log.info(f"📑 Report with {len(plugins)} plugin(s), {sum(p['rows'] for p in plugins)} rows "
+             f"written to {index_path} in {time.monotonic() - started:.1f}s")
+    return index_path
+
+
+INDEX_HTML = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>AutoVol case report</title>
+<style>
+body { font-family: system-ui, sans-serif; margin: 0; color: #222; }
+header { background: #1f2937; color: #fff; padding: 10px 16px; }
+header small { color: #9ca3af; margin-left: 12px; }
+main { display: flex; height: calc(100vh - 44px); }
+nav { width: 360px; overflow: auto; border-right: 1px solid #ddd; }
+nav table { width: 100%; border-collapse: collapse; font-size: 13px; }
+nav td, nav th { padding: 4px 6px; border-bottom: 1px solid #eee; text-align: left; }
+nav tr.plugin { cursor: pointer; }
+nav tr.plugin:hover, nav tr.active { background: #e0ecff; }
+.done { color: #15803d; } .error, .timeout, .cancelled { color: #b91c1c; }
+section { flex: 1; overflow: auto; padding: 8px 16px; }
+#toolbar { position: sticky; top: 0; background: #fff; padding: 6px 0; }
+#rows { border-collapse: collapse; font: 12px monospace; }
+#rows td, #rows th { border: 1px solid #e5e7eb; padding: 2px 6px; white-space: pre; text-align: left; }
+#rows th { background: #f3f4f6; position: sticky; top: 40px; }
+</style>
+</head>
+<body>
+<header><b>AutoVol case report</b><small id="case"></small></header>
+<main>
+<nav><table><thead><tr><th>Plugin</th><th>Status</th><th>Rows</th><th>Wall</th></tr></thead>
+<tbody id="plugins"></tbody></table></nav>
+<section>
+<div id="toolbar">
+<b id="title">Select a plugin</b>
+<button id="prev">&lsaquo;</button> <span id="page"></span> <button id="next">&rsaquo;</button>
+<input id="search" type="search" placeholder="Search rows" size="30">
+<span id="info"></span>
+</div>
+<table id="rows"></table>
+</section>
+</main>
+<script>
+var AutoVol = {
+  waiting: {}, cache: {},
+  receive: function (key, data) {
+    this.cache[key] = data;
+    (this.waiting[key] || []).forEach(function (cb) { cb(data); });
+    delete this.waiting[key];
+  },
+  // Loads data/<key>.js once, through a script tag so file:// works without a server
+  load: function (key, path, cb) {
+    if (key in this.cache) { cb(this.cache[key]); return; }
+    if (!this.waiting[key]) {
+      this.waiting[key] = [];
+      var s = document.createElement("script");
+      s.src = "data/" + path + ".js";
+      document.head.appendChild(s);
+    }
+    this.waiting[key].push(cb);
+  }
+};
+var state = { plugin: null, page: 0, matches: null, search: 0 };
+var $ = function (id) { return document.getElementById(id); };
+
+function esc(s) {
+  return String(s).replace(/[&<>"']/g, function (c) {
+    return { "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;" }[c];
+  });
+}
+function duration(s) {
+  if (s === undefined || s === null) return "";
+  return s >= 60 ? Math.floor(s / 60) + "m" + Math.round(s % 60) + "s" : s.toFixed(1) + "s";
+}
+function chunk(p, n, cb) { AutoVol.load(p.id + "/" + n, p.id + "/chunk" + ("0000" + n).slice(-5), cb); }
+function terms(q) { return q.toLowerCase().match(/[0-9a-z_]{2,}/g) || []; }
+
+function render(rows, first, total) {
+  var p = state.plugin, html = "<tr>" + p.columns.map(function (c) { return "<th>" + esc(c) + "</th>"; }).join("") + "</tr>";
+  rows.forEach(function (r) {
+    html += "<tr>" + p.columns.map(function (_, i) { return "<td>" + esc(r[i] === undefined ? "" : r[i]) + "</td>"; }).join("") + "</tr>";
+  });
+  $("rows").innerHTML = html;
+  var pages = Math.max(1, Math.ceil(total / state.size));
+  $("page").textContent = "page " + (state.page + 1) + " / " + pages;
+  $("info").textContent = total ? (first + 1) + "-" + (first + rows.length) + " of " + total + " rows" : "no rows";
+}
+
+function showPage() {
+  var p = state.plugin;
+  if (!p) return;
+  if (state.matches) {
+    var first = state.page * state.size;
+    render(state.matches.slice(first, first + state.size), first, state.matches.length);
+  } else if (p.chunks) {
+    chunk(p, state.page, function (rows) { render(rows, state.page * state.size, p.rows); });
+  } else {
+    render([], 0, 0);
+  }
+}
+
+function search(q) {
+  var p = state.plugin, words = terms(q), run = ++state.search;
+  state.page = 0;
+  if (!p || !words.length) { state.matches = null; showPage(); return; }
+  state.matches = [];
+  var shards = Math.ceil(p.chunks / state.group);
+  // One token shard at a time, dropped once its matching chunks are filtered, so the index never loads whole
+  (function next(s) {
+    if (run !== state.search) return;
+    if (s >= shards) { showPage(); return; }
+    var key = p.id + "/tokens/" + s;
+    AutoVol.load(key, p.id + "/tokens" + ("0000" + s).slice(-5), function (index) {
+      delete AutoVol.cache[key];
+      // Only fetch chunks whose token index contains every search term
+      var wanted = [];
+      index.forEach(function (toks, i) {
+        if (words.every(function (w) { return toks.indexOf(w) >= 0; })) wanted.push(s * state.group + i);
+      });
+      var found = {}, left = wanted.length;
+      if (!left) { next(s + 1); return; }
+      wanted.forEach(function (n) {
+        chunk(p, n, function (rows) {
+          found[n] = rows.filter(function (r) {
+            var text = r.join(" ").toLowerCase();
+            return words.every(function (w) { return text.indexOf(w) >= 0; });
+          });
+          if (--left === 0 && run === state.search) {
+            wanted.forEach(function (m) { Array.prototype.push.apply(state.matches, found[m]); });
+            showPage();
+            next(s + 1);
+          }
+        });
+      });
+    });
+  })(0);
+}
+
+function select(p, tr) {
+  Array.prototype.forEach.call(document.querySelectorAll("nav tr.active"), function (r) { r.className = "plugin"; });
+  tr.className = "plugin active";
+  state.plugin = p; state.page = 0; state.matches = null; state.search++;
+  $("title").textContent = (p.image ? p.image + " / " : "") + p.plugin;
+  $("search").value = "";
+  showPage();
+}
+
+AutoVol.load("summary", "summary", function (summary) {
+  state.size = summary.chunk_rows;
+  state.group = summary.token_group;
+  $("case").textContent = summary.case + " | generated " + summary.generated;
+  summary.plugins.forEach(function (p) {
+    var tr = document.createElement("tr");
+    tr.className = "plugin";
+    tr.title = p.error || p.output || "";
+    tr.innerHTML = "<td>" + esc((p.image ? p.image + " / " : "") + p.plugin) + "</td><td class='" + esc(p.status) + "'>" +
+      esc(p.status) + "</td><td>" + (p.id ? p.rows : "") + "</td><td>" + duration(p.wall_time) + "</td>";
+    if (p.id) tr.onclick = function () { select(p, tr); };
+    $("plugins").appendChild(tr);
+  });
+});
+$("prev").onclick = function () { if (state.page > 0) { state.page--; showPage(); } };
+$("next").onclick = function () {
+  var total = state.matches ? state.matches.length : (state.plugin ? state.plugin.rows : 0);
+  if ((state.page + 1) * state.size < total) { state.page++; showPage(); }
+};
+var timer;
+$("search").oninput = function () { clearTimeout(timer); var q = this.value; timer = setTimeout(function () { search(q); }, 250); };
+</script>
+</body>
+</html>
+"""
@@ -0,0 +1,347 @@
+import os
+import re
+import json
+import mmap
+import time
+import bisect
+import logging
+from dataclasses import dataclass, asdict
+from concurrent.futures import ProcessPoolExecutor
+from osdetect import read_header, container_of
+
+try:
+    import yara
+    HAS_YARA = True
+except ImportError:
+    HAS_YARA = False
+
+log = logging.getLogger("AutoVol")
+
+SCAN_NAME = "autovol.Scan"
+RULES_FILE = "rules.yar"
+SHARD_SIZE = 64 * 1024 * 1024
+# Hits may start anywhere in a shard and run this far into the next one
+OVERLAP = 64 * 1024
+# Per rule (or pattern) and shard, so one noisy pattern can't crowd out the others
+MAX_HITS_PER_RULE = 10000
+PREVIEW_BYTES = 64
+# Whole-image scans the sharded scan replaces; per-process ones still run, with the rules passed through
+RAW_SCAN_PLUGINS = ("yarascan.YaraScan", "regexscan.RegExScan")
+YARA_PLUGINS = ("windows.vadyarascan.VadYaraScan", "linux.vmayarascan.VmaYaraScan")
+REGEX_PLUGINS = ("windows.vadregexscan.VadRegExScan", "linux.vmaregexscan.VmaRegExScan")
+# Containers whose file offsets are not (even piecewise) physical memory
+COMPRESSED_CONTAINERS = ("hiberfil",)
+# Top of user space; process hits are only attributed below it so shared kernel pages don't match every process
+USER_SPACE_END = {64: 1 << 47, 32: 1 << 31}
+
+
+@dataclass
+class ScanHit:
+    rule: str
+    offset: int  # in the image file
+    length: int
+    data: str
+    physical: int = None
+    pid: int = None
+    process: str = None
+    virtual: int = None
+
+
+def scan_requested(args):
+    return bool(getattr(args, "yara_rules", None) or getattr(args, "scan_pattern", None))
+
+
+def load_patterns(values):
+    """Regexes from --scan-pattern; @FILE reads one pattern per line (blank lines and # comments skipped)."""
+    patterns = []
+    for value in values or []:
+        if value.startswith("@"):
+            with open(value[1:], "r", encoding="utf-8") as f:
+                patterns += [line.rstrip("\n") for line in f if line.strip() and not line.startswith("#")]
+        else:
+            patterns.append(value)
+    return patterns
+
+
+def plan_shards(size, shard_size=SHARD_SIZE):
+    """[(start, end)] covering size bytes; starts stay aligned so each shard can be mmapped on its own."""
+    granularity = mmap.ALLOCATIONGRANULARITY
+    shard_size = max(granularity, -(-shard_size // granularity) * granularity)
+    return [(start, min(start + shard_size, size)) for start in range(0, size, shard_size)]
+
+
+# --- worker processes ------------------------------------------------------
+
+_patterns = []
+_rules = None
+
+
+def _init_worker(patterns, rule_files):
+    """Compiles the patterns and rules once per worker process."""
+    global _patterns, _rules
+    _patterns = []
+    for pattern in patterns:
+        source = pattern if isinstance(pattern, bytes) else pattern.encode()
+        _patterns.append((f"regex:{source.decode(errors='replace')}", re.compile(source, re.DOTALL)))
+    if rule_files:
+        _rules = yara.compile(filepaths={f"r{i}": path for i, path in enumerate(rule_files)})
+
+
+def _yara_hits(data):
+    """(name, offset, matched bytes) for a yara-python 4.3+ or older match list."""
+    for match in _rules.match(data=data):
+        for string in match.strings:
+            if hasattr(string, "instances"):
+                for instance in string.instances:
+                    yield f"{match.rule}:{string.identifier}", instance.offset, instance.matched_data
+            else:
+                offset, identifier, matched = string
+                yield f"{match.rule}:{identifier}", offset, matched
+
+
+def scan_shard(image, start, end, overlap):
+    """(hits starting in [start, end), capped); reads up to `overlap` past end so matches crossing it are whole."""
+    stop = min(end + overlap, os.path.getsize(image))
+    limit = end - start
+    found = []
+    capped = False
+    with open(image, "rb") as f, mmap.mmap(f.fileno(), stop - start, offset=start, access=mmap.ACCESS_READ) as data:
+        for name, pattern in _patterns:
+            count = 0
+            for match in pattern.finditer(data):
+                if match.start() >= limit:
+                    break  # the next shard owns it
+                if count >= MAX_HITS_PER_RULE:
+                    capped = True
+                    break
+                found.append((name, match.start(), match.group()))
+                count += 1
+        if _rules is not None:
+            counts = {}
+            for name, offset, matched in _yara_hits(data[:]):
+                if offset >= limit:
+                    continue
+                if counts.get(name, 0) >= MAX_HITS_PER_RULE:
+                    capped = True
+                    continue
+                counts[name] = counts.get(name, 0) + 1
+                found.append((name, offset, matched))
+    hits = [ScanHit(name, start + offset, len(matched), matched[:PREVIEW_BYTES].hex(" "))
+            for name, offset, matched in found]
+    return hits, capped
+
+
+def dedupe(hits):
+    """Drops hits starting inside the previous kept hit of the same rule, sorted by offset.
+
+    A match crossing a shard boundary is found whole by its own shard, and
+    again from the boundary by the next one; the second is its tail.
+    """
+    kept = []
+    ends = {}
+    for hit in sorted(hits, key=lambda hit: (hit.rule, hit.offset)):
+        if hit.offset < ends.get(hit.rule, -1):
+            continue
+        ends[hit.rule] = hit.offset + max(hit.length, 1)
+        kept.append(hit)
+    return sorted(kept, key=lambda hit: (hit.offset, hit.rule))
+
+
+def scan_image(image, patterns=(), rule_files=(), workers=None, shard_size=SHARD_SIZE, overlap=OVERLAP):
+    """Scans an image file shard by shard in a process pool; returns hits sorted by offset, deduplicated."""
+    size = os.path.getsize(image)
+    shards = plan_shards(size, shard_size)
+    started = time.monotonic()
+    hits = []
+    truncated = 0
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker,
+                             initargs=(list(patterns), list(rule_files))) as pool:
+        futures = [pool.submit(scan_shard, image, start, end, overlap) for start, end in shards]
+        for future in futures:
+            shard_hits, capped = future.result()
+            truncated += capped
+            hits += shard_hits
+    hits = dedupe(hits)
+    elapsed = time.monotonic() - started
+    if truncated:
+        log.warning(f"⚠️ {truncated} shard(s) hit the {MAX_HITS_PER_RULE} hits per rule cap; tighten the patterns")
+    log.info(f"🔎 Scanned {size / (1024 ** 3):.2f}GB in {len(shards)} shards: {len(hits)} hit(s) in {elapsed:.1f}s "
+             f"({size / (1024 * 1024) / max(elapsed, 1e-6):.0f}MB/s)")
+    return hits
+
+
+# --- physical offsets -> processes --------------------------------------------
+
+def invert_segments(segments):
+    """Sorted (file offset, length, physical offset) runs from a physical layer's (phys, len, file, ...) mapping."""
+    return sorted((file_offset, length, physical) for physical, length, file_offset, *_ in segments)
+
+
+def to_physical(runs, offset):
+    """Physical address of a file offset via invert_segments() runs, or None for container metadata."""
+    i = bisect.bisect_right(runs, (offset, float("inf"))) - 1
+    if i >= 0:
+        file_offset, length, physical = runs[i]
+        if offset < file_offset + length:
+            return physical + offset - file_offset
+    return None
+
+
+def attribute(hits, entries, pid, process):
+    """Fills in pid/process/virtual for hits whose physical address lies in a layer's mapping entries.
+
+    `hits` must be sorted by physical address; entries are (virtual, length,
+    physical, physical length, layer) tuples as yielded by layer.mapping().
+    """
+    addresses = [hit.physical for hit in hits]
+    for virtual, _, physical, length, _ in entries:
+        i = bisect.bisect_left(addresses, physical)
+        while i < len(addresses) and addresses[i] < physical + length:
+            hit = hits[i]
+            if hit.pid is None and hit.process is None:
+                hit.pid, hit.process, hit.virtual = pid, process, virtual + hit.physical - physical
+            i += 1
+
+
+def _processes(engine, os_name):
+    """(pid, name, process layer name) for every process the kernel lists; one pass, no per-hit lookups."""
+    from volatility3.framework.objects import utility
+    context = engine.context
+    module = engine.shared["module"]
+    if os_name == "windows":
+        from volatility3.plugins.windows import pslist
+        for proc in pslist.PsList.list_processes(context, module):
+            try:
+                name = proc.ImageFileName.cast("string", max_length=proc.ImageFileName.vol.count, errors="replace")
+                yield int(proc.UniqueProcessId), name, proc.add_process_layer()
+            except Exception as e:
+                log.debug(f"Skipping an unreadable process: {e}")
+    elif os_name == "linux":
+        from volatility3.plugins.linux import pslist
+        for task in pslist.PsList.list_tasks(context, module):
+            try:
+                layer = task.add_process_layer()
+                if layer is not None:  # kernel threads have no user space
+                    yield int(task.pid), utility.array_to_string(task.comm), layer
+            except Exception as e:
+                log.debug(f"Skipping an unreadable task: {e}")
+    else:
+        log.warning(f"⚠️ Mapping scan hits to processes is not supported for {os_name} images")
+
+
+def map_hits(image, hits, os_hint=None, symbol_dir=None):
+    """Resolves each hit's physical address and owning process (or the kernel) with one Volatility pass."""
+    from engine import VolatilityEngine, HAS_VOLATILITY
+    if not HAS_VOLATILITY:
+        log.warning("⚠️ volatility3 is not importable; scan hits keep file offsets only")
+        return hits
+    from volatility3.framework.layers.physical import FileLayer
+    started = time.monotonic()
+    engine = VolatilityEngine(image, os_hint, symbol_dir)
+    os_name = engine.prepare()
+    if not os_name or "module" not in engine.shared:
+        log.warning("⚠️ Could not resolve the kernel; scan hits keep file offsets only")
+        return hits
+
+    context = engine.context
+    kernel_layer = context.layers[engine.shared["layer"]]
+    physical_layer = context.layers[kernel_layer.config["memory_layer"]]
+    if isinstance(physical_layer, FileLayer):
+        for hit in hits:
+            hit.physical = hit.offset
+    else:
+        runs = invert_segments(physical_layer.mapping(0, physical_layer.maximum_address + 1, ignore_errors=True))
+        for hit in hits:
+            hit.physical = to_physical(runs, hit.offset)
+
+    located = sorted((hit for hit in hits if hit.physical is not None), key=lambda hit: hit.physical)
+    user_end = USER_SPACE_END.get(kernel_layer.bits_per_register, USER_SPACE_END[64])
+    processes = 0
+    for pid, name, layer_name in _processes(engine, os_name):
+        layer = context.layers[layer_name]
+        attribute(located, layer.mapping(0, min(user_end, layer.maximum_address + 1), ignore_errors=True), pid, name)
+        processes += 1
+    kernel_start = user_end if kernel_layer.bits_per_register == 32 else kernel_layer.maximum_address + 1 - user_end
+    attribute(located, kernel_layer.mapping(kernel_start, kernel_layer.maximum_address + 1 - kernel_start,
+                                            ignore_errors=True), None, "kernel")
+    owned = sum(hit.process is not None for hit in hits)
+    log.info(f"🧭 Mapped {owned}/{len(hits)} scan hit(s) across {processes} processes and the kernel "
+             f"in {time.monotonic() - started:.1f}s")
+    return hits
+
+
+# --- CLI glue ---------------------------------------------------------------
+
+def rules_file(args, directory):
+    """One YARA file that includes every --yara-rules file, for Volatility plugins that take a single --yara-file."""
+    rule_files = getattr(args, "yara_rules", None) or []
+    if len(rule_files) == 1:
+        return os.path.abspath(rule_files[0])
+    path = os.path.join(directory, SCAN_NAME, RULES_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(f'include "{os.path.abspath(rule)}"\n' for rule in rule_files))
+    return path
+
+
+def plugin_arguments(plugin, args, directory):
+    """Plugin options AutoVol passes through to vol.py, e.g. the YARA rules for VadYaraScan."""
+    if plugin in YARA_PLUGINS and getattr(args, "yara_rules", None):
+        return ["--yara-file", rules_file(args, directory)]
+    if plugin in REGEX_PLUGINS and getattr(args, "scan_pattern", None):
+        # These take a single --pattern
+        return ["--pattern", "|".join(f"(?:{p})" for p in load_patterns(args.scan_pattern))]
+    return []
+
+
+def without_raw_scans(plugins, args):
+    """Drops the single-threaded whole-image scan plugins when the sharded scan is going to run."""
+    if not scan_requested(args):
+        return plugins
+    dropped = [p for p in plugins if p in RAW_SCAN_PLUGINS]
+    if dropped:
+        log.info(f"⏭️ {', '.join(dropped)} replaced by the parallel sharded scan")
+    return [p for p in plugins if p not in RAW_SCAN_PLUGINS]
+
+
+def write_hits(hits, path):
+    """Writes hits as a Volatility-style JSON row list, so the store, report and convert pick them up."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    rows = []
+    for hit in hits:
+        row = asdict(hit)
+        rows.append({"Rule": row["rule"], "Offset": row["offset"], "Offset(P)": row["physical"], "PID": row["pid"],
+                     "Process": row["process"], "Offset(V)": row["virtual"], "Length": row["length"],
+                     "Data": row["data"], "__children": []})
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(rows, f)
+    os.replace(tmp_file, path)
+    return path
+
+
+def scan_for_args(args, image, directory, os_hint=None, symbol_dir=None):
+    """Runs the sharded scan of one image for --yara-rules/--scan-pattern; returns the hits file or None."""
+    container, _ = container_of(read_header(image))
+    if container in COMPRESSED_CONTAINERS:
+        log.warning(f"⚠️ {os.path.basename(image)} is a compressed {container} image; raw scanning skipped")
+        return None
+    # --scan-shard-size/--scan-overlap are parsed to MB
+    shard_mb, overlap_mb = getattr(args, "scan_shard_size", None), getattr(args, "scan_overlap", None)
+    shard_size = int(shard_mb * 1024 * 1024) if shard_mb else SHARD_SIZE
+    overlap = int(overlap_mb * 1024 * 1024) if overlap_mb else OVERLAP
+    try:
+        hits = scan_image(image, load_patterns(getattr(args, "scan_pattern", None)),
+                          getattr(args, "yara_rules", None) or [], getattr(args, "scan_workers", None),
+                          shard_size, overlap)
+    except (OSError, re.error) as e:
+        log.error(f"❌ Scan of {image} failed: {e}")
+        return None
+    if hits and not getattr(args, "no_scan_mapping", False):
+        try:
+            map_hits(image, hits, os_hint, symbol_dir)
+        except Exception as e:
+            log.warning(f"⚠️ Could not map scan hits to processes: {e}")
+    path = write_hits(hits, os.path.join(directory, SCAN_NAME, f"{SCAN_NAME}.json"))
+    log.info(f"💾 {len(hits)} scan hit(s) written to {path}")
+    return path
@@ -0,0 +1,252 @@
+import os
+import json
+import heapq
+import queue
+import logging
+import threading
+import psutil
+from statistics import median
+from capabilities import CACHE_DIR
+
+log = logging.getLogger("AutoVol")
+
+HISTORY_FILE = os.path.join(CACHE_DIR, "history.json")
+MAX_SAMPLES = 20
+GB = 1024 ** 3
+
+# Seconds per GB of image for plugins we know are heavy, used until history exists
+DEFAULT_COSTS = {
+    "timeliner.Timeliner": 120.0,
+    "windows.strings.Strings": 90.0,
+    "windows.vadyarascan.VadYaraScan": 90.0,
+    "yarascan.YaraScan": 90.0,
+    "regexscan.RegExScan": 60.0,
+    "windows.dumpfiles.DumpFiles": 60.0,
+    "windows.filescan.FileScan": 45.0,
+    "windows.mftscan.MFTScan": 45.0,
+    "windows.mftscan.ADS": 45.0,
+    "windows.mftscan.ResidentData": 45.0,
+    "windows.poolscanner.PoolScanner": 40.0,
+    "windows.handles.Handles": 30.0,
+    "windows.vadregexscan.VadRegExScan": 30.0,
+    "linux.vmayarascan.VmaYaraScan": 60.0,
+    "linux.vmaregexscan.VmaRegExScan": 30.0,
+    "linux.pagecache.RecoverFs": 60.0,
+    "layerwriter.LayerWriter": 30.0,
+    "vmscan.Vmscan": 30.0,
+}
+DEFAULT_COST = 5.0
+DEFAULT_PEAK_MB = 512.0
+
+
+class RuntimeHistory:
+    """Per-plugin wall/CPU/peak-memory samples persisted between runs."""
+
+    def __init__(self, path=HISTORY_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.samples = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.samples = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def record(self, plugin, image_size, wall, cpu, peak_mb, ok=True):
+        sample = {
+            "wall": round(wall, 3),
+            "cpu": round(cpu, 3),
+            "peak_mb": round(peak_mb, 1),
+            "image_gb": round(image_size / GB, 3),
+            "ok": ok,
+        }
+        with self.lock:
+            plugin_samples = self.samples.setdefault(plugin, [])
+            plugin_samples.append(sample)
+            del plugin_samples[:-MAX_SAMPLES]
+            self._save()
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_file = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(self.samples, f)
+            os.replace(tmp_file, self.path)
+        except OSError as e:
+            log.warning(f"⚠️ Could not save runtime history: {e}")
+
+    def estimate(self, plugin, image_size, field="wall"):
+        """Median of past samples scaled linearly to this image size, or None if unseen."""
+        with self.lock:
+            samples = [s for s in self.samples.get(plugin, []) if s.get("ok", True)]
+        if not samples:
+            return None
+        image_gb = max(image_size / GB, 0.25)
+        if field == "peak_mb":
+            # Peak memory grows sub-linearly with image size; never scale it down
+            ratio = image_gb / max(median(s["image_gb"] for s in samples), 0.25)
+            return median(s["peak_mb"] for s in samples) * max(1.0, ratio) ** 0.5
+        return median(s[field] / max(s["image_gb"], 0.25) for s in samples) * image_gb
+
+
+def estimate_eta(elapsed, fraction, expected=None):
+    """Seconds left for a running plugin, blending its progress rate with its historical duration.
+
+    Early on the history dominates; as progress grows the observed rate takes
+    over. Returns None when there is nothing to go on yet.
+    """
+    projected = elapsed / fraction if fraction >= 0.01 else None
+    if projected is None and expected is None:
+        return None
+    if projected is None:
+        total = expected
+    elif expected is None:
+        total = projected
+    else:
+        total = fraction * projected + (1 - fraction) * expected
+    return max(0.0, total - elapsed)
+
+
+class Scheduler:
+    """Orders plugins longest-processing-time-first from runtime history."""
+
+    def __init__(self, history, image_size):
+        self.history = history
+        self.image_size = image_size
+
+    def estimate(self, plugin):
+        estimate = self.history.estimate(plugin, self.image_size)
+        if estimate is not None:
+            return estimate
+        return DEFAULT_COSTS.get(plugin, DEFAULT_COST) * max(self.image_size / GB, 0.25)
+
+    def estimate_peak_mb(self, plugin):
+        estimate = self.history.estimate(plugin, self.image_size, "peak_mb")
+        if estimate is not None:
+            return estimate
+        return DEFAULT_PEAK_MB + 0.05 * self.image_size / (1024 * 1024)
+
+    def order(self, plugins):
+        return sorted(plugins, key=lambda p: (-self.estimate(p), p))
+
+    def predict_makespan(self, plugins, workers):
+        """Simulates greedy LPT assignment and returns the finish time of the busiest worker."""
+        loads = [0.0] * max(1, workers)
+        for plugin in self.order(plugins):
+            heapq.heapreplace(loads, loads[0] + self.estimate(plugin))
+        return max(loads)
+
+
+# Lighter tasks admitted ahead of a blocked heavier one before it gets the next free memory
+MAX_BYPASSES = 4
+
+
+class TaskPool:
+    """Queue-compatible work pool with per-image fairness and optional memory admission.
+
+    get() prefers the image with the fewest tasks in flight so one huge image
+    cannot starve the rest; within an image, tasks keep scheduler order. With a
+    budget, a worker gets the first task whose expected peak fits, so lighter
+    plugins backfill while a heavy one waits, but only max_bypasses times:
+    after that nothing else is admitted until the heavy task fits, so it
+    can't starve behind a stream of small ones. A worker holds its task's
+    reservation until it calls task_done().
+    """
+
+    def __init__(self, budget_mb=None, estimate_peak_mb=None, poll_interval=1.0, max_bypasses=MAX_BYPASSES):
+        self.budget_mb = budget_mb
+        self.estimate_peak_mb = estimate_peak_mb
+        self.poll_interval = poll_interval
+        self.max_bypasses = max_bypasses
+        self.bypasses = {}  # id(blocked task) -> times a lighter task was admitted ahead of it
+        self.cond = threading.Condition()
+        self.pending = {}
+        self.running = {}
+        self.sentinels = 0
+        self.unfinished = 0
+        self.reserved_mb = 0.0
+        self.reservations = {}
+
+    def put(self, item):
+        with self.cond:
+            if item is None:
+                self.sentinels += 1
+            else:
+                self.pending.setdefault(getattr(item, "image_id", ""), []).append(item)
+            self.unfinished += 1
+            self.cond.notify_all()
+
+    def _headroom_mb(self):
+        available_mb = psutil.virtual_memory().available / (1024 * 1024)
+        return min(self.budget_mb - self.reserved_mb, available_mb)
+
+    def _candidates(self):
+        images = sorted((key for key in self.pending if self.pending[key]), key=lambda k: self.running.get(k, 0))
+        for key in images:
+            for index, task in enumerate(self.pending[key]):
+                yield key, index, task
+
+    def _admit(self):
+        if not self.budget_mb:
+            return next(self._candidates(), (None, None, None)), 0.0
+        headroom = self._headroom_mb()
+        blocked = None
+        for key, index, task in self._candidates():
+            need = self.estimate_peak_mb(task)
+            # Something too big for any budget still runs, but only on its own
+            if need <= headroom or not self.reservations:
+                if blocked is not None:
+                    if self.bypasses.get(blocked, 0) >= self.max_bypasses:
+                        break  # drain until the blocked task fits
+                    self.bypasses[blocked] = self.bypasses.get(blocked, 0) + 1
+                self.bypasses.pop(id(task), None)
+                return (key, index, task), need
+            if blocked is None:
+                blocked = id(task)
+        return (None, None, None), 0.0
+
+    def get(self, block=True, owner=None):
+        """Returns the next admissible task, or None for a sentinel.
+
+        With block=False raises queue.Empty instead of waiting. owner keys the
+        memory reservation (default: the calling thread) for callers such as
+        coroutines that share one thread.
+        """
+        owner = threading.get_ident() if owner is None else owner
+        with self.cond:
+            while True:
+                (key, index, task), need = self._admit()
+                if task is not None:
+                    self.pending[key].pop(index)
+                    self.running[key] = self.running.get(key, 0) + 1
+                    self.reservations[owner] = (key, need)
+                    self.reserved_mb += need
+                    return task
+                if not any(self.pending.values()) and self.sentinels:
+                    self.sentinels -= 1
+                    return None
+                if not block:
+                    raise queue.Empty
+                # Wake on task_done(), or periodically since system memory can free up on its own
+                self.cond.wait(self.poll_interval)
+
+    def task_done(self, owner=None):
+        owner = threading.get_ident() if owner is None else owner
+        with self.cond:
+            reservation = self.reservations.pop(owner, None)
+            if reservation:
+                key, need = reservation
+                self.running[key] -= 1
+                self.reserved_mb -= need
+            self.unfinished -= 1
+            self.cond.notify_all()
+
+    def join(self):
+        with self.cond:
+            while self.unfinished:
+                self.cond.wait()
+
+    def empty(self):
+        with self.cond:
+            return not any(self.pending.values())
@@ -0,0 +1,160 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import logging
+import threading
+from streaming import open_output
+from convert import iter_json_rows
+
+log = logging.getLogger("AutoVol")
+
+STORE_FILE = "autovol.db"
+BATCH_SIZE = 5000
+# Columns worth an index: process ids, offsets, names and timestamps
+INDEX_PATTERN = re.compile(r"pid|offset|name|time|date|address|^base$|^port|^(local|foreign)addr", re.IGNORECASE)
+
+
+def table_name(plugin):
+    """windows.pslist.PsList -> windows_pslist_PsList"""
+    return re.sub(r"\W", "_", plugin)
+
+
+def quote(identifier):
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def flatten_rows(tree, parent=None, depth=0, counter=None):
+    """Yields TreeGrid rows depth-first with __id/__parent/__depth, dropping __children."""
+    counter = counter if counter is not None else [0]
+    for node in tree:
+        counter[0] += 1
+        row_id = counter[0]
+        row = {k: v for k, v in node.items() if k != "__children"}
+        row["__id"], row["__parent"], row["__depth"] = row_id, parent, depth
+        yield row
+        yield from flatten_rows(node.get("__children") or [], row_id, depth + 1, counter)
+
+
+def sql_type(values):
+    """Narrowest SQLite type covering every non-null value in a column."""
+    kinds = {type(v) for v in values if v is not None}
+    if not kinds:
+        return "TEXT"
+    if kinds <= {bool, int}:
+        return "INTEGER"
+    if kinds <= {bool, int, float}:
+        return "REAL"
+    return "TEXT"
+
+
+def sql_value(value):
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return value
+
+
+class ResultStore:
+    """SQLite database of plugin results: one typed, indexed table per plugin."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS _plugins ("
+            "plugin TEXT, image TEXT, table_name TEXT, rows INTEGER, source TEXT, ingested_at REAL, "
+            "PRIMARY KEY (plugin, image))"
+        )
+        self.conn.commit()
+
+    @classmethod
+    def open(cls, directory):
+        return cls(os.path.join(directory, STORE_FILE))
+
+    def _columns(self, table):
+        return {row[1] for row in self.conn.execute(f"PRAGMA table_info({quote(table)})")}
+
+    def _prepare_table(self, table, types):
+        existing = self._columns(table)
+        if not existing:
+            cols = ", ".join(f"{quote(c)} {t}" for c, t in types.items())
+            self.conn.execute(f"CREATE TABLE {quote(table)} (image TEXT, {cols})")
+            self.conn.execute(f"CREATE INDEX {quote(f'ix_{table}_image')} ON {quote(table)} (image)")
+            existing = self._columns(table)
+        for col, col_type in types.items():
+            if col not in existing:
+                self.conn.execute(f"ALTER TABLE {quote(table)} ADD COLUMN {quote(col)} {col_type}")
+        for col in types:
+            if INDEX_PATTERN.search(col):
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS {quote(f'ix_{table}_{col}')} ON {quote(table)} ({quote(col)})")
+
+    def _insert_batch(self, table, image, batch):
+        columns = {}
+        for row in batch:
+            for key, value in row.items():
+                columns.setdefault(key, []).append(value)
+        types = {col: sql_type(values) for col, values in columns.items()}
+        for fixed in ("__id", "__parent", "__depth"):
+            types.setdefault(fixed, "INTEGER")
+        # Columns first seen in a later batch are added on the fly
+        self._prepare_table(table, types)
+        names = list(types)
+        insert = (f"INSERT INTO {quote(table)} (image, {', '.join(quote(c) for c in names)}) "
+                  f"VALUES (?, {', '.join('?' for _ in names)})")
+        self.conn.executemany(insert, [[image] + [sql_value(row.get(c)) for c in names] for row in batch])
+
+    def ingest_rows(self, plugin, rows, image="", source=None):
+        """Replaces this image's rows for a plugin, BATCH_SIZE rows at a time; returns the number stored."""
+        table = table_name(plugin)
+        count = 0
+        with self.lock, self.conn:
+            self._prepare_table(table, {"__id": "INTEGER", "__parent": "INTEGER", "__depth": "INTEGER"})
+            self.conn.execute(f"DELETE FROM {quote(table)} WHERE image = ?", (image,))
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) == BATCH_SIZE:
+                    self._insert_batch(table, image, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                self._insert_batch(table, image, batch)
+                count += len(batch)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO _plugins VALUES (?, ?, ?, ?, ?, ?)",
+                (plugin, image, table, count, source, time.time()),
+            )
+        return count
+
+    def ingest(self, plugin, json_path, image=""):
+        """Streams a plugin's JSON TreeGrid output file into its table."""
+        with open_output(json_path, "rt", encoding="utf-8") as f:
+            count = self.ingest_rows(plugin, iter_json_rows(f), image, json_path)
+        log.info(f"🗄️ Stored {count} rows of {plugin} in {table_name(plugin)}")
+        return count
+
+    def safe_ingest(self, plugin, json_path, image=""):
+        """Ingests, logging instead of raising so a bad file never fails the run."""
+        try:
+            return self.ingest(plugin, json_path, image)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            log.warning(f"⚠️ Could not store {plugin} results: {e}")
+            return 0
+
+    def query(self, sql, params=()):
+        """Runs SQL and returns (column names, rows)."""
+        with self.lock:
+            cursor = self.conn.execute(sql, params)
+            columns = [d[0] for d in cursor.description or []]
+            return columns, cursor.fetchall()
+
+    def tables(self):
+        return self.query("SELECT plugin, image, table_name, rows FROM _plugins ORDER BY plugin, image")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,176 @@
+import os
+import re
+import gzip
+import time
+import hashlib
+import threading
+from collections import deque
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+CHUNK_SIZE = 1 << 16  # 64 KiB
+# Volatility redraws e.g. "Progress:   42.17\t\tScanning FileLayer using PageMapScanner" on stderr
+PROGRESS_PATTERN = re.compile(r"^Progress:\s+(\d+(?:\.\d+)?)\s*(.*)$")
+
+
+def parse_progress(line):
+    """Returns (fraction, stage) for a Volatility progress line, else None."""
+    match = PROGRESS_PATTERN.match(line.strip())
+    if not match:
+        return None
+    return min(float(match.group(1)) / 100.0, 1.0), match.group(2).strip()
+
+
+COMPRESSION_SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+DEFAULT_LEVELS = {"gzip": 6, "zstd": 3}
+
+
+def compressed_path(path, compress="none"):
+    return path + COMPRESSION_SUFFIXES[compress]
+
+
+def strip_compression(path):
+    """out.json.zst -> out.json"""
+    for suffix in (".gz", ".zst"):
+        if path.endswith(suffix):
+            return path[:-len(suffix)]
+    return path
+
+
+def find_output(output_dir, plugin, extensions):
+    """Path of a plugin's output file in any format/compression, or None."""
+    for ext in extensions:
+        for suffix in COMPRESSION_SUFFIXES.values():
+            path = os.path.join(output_dir, f"{plugin}.{ext}{suffix}")
+            if os.path.exists(path):
+                return path
+    return None
+
+
+def _require_zstd():
+    if not HAS_ZSTD:
+        raise RuntimeError("❌ zstd compression needs the 'zstandard' package (pip install zstandard)")
+
+
+def open_output(path, mode="rb", level=None, encoding=None):
+    """Opens a plugin output file, (de)compressing .gz/.zst transparently by extension."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, compresslevel=level or DEFAULT_LEVELS["gzip"], encoding=encoding)
+    if path.endswith(".zst"):
+        _require_zstd()
+        cctx = zstandard.ZstdCompressor(level=level or DEFAULT_LEVELS["zstd"]) if "w" in mode else None
+        return zstandard.open(path, mode, cctx=cctx, encoding=encoding)
+    return open(path, mode, encoding=encoding)
+
+
+def read_chunk(pipe, size=CHUNK_SIZE):
+    """Returns whatever is available on the pipe (up to size) without waiting to fill it."""
+    reader = getattr(pipe, "read1", None) or pipe.read
+    return reader(size)
+
+
+class OutputWriter:
+    """Writes plugin stdout to disk chunk by chunk, counting bytes and lines and hashing as it goes.
+
+    Compression is chosen by the path's .gz/.zst extension; counts and the
+    checksum always describe the uncompressed output.
+    """
+
+    def __init__(self, path, level=None):
+        self.path = path
+        self.bytes_written = 0
+        self.lines = 0
+        self.write_seconds = 0.0  # time spent writing, for --trace
+        self._digest = hashlib.blake2b(digest_size=32)
+        self._file = open_output(path, "wb", level)
+
+    def write(self, chunk):
+        started = time.perf_counter()
+        self._file.write(chunk)
+        self._digest.update(chunk)
+        self.bytes_written += len(chunk)
+        self.lines += chunk.count(b"\n")
+        self.write_seconds += time.perf_counter() - started
+
+    @property
+    def checksum(self):
+        return f"blake2b:{self._digest.hexdigest()}"
+
+    def close(self):
+        self._file.close()
+
+    @property
+    def stored_bytes(self):
+        return os.path.getsize(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class StderrTail(threading.Thread):
+    """Drains a pipe in the background, keeping only its last max_lines lines.
+
+    Progress lines are not kept; they go to on_progress(fraction, stage) as they arrive.
+    """
+
+    def __init__(self, pipe, max_lines=200, on_progress=None):
+        super().__init__(daemon=True)
+        self.pipe = pipe
+        self.on_progress = on_progress
+        self.lines = deque(maxlen=max_lines)
+        self.bytes_read = 0
+        self._partial = b""
+
+    def feed(self, chunk):
+        self.bytes_read += len(chunk)
+        # Volatility redraws its progress line with \r, so treat it as a line break too
+        data = (self._partial + chunk).replace(b"\r", b"\n")
+        *complete, self._partial = data.split(b"\n")
+        for line in complete:
+            if line.strip():
+                self._line(line.decode(errors="replace"))
+        # A runaway line without breaks must not grow without bound
+        if len(self._partial) > CHUNK_SIZE:
+            self.lines.append(self._partial.decode(errors="replace"))
+            self._partial = b""
+
+    def _line(self, line):
+        progress = parse_progress(line)
+        if progress is None:
+            self.lines.append(line)
+        elif self.on_progress:
+            self.on_progress(*progress)
+
+    def run(self):
+        while True:
+            chunk = read_chunk(self.pipe)
+            if not chunk:
+                break
+            self.feed(chunk)
+        self.close()
+
+    def close(self):
+        """Keeps a final line that had no line break."""
+        if self._partial.strip():
+            self.lines.append(self._partial.decode(errors="replace"))
+        self._partial = b""
+
+    def text(self):
+        return "\n".join(self.lines)
+
+
+def copy_stream(src, writer, chunk_size=CHUNK_SIZE):
+    """Copies a pipe into a writer until EOF; memory use is one chunk regardless of output size."""
+    while True:
+        chunk = read_chunk(src, chunk_size)
+        if not chunk:
+            break
+        writer.write(chunk)
+    return writer
@@ -0,0 +1,304 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import zipfile
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger("AutoVol")
+
+SYMBOL_BASE_URL = "https://downloads.volatilityfoundation.org/volatility3/symbols"
+SYMBOL_PACKS = ("windows", "mac", "linux")
+CHECKSUM_FILE = "SHA256SUMS"
+SEGMENT_SIZE = 32 * 1024 * 1024
+# Bytes still in flight when a connection drops are lost, so keep reads small
+CHUNK_SIZE = 64 * 1024
+# Save resume state after roughly this many new bytes per segment
+STATE_INTERVAL = 8 * 1024 * 1024
+RETRIES = 3
+TIMEOUT = 60
+
+
+class SymbolDownloadError(Exception):
+    pass
+
+
+def split_segments(size, segment_size=SEGMENT_SIZE):
+    """[[start, end, next]] byte ranges (end inclusive) covering a file of this size."""
+    if not size:
+        return [[0, None, 0]]
+    return [[start, min(start + segment_size, size) - 1, start] for start in range(0, size, segment_size)]
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fetch_checksums(base_url):
+    """Parses <base>/SHA256SUMS ("<hex>  <file>" lines) if the mirror publishes one."""
+    try:
+        response = requests.get(f"{base_url}/{CHECKSUM_FILE}", timeout=TIMEOUT)
+        if response.status_code != 200:
+            return {}
+    except requests.RequestException:
+        return {}
+    checksums = {}
+    for line in response.text.splitlines():
+        parts = line.split()
+        if len(parts) == 2:
+            checksums[parts[1].lstrip("*")] = parts[0].lower()
+    return checksums
+
+
+class SegmentedDownload:
+    """One file fetched as parallel HTTP Range segments into <file>.part, resumable via <file>.part.json."""
+
+    def __init__(self, url, path, segment_size=SEGMENT_SIZE):
+        self.url = url
+        self.path = path
+        self.part_path = f"{path}.part"
+        self.state_path = f"{self.part_path}.json"
+        self.segment_size = segment_size
+        self.lock = threading.Lock()
+        self.size = None
+        self.validator = None
+        self.ranges = None
+        self.segments = []
+        self.resumed_bytes = 0
+        self.fetched_bytes = 0
+
+    def probe(self):
+        """HEAD the file for its size, Range support and ETag/Last-Modified."""
+        response = requests.head(self.url, allow_redirects=True, timeout=TIMEOUT)
+        response.raise_for_status()
+        length = response.headers.get("Content-Length")
+        self.size = int(length) if length else None
+        self.validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+        self.ranges = response.headers.get("Accept-Ranges", "").lower() == "bytes"
+        return self.ranges
+
+    def plan(self):
+        """Picks up an interrupted download when the remote file is unchanged, else starts a fresh .part."""
+        ranges = self.ranges if self.ranges is not None else self.probe()
+        state = self._load_state()
+        if (ranges and state and state["url"] == self.url and state["size"] == self.size
+                and state["validator"] == self.validator and os.path.exists(self.part_path)
+                and os.path.getsize(self.part_path) == self.size):
+            self.segments = state["segments"]
+            self.resumed_bytes = sum(seg[2] - seg[0] for seg in self.segments)
+            log.info(f"⏯️ Resuming {os.path.basename(self.path)} "
+                     f"({self.resumed_bytes / (1024 * 1024):.1f}MB already downloaded)")
+        else:
+            self.segments = split_segments(self.size if ranges else None, self.segment_size)
+            with open(self.part_path, "wb") as f:
+                if ranges and self.size:
+                    f.truncate(self.size)
+            self._save_state()
+        return [i for i, seg in enumerate(self.segments) if seg[1] is None or seg[2] <= seg[1]]
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_state(self):
+        with self.lock:
+            state = {"url": self.url, "size": self.size, "validator": self.validator, "segments": self.segments}
+            tmp_file = f"{self.state_path}.tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_file, self.state_path)
+
+    def fetch_segment(self, index):
+        """Downloads what is left of one segment, retrying transient errors from where it stopped."""
+        segment = self.segments[index]
+        for attempt in range(1, RETRIES + 1):
+            try:
+                self._fetch(segment)
+                return
+            except (requests.RequestException, SymbolDownloadError) as e:
+                if attempt == RETRIES:
+                    raise
+                log.warning(f"⚠️ Segment {index} of {os.path.basename(self.path)} failed ({e}); retrying")
+                time.sleep(attempt)
+
+    def _fetch(self, segment):
+        start, end, offset = segment
+        headers = {}
+        if end is not None:
+            headers["Range"] = f"bytes={offset}-{end}"
+        else:
+            # Without Range support the only option is to start over
+            offset = start
+        with requests.get(self.url, headers=headers, stream=True, timeout=TIMEOUT) as response:
+            response.raise_for_status()
+            if end is not None and response.status_code != 206:
+                raise SymbolDownloadError(f"server ignored Range request (HTTP {response.status_code})")
+            unsaved = 0
+            with open(self.part_path, "r+b") as f:
+                f.seek(offset)
+                try:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        f.write(chunk)
+                        offset += len(chunk)
+                        unsaved += len(chunk)
+                        with self.lock:
+                            segment[2] = offset
+                            self.fetched_bytes += len(chunk)
+                        if unsaved >= STATE_INTERVAL:
+                            f.flush()
+                            self._save_state()
+                            unsaved = 0
+                    if end is None:
+                        f.truncate()
+                finally:
+                    # Keep what arrived before an error so the next attempt starts from there
+                    f.flush()
+                    self._save_state()
+        if end is not None and offset != end + 1:
+            raise SymbolDownloadError(f"connection closed at byte {offset} of {end + 1}")
+
+    def verify(self, sha256=None):
+        """Checks size, then the published SHA256 when known, else the zip's own CRCs."""
+        if self.size is not None and os.path.getsize(self.part_path) != self.size:
+            raise SymbolDownloadError(f"size mismatch for {os.path.basename(self.path)}")
+        if sha256:
+            actual = sha256_file(self.part_path)
+            if actual != sha256:
+                raise SymbolDownloadError(f"SHA256 mismatch for {os.path.basename(self.path)}: {actual}")
+            return actual
+        try:
+            with zipfile.ZipFile(self.part_path) as zf:
+                bad = zf.testzip()
+        except zipfile.BadZipFile as e:
+            raise SymbolDownloadError(f"{os.path.basename(self.path)} is not a valid zip: {e}")
+        if bad:
+            raise SymbolDownloadError(f"corrupt member {bad} in {os.path.basename(self.path)}")
+        return None
+
+    def discard(self):
+        for path in (self.part_path, self.state_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def marker_path(destination, pack):
+    return os.path.join(destination, f".autovol-{pack}.json")
+
+
+def is_installed(destination, pack, validator=None, extract=True):
+    """Whether a pack is installed in the requested mode: extracted, or kept as <pack>.zip with extract=False.
+
+    With our marker it must also match the remote file; without one, what is on disk decides.
+    """
+    pack_dir = os.path.join(destination, pack)
+    extracted = os.path.isdir(pack_dir) and bool(os.listdir(pack_dir))
+    kept = os.path.exists(os.path.join(destination, f"{pack}.zip"))
+    try:
+        with open(marker_path(destination, pack), "r", encoding="utf-8") as f:
+            marker = json.load(f)
+        # Markers from before "extracted" was recorded: go by what is on disk
+        if marker.get("extracted", extracted) != extract or not (extracted if extract else kept):
+            return False
+        return validator is None or marker.get("validator") == validator
+    except (OSError, ValueError):
+        pass
+    return extracted if extract else kept
+
+
+def download_symbols(destination, base_url=SYMBOL_BASE_URL, packs=SYMBOL_PACKS, connections=8,
+                     segment_size=SEGMENT_SIZE, force=False, extract=True):
+    """Fetches symbol packs concurrently and extracts them; returns {pack: "installed"|"skipped"|error}.
+
+    All packs share one pool of `connections` Range requests. Interrupted
+    downloads resume from their .part file on the next call. With
+    extract=False the verified <pack>.zip is kept as-is for isfstore.
+    """
+    os.makedirs(destination, exist_ok=True)
+    base_url = base_url.rstrip("/")
+    results = {}
+    downloads = {}
+    for pack in packs:
+        download = SegmentedDownload(f"{base_url}/{pack}.zip", os.path.join(destination, f"{pack}.zip"),
+                                     segment_size)
+        try:
+            download.probe()
+        except requests.RequestException as e:
+            if not force and is_installed(destination, pack, extract=extract):
+                log.info(f"✅ {pack.capitalize()} symbols already installed (mirror unreachable: {e}).")
+                results[pack] = "skipped"
+            else:
+                log.warning(f"⚠️ Failed to download {pack} symbols: {e}")
+                results[pack] = str(e)
+            continue
+        if not force and is_installed(destination, pack, download.validator, extract):
+            log.info(f"✅ {pack.capitalize()} symbols already installed.")
+            results[pack] = "skipped"
+            continue
+        downloads[pack] = download
+    if not downloads:
+        return results
+
+    checksums = fetch_checksums(base_url)
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=connections) as pool:
+        futures = {}
+        for pack, download in downloads.items():
+            try:
+                pending = download.plan()
+            except (OSError, requests.RequestException) as e:
+                log.warning(f"⚠️ Failed to download {pack} symbols: {e}")
+                results[pack] = str(e)
+                continue
+            log.info(f"⬇️ Downloading {pack} symbols ({(download.size or 0) / (1024 * 1024):.1f}MB, "
+                     f"{len(pending)} segment(s))...")
+            futures[pack] = [pool.submit(download.fetch_segment, i) for i in pending]
+
+        for pack, pack_futures in futures.items():
+            download = downloads[pack]
+            try:
+                for future in pack_futures:
+                    future.result()
+                elapsed = time.monotonic() - started
+                log.info(f"📶 {pack}.zip: {download.fetched_bytes / (1024 * 1024):.1f}MB in {elapsed:.1f}s "
+                         f"({download.fetched_bytes / (1024 * 1024) / max(elapsed, 1e-6):.1f}MB/s)")
+                _install(download, destination, pack, checksums.get(f"{pack}.zip"), extract)
+                results[pack] = "installed"
+            except (OSError, requests.RequestException, SymbolDownloadError, zipfile.BadZipFile) as e:
+                # The .part file and its state stay behind for the next attempt unless the data is bad
+                log.warning(f"⚠️ Failed to download {pack} symbols: {e}")
+                results[pack] = str(e)
+
+    total = sum(d.fetched_bytes for d in downloads.values())
+    elapsed = time.monotonic() - started
+    log.info(f"📶 Symbols: {total / (1024 * 1024):.1f}MB fetched in {elapsed:.1f}s "
+             f"({total / (1024 * 1024) / max(elapsed, 1e-6):.1f}MB/s)")
+    return results
+
+
+def _install(download, destination, pack, sha256=None, extract=True):
+    try:
+        digest = download.verify(sha256)
+    except SymbolDownloadError:
+        download.discard()
+        raise
+    if extract:
+        log.info(f"📦 Extracting {pack} symbols...")
+        with zipfile.ZipFile(download.part_path) as zf:
+            zf.extractall(destination)
+    else:
+        os.replace(download.part_path, download.path)
+    with open(marker_path(destination, pack), "w", encoding="utf-8") as f:
+        json.dump({"url": download.url, "size": download.size, "validator": download.validator,
+                   "sha256": digest, "extracted": extract, "installed_at": time.time()}, f)
+    download.discard()
+    log.info(f"✅ {pack} symbols ready.")
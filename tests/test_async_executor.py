@@ -0,0 +1,117 @@
+import unittest
+import os
+import sys
+import time
+import queue
+import tempfile
+import threading
+from types import SimpleNamespace
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from async_executor import AsyncExecutor
+from scheduler import TaskPool
+from utils import PluginTask
+from events import EventBus
+
+FAKE_VOL = """#!{python}
+import os, sys, time, subprocess
+plugin = sys.argv[-1]
+state = os.path.join({tmp!r}, plugin + ".attempts")
+attempts = int(open(state).read()) + 1 if os.path.exists(state) else 1
+open(state, "w").write(str(attempts))
+if plugin == "hang":
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    open(os.path.join({tmp!r}, "child.pid"), "w").write(str(child.pid))
+    time.sleep(60)
+if plugin == "flaky" and attempts == 1:
+    sys.stderr.write("MemoryError\\n")
+    sys.exit(1)
+if plugin == "broken":
+    sys.stderr.write("Unsatisfied requirement\\n")
+    sys.exit(1)
+print("row 1")
+print("row 2")
+"""
+
+
+def alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # A zombie is dead for our purposes
+    with open(f"/proc/{pid}/stat") as f:
+        return f.read().split()[2] != "Z"
+
+
+class TestAsyncExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.vol = os.path.join(self.tmp.name, "vol")
+        with open(self.vol, "w") as f:
+            f.write(FAKE_VOL.format(python=sys.executable, tmp=self.tmp.name))
+        os.chmod(self.vol, 0o755)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _executor(self, plugins, **kwargs):
+        args = SimpleNamespace(volatility_path=self.vol, format="txt", threads=2)
+        tasks = [PluginTask(p, "mem.raw", self.tmp.name) for p in plugins]
+        planned = SimpleNamespace(args=args, status_queue=queue.Queue(), queue=TaskPool(), tasks=tasks,
+                                  profile=None, kdbg=None, capabilities=None, history=None, metrics_log=None,
+                                  store=None, manifest=None, events=EventBus())
+        return AsyncExecutor(planned, backoff=0.01, **kwargs)
+
+    def _statuses(self, executor):
+        status_queue = executor.execute_with_status()
+        executor.thread.join(timeout=30)
+        statuses = {}
+        while not status_queue.empty():
+            status = status_queue.get()
+            statuses[status.name] = status.status
+        return statuses
+
+    def test_runs_retries_transient_and_times_out(self):
+        executor = self._executor(["ok", "flaky", "broken", "hang"], plugin_timeout=2)
+        statuses = self._statuses(executor)
+        self.assertEqual(statuses, {"ok": "done", "flaky": "done", "broken": "error", "hang": "timeout"})
+        with open(os.path.join(self.tmp.name, "ok", "ok.txt")) as f:
+            self.assertEqual(f.read(), "row 1\nrow 2\n")
+        with open(os.path.join(self.tmp.name, "broken.attempts")) as f:
+            self.assertEqual(f.read(), "1")
+        # The hung plugin's own child was killed with its process group
+        with open(os.path.join(self.tmp.name, "child.pid")) as f:
+            child = int(f.read())
+        time.sleep(0.2)
+        self.assertFalse(alive(child))
+
+    def test_finish_runs_off_the_event_loop(self):
+        executor = self._executor(["ok"])
+        finish = executor.runner.finish
+        threads = []
+
+        def recording_finish(*args):
+            threads.append(threading.current_thread())
+            return finish(*args)
+
+        executor.runner.finish = recording_finish
+        self.assertEqual(self._statuses(executor), {"ok": "done"})
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], executor.thread)
+
+    def test_global_timeout_cancels_everything(self):
+        executor = self._executor(["hang", "hang2", "ok"], timeout=1)
+        executor.args.threads = 1
+        started = time.monotonic()
+        statuses = self._statuses(executor)
+        self.assertLess(time.monotonic() - started, 10)
+        self.assertEqual(statuses, {"hang": "cancelled", "hang2": "cancelled", "ok": "cancelled"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+import os
+import sys
+import tempfile
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from batch import discover_images, image_ids
+
+
+class TestBatch(unittest.TestCase):
+
+    def test_discover_directory_filters_extensions(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ("host1.raw", "host2.VMEM", "notes.txt"):
+                open(os.path.join(tmp, name), "wb").close()
+            images = discover_images(tmp)
+        self.assertEqual([os.path.basename(p) for p, _ in images], ["host1.raw", "host2.VMEM"])
+        self.assertTrue(all(hint is None for _, hint in images))
+
+    def test_discover_manifest_with_os_hints(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = os.path.join(tmp, "hosts.txt")
+            with open(manifest, "w") as f:
+                f.write("# incident 42\ndc01.raw windows\n\n/abs/web 01.lime linux  # trailing comment\nlaptop.mem\n")
+            images = discover_images(manifest)
+        self.assertEqual(images, [
+            (os.path.join(tmp, "dc01.raw"), "windows"),
+            ("/abs/web 01.lime", "linux"),
+            (os.path.join(tmp, "laptop.mem"), None),
+        ])
+
+    def test_image_ids_are_unique_and_safe(self):
+        ids = image_ids(["/a/host 1.raw", "/b/host 1.raw", "/c/dc.vmem"])
+        self.assertEqual(ids, ["host_1", "host_1-1", "dc"])
+
+    def test_image_ids_skip_suffixes_taken_by_real_names(self):
+        self.assertEqual(image_ids(["host 1.raw", "host 1.vmem", "host_1-1.raw"]), ["host_1", "host_1-1", "host_1-1-1"])
+        self.assertEqual(image_ids(["host_1-1.raw", "host 1.raw", "host 1.vmem"]), ["host_1-1", "host_1", "host_1-2"])
+
+
+if __name__ == '__main__':
+    unittest.main()
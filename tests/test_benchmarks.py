@@ -0,0 +1,80 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+import subprocess
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+BENCHMARKS = os.path.join(project_root, "benchmarks")
+FAKE_VOL = os.path.join(BENCHMARKS, "fake_vol.py")
+
+
+class TestFakeVol(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.events = os.path.join(self.tmp.name, "events.jsonl")
+        self.config = os.path.join(self.tmp.name, "fake.json")
+        with open(self.config, "w") as f:
+            json.dump({"events": self.events, "default": {"startup": 0, "runtime": 0.05},
+                       "plugins": {"windows.pslist.PsList": {"stdout_mb": 0.5, "progress_lines": 4},
+                                   "windows.malfind.Malfind": {"failure_rate": 1.0}}}, f)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def vol(self, *argv):
+        env = dict(os.environ, AUTOVOL_FAKE_VOL=self.config)
+        return subprocess.run([sys.executable, FAKE_VOL, *argv], capture_output=True, env=env)
+
+    def test_json_output_volume_and_progress(self):
+        result = self.vol("-r", "json", "-f", "mem.raw", "windows.pslist.PsList")
+        self.assertEqual(result.returncode, 0)
+        rows = json.loads(result.stdout)
+        self.assertEqual(rows[0]["ImageFileName"], "System")
+        self.assertAlmostEqual(len(result.stdout) / (1024 * 1024), 0.5, delta=0.01)
+        self.assertEqual(result.stderr.count(b"Progress:"), 4)
+        with open(self.events) as f:
+            events = [json.loads(line)["event"] for line in f]
+        self.assertEqual(events, ["start"] + ["progress"] * 4 + ["end"])
+
+    def test_failure_and_help(self):
+        result = self.vol("-f", "mem.raw", "windows.malfind.Malfind")
+        self.assertEqual(result.returncode, 1)
+        self.assertIn(b"unable to read", result.stderr)
+        from capabilities import parse_volatility_help
+        index = parse_volatility_help(self.vol("-h").stdout.decode())
+        self.assertIn("json", index["renderers"])
+        self.assertIn("windows.malfind.Malfind", index["plugins"])
+
+
+class TestRunBenchmarks(unittest.TestCase):
+
+    def test_smoke_run_writes_comparable_results(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "results.json")
+            command = [sys.executable, os.path.join(BENCHMARKS, "run_benchmarks.py"), "--mix", "smoke",
+                       "--threads", "1,2", "--repeat", "1", "-o", output]
+            subprocess.run(command, check=True, capture_output=True)
+            with open(output) as f:
+                results = json.load(f)
+            self.assertEqual([s["scenario"]["threads"] for s in results["scenarios"]], [1, 2])
+            for scenario in results["scenarios"]:
+                median = scenario["median"]
+                self.assertEqual((median["done"], median["failed"]), (3, 0))
+                self.assertGreater(median["makespan_s"], 0)
+                self.assertGreater(median["autovol_peak_rss_mb"], 0)
+                self.assertGreater(median["progress_events"], 0)
+                self.assertIsNotNone(median["launch_ms"])
+            # Comparing a run against itself must never count as a regression
+            compare = subprocess.run(command[:-2] + ["-o", os.path.join(tmp, "again.json"), "--compare", output,
+                                                     "--max-regression", "1000"], capture_output=True)
+            self.assertEqual(compare.returncode, 0, compare.stdout.decode())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from capabilities import CapabilityIndex, parse_volatility_help, volatility_fingerprint
+
+HELP_OUTPUT = """Volatility 3 Framework 2.26.0
+usage: vol [-h] [-r RENDERER] PLUGIN ...
+
+options:
+  -r RENDERER, --renderer RENDERER
+                        Determines how to render the output (quick, none, csv,
+                        pretty, json, jsonl)
+
+Plugins:
+  For plugin specific options, run 'vol <plugin> --help'
+
+  PLUGIN
+    banners.Banners     Attempts to identify potential linux banners in an
+                        image
+    windows.pslist.PsList
+                        Lists the processes present in a particular windows
+                        memory image.
+
+The following plugins could not be loaded (use -vv to see why):
+volatility3.plugins.windows.vadyarascan, volatility3.plugins.yarascan
+"""
+
+
+class TestCapabilities(unittest.TestCase):
+
+    def test_parse_help(self):
+        index = parse_volatility_help(HELP_OUTPUT)
+        self.assertEqual(index["version"], "2.26.0")
+        self.assertIn("json", index["renderers"])
+        self.assertEqual(index["plugins"]["windows.pslist.PsList"]["category"], "windows")
+        self.assertEqual(index["plugins"]["banners.Banners"]["category"], "common")
+        self.assertEqual(index["plugins"]["banners.Banners"]["description"],
+                         "Attempts to identify potential linux banners in an image")
+        self.assertEqual(index["unavailable"], ["windows.vadyarascan", "yarascan"])
+
+    @patch('capabilities.build_capability_index')
+    def test_load_caches_per_install(self, mock_build):
+        mock_build.return_value = parse_volatility_help(HELP_OUTPUT)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first = CapabilityIndex.load("vol", cache_dir)
+            second = CapabilityIndex.load("vol", cache_dir)
+
+        self.assertEqual(mock_build.call_count, 1)
+        self.assertEqual(second.plugins, first.plugins)
+        self.assertEqual(second.renderer_for("json"), "json")
+        self.assertIsNone(second.renderer_for("html"))
+        self.assertFalse(second.is_available("yarascan.YaraScan"))
+        self.assertTrue(second.is_available("windows.pslist.PsList"))
+
+    def test_fingerprint_follows_the_installed_version(self):
+        # A console script that an upgrade leaves untouched, in a venv whose dist-info does change
+        with tempfile.TemporaryDirectory() as prefix:
+            os.makedirs(os.path.join(prefix, "bin"))
+            site = os.path.join(prefix, "lib", "python3.11", "site-packages")
+            python = os.path.join(prefix, "bin", "python")
+            script = os.path.join(prefix, "bin", "vol")
+            open(python, "w").close()
+            with open(script, "w") as f:
+                f.write(f"#!{python}\nfrom volatility3.cli import main\nmain()\n")
+            os.makedirs(os.path.join(site, "volatility3-2.26.0.dist-info"))
+            before = volatility_fingerprint(script)
+            os.rename(os.path.join(site, "volatility3-2.26.0.dist-info"),
+                      os.path.join(site, "volatility3-2.27.0.dist-info"))
+            after = volatility_fingerprint(script)
+        self.assertIn("volatility3-2.26.0", before)
+        self.assertIn("volatility3-2.27.0", after)
+        self.assertNotEqual(before, after)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+import os
+import sys
+import time
+import queue
+import tempfile
+import threading
+from types import SimpleNamespace
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from cluster import Coordinator, Worker, interleave
+from utils import PluginStatus, PluginTask
+from events import EventBus
+
+
+class FakeRunner:
+    def __init__(self, args, status_queue):
+        self.args = args
+        self.status_queue = status_queue
+
+    def run_task(self, task):
+        output_dir = os.path.join(task.directory, task.plugin)
+        os.makedirs(output_dir, exist_ok=True)
+        with open(os.path.join(output_dir, f"{task.plugin}.{self.args.format}"), "w") as f:
+            f.write(f"{task.image_id}:{task.plugin}\n")
+        status = PluginStatus(task.plugin, "done", 1.0, 1.0, 1.0, image=task.image_id)
+        self.status_queue.put(status)
+        return status
+
+
+class FakeWorker(Worker):
+    def __init__(self, url, args, worker_id):
+        self.url = url
+        self.args = args
+        self.worker_id = worker_id
+        self.poll_interval = 2.0
+
+    def make_runner(self, args, status_queue):
+        return FakeRunner(args, status_queue)
+
+
+def make_executor(directory, tasks):
+    args = SimpleNamespace(directory=directory, format="json")
+    return SimpleNamespace(args=args, status_queue=queue.Queue(), events=EventBus(), tasks=tasks)
+
+
+class TestCluster(unittest.TestCase):
+
+    def test_interleave_round_robins_images(self):
+        tasks = [PluginTask(p, "img", "d", image_id=i) for i, p in [("a", "1"), ("a", "2"), ("a", "3"), ("b", "4")]]
+        self.assertEqual([t.plugin for t in interleave(tasks)], ["1", "4", "2", "3"])
+
+    def test_workers_upload_results_to_coordinator(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tasks = [PluginTask(f"p{n}", "img", os.path.join(tmp, img), image_id=img)
+                     for img in ("a", "b") for n in range(3)]
+            coordinator = Coordinator(make_executor(tmp, tasks), "127.0.0.1", 0)
+            coordinator.start()
+            args = SimpleNamespace(directory=None, threads=2, format="txt")
+            workers = [FakeWorker(coordinator.address, args, f"w{i}") for i in range(2)]
+            threads = [threading.Thread(target=w.run, daemon=True) for w in workers]
+            for t in threads:
+                t.start()
+            coordinator.wait()
+            # Idle slots sleeping out the poll interval miss the 410 and must still stop
+            for t in threads:
+                t.join(timeout=15)
+                self.assertFalse(t.is_alive())
+
+            for task in tasks:
+                path = os.path.join(task.directory, task.plugin, f"{task.plugin}.json")
+                with open(path) as f:
+                    self.assertEqual(f.read(), f"{task.image_id}:{task.plugin}\n")
+            statuses = []
+            while not coordinator.status_queue.empty():
+                statuses.append(coordinator.status_queue.get())
+            self.assertEqual(sum(s.status == "done" for s in statuses), len(tasks))
+
+    def test_expired_lease_is_requeued(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            coordinator = Coordinator(make_executor(tmp, [PluginTask("p", "img", tmp)]), "127.0.0.1", 0,
+                                      lease_seconds=0.2)
+            coordinator.start()
+            first = coordinator.lease("dead-worker")
+            self.assertIsNone(coordinator.lease("w2"))
+            time.sleep(1.5)
+            second = coordinator.lease("w2")
+            self.assertEqual(second["task"]["plugin"], "p")
+            # The dead worker's late completion is ignored
+            self.assertFalse(coordinator.complete(first["lease"], {"name": "p", "status": "done", "progress": 1.0,
+                                                                    "memory_used_mb": 0, "cpu_used_percent": 0}))
+            self.assertTrue(coordinator.heartbeat(second["lease"]))
+            coordinator.complete(second["lease"], {"name": "p", "status": "done", "progress": 1.0,
+                                                   "memory_used_mb": 0, "cpu_used_percent": 0})
+            self.assertEqual(coordinator.lease("w2"), "finished")
+            coordinator.server.shutdown()
+            coordinator.server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
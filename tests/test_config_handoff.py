@@ -0,0 +1,160 @@
+import unittest
+import os
+import sys
+import json
+import importlib
+import tempfile
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from utils import handoff_config, write_volatility_config, config_profile_and_kdbg, CONFIG_DIR
+
+try:
+    from volatility3.framework import interfaces
+    from volatility3.framework.configuration import requirements
+    from volatility3.plugins import regexscan
+    from volatility3.plugins.windows import pslist, info
+    HAS_VOLATILITY = True
+except ImportError:
+    HAS_VOLATILITY = False
+
+# Trimmed `vol --save-config` output of windows.info on a Windows 10 x64 image
+SAVED = {
+    "kernel.class": "volatility3.framework.contexts.Module",
+    "kernel.layer_name.class": "volatility3.framework.layers.intel.WindowsIntel32e",
+    "kernel.layer_name.kernel_virtual_offset": 272678814367744,
+    "kernel.layer_name.memory_layer.class": "volatility3.framework.layers.physical.FileLayer",
+    "kernel.layer_name.memory_layer.location": "file:///cases/mem.raw",
+    "kernel.layer_name.page_map_offset": 1744896,
+    "kernel.layer_name.swap_layers": True,
+    "kernel.offset": 272678814367744,
+    "kernel.symbol_table_name.class": "volatility3.framework.symbols.windows.WindowsKernelIntermedSymbols",
+    "kernel.symbol_table_name.isf_url": "file:///symbols/windows/ntkrnlmp.pdb/3844DBB9-2.json.xz",
+    "kernel.symbol_table_name.symbol_mask": 0,
+}
+
+FAKE_VOL = """#!{python}
+import sys, json
+argv = sys.argv[1:]
+with open({log!r}, "a") as f:
+    f.write(argv[-1] + "\\n")
+if argv[-1] != {plugin!r}:
+    sys.exit(1)
+print("Kernel Base\t0xf8066d000000")
+print("KdVersionBlock\t0xf8066dc0f400")
+print("Symbols\tfile:///symbols/windows/ntkrnlmp.pdb/3844DBB9-2.json.xz")
+with open(argv[argv.index("--save-config") + 1], "w") as f:
+    json.dump({saved!r}, f)
+"""
+
+
+def _import(path):
+    module, name = path.rsplit(".", 1)
+    return getattr(importlib.import_module(module), name)
+
+
+@unittest.skipUnless(HAS_VOLATILITY, "volatility3 is not installed")
+class TestHandoffSatisfiesRequirements(unittest.TestCase):
+
+    def spliced(self, plugin_cls):
+        """The plugin's config tree after `vol -c config.json`, which splices the file in at plugins.<Plugin>."""
+        config = interfaces.configuration.HierarchicalDict()
+        config.splice(f"plugins.{plugin_cls.__name__}",
+                      interfaces.configuration.HierarchicalDict(handoff_config(SAVED)))
+        return config, f"plugins.{plugin_cls.__name__}"
+
+    def assert_provided(self, config, path, requirement):
+        if requirement.optional or isinstance(requirement, requirements.VersionRequirement):
+            return
+        if isinstance(requirement, (requirements.ModuleRequirement, requirements.TranslationLayerRequirement,
+                                    requirements.SymbolTableRequirement)):
+            # Constructed from its class, which brings requirements of its own
+            cls_path = interfaces.configuration.path_join(path, "class")
+            self.assertIn(cls_path, config)
+            for sub in list(requirement.requirements.values()) + list(_import(config[cls_path]).get_requirements()):
+                if not isinstance(sub, interfaces.configuration.ClassRequirement):
+                    self.assert_provided(config, interfaces.configuration.path_join(path, sub.name), sub)
+        else:
+            self.assertIn(path, config)
+
+    def test_kernel_module_plugins(self):
+        for plugin_cls in (pslist.PsList, info.Info):
+            config, path = self.spliced(plugin_cls)
+            kernel = next(r for r in plugin_cls.get_requirements() if r.name == "kernel")
+            self.assert_provided(config, f"{path}.kernel", kernel)
+            self.assertEqual(config[f"{path}.kernel.offset"], SAVED["kernel.offset"])
+
+    def test_layer_only_plugins(self):
+        config, path = self.spliced(regexscan.RegExScan)
+        primary = next(r for r in regexscan.RegExScan.get_requirements() if r.name == "primary")
+        self.assert_provided(config, f"{path}.primary", primary)
+
+
+class TestWriteVolatilityConfig(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log = os.path.join(self.tmp.name, "calls.log")
+        self.image = os.path.join(self.tmp.name, "mem.raw")
+        open(self.image, "wb").close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def vol(self, plugin):
+        path = os.path.join(self.tmp.name, "vol")
+        with open(path, "w") as f:
+            f.write(FAKE_VOL.format(python=sys.executable, log=self.log, plugin=plugin, saved=SAVED))
+        os.chmod(path, 0o755)
+        return path
+
+    def calls(self):
+        if not os.path.exists(self.log):
+            return []
+        with open(self.log) as f:
+            return f.read().split()
+
+    def test_writes_kernel_config_and_reuses_it_for_the_same_image(self):
+        vol = self.vol("windows.info.Info")
+        path = write_volatility_config(self.image, vol, self.tmp.name, os_name="windows", fingerprint="fp1")
+        self.assertEqual(path, os.path.join(self.tmp.name, CONFIG_DIR, "config.json"))
+        with open(path) as f:
+            config = json.load(f)
+        self.assertEqual(config["kernel.symbol_table_name.isf_url"], SAVED["kernel.symbol_table_name.isf_url"])
+        self.assertEqual(config["primary.page_map_offset"], SAVED["kernel.layer_name.page_map_offset"])
+
+        self.assertEqual(write_volatility_config(self.image, vol, self.tmp.name, os_name="windows",
+                                                 fingerprint="fp1"), path)
+        self.assertEqual(self.calls(), ["windows.info.Info"])
+
+    def test_other_image_or_os_is_not_reused(self):
+        vol = self.vol("windows.info.Info")
+        write_volatility_config(self.image, vol, self.tmp.name, os_name="windows", fingerprint="fp1")
+        write_volatility_config(self.image, vol, self.tmp.name, os_name="windows", fingerprint="fp2")
+        self.assertEqual(self.calls(), ["windows.info.Info"] * 2)
+        # A Linux image never gets the Windows config
+        self.assertIsNone(write_volatility_config(self.image, vol, self.tmp.name, os_name="linux",
+                                                  fingerprint="fp2"))
+        self.assertEqual(self.calls()[-1], "linux.pslist.PsList")
+
+    def test_profile_and_kdbg_come_from_the_preflight_output(self):
+        vol = self.vol("windows.info.Info")
+        write_volatility_config(self.image, vol, self.tmp.name, os_name="windows", fingerprint="fp1")
+        self.assertEqual(config_profile_and_kdbg(self.tmp.name), ("ntkrnlmp.pdb", "0xf8066dc0f400"))
+        self.assertEqual(self.calls(), ["windows.info.Info"])
+
+    def test_no_profile_from_a_linux_preflight(self):
+        vol = self.vol("linux.pslist.PsList")
+        write_volatility_config(self.image, vol, self.tmp.name, os_name="linux", fingerprint="fp1")
+        self.assertEqual(config_profile_and_kdbg(self.tmp.name), (None, None))
+
+    def test_unknown_os_tries_each_bootstrap_plugin(self):
+        vol = self.vol("linux.pslist.PsList")
+        self.assertIsNotNone(write_volatility_config(self.image, vol, self.tmp.name, fingerprint="fp1"))
+        self.assertEqual(self.calls(), ["windows.info.Info", "linux.pslist.PsList"])
+
+
+if __name__ == "__main__":
+    unittest.main()
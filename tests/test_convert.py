@@ -0,0 +1,92 @@
+import unittest
+import os
+import sys
+import io
+import json
+import struct
+import tempfile
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from convert import iter_json_rows, to_ndjson, convert_output, ndjson_path, SCHEMA_FILE
+from store import flatten_rows
+from streaming import open_output
+
+
+TREE = [
+    {"PID": 4, "Name": "System", "Offset": 1000, "__children": [
+        {"PID": 88, "Name": "Registry", "Offset": 2000, "__children": [
+            {"PID": 90, "Name": "a \"quoted\" ]}, name", "Offset": 2500, "__children": []},
+        ]},
+        {"PID": 92, "Name": None, "Offset": 2600.5, "__children": []},
+    ], "zeta": True},
+    {"PID": 123456789012, "Name": "smss.exe", "Offset": 3000, "__children": []},
+]
+
+
+def by_id(rows):
+    return sorted(rows, key=lambda r: r["__id"])
+
+
+class TestConvert(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_stream_matches_flatten_with_tiny_chunks(self):
+        text = json.dumps(TREE, indent=2, sort_keys=True)
+        for chunk_size in (1, 7, 64):
+            rows = list(iter_json_rows(io.StringIO(text), chunk_size=chunk_size))
+            self.assertEqual(by_id(rows), by_id(flatten_rows(TREE)))
+        # Children are yielded before the parent that contains them
+        self.assertEqual([r["PID"] for r in rows], [90, 88, 92, 4, 123456789012])
+
+    def test_truncated_stream_raises(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_rows(io.StringIO(json.dumps(TREE)[:-10]), chunk_size=16))
+
+    def test_ndjson_from_compressed_output(self):
+        path = os.path.join(self.tmp.name, "windows.pstree.PsTree.json.gz")
+        with open_output(path, "wt", encoding="utf-8") as f:
+            json.dump(TREE, f, indent=2)
+        out, count, types = to_ndjson(path)
+        self.assertEqual(out, ndjson_path(path))
+        self.assertTrue(out.endswith("windows.pstree.PsTree.ndjson.gz"))
+        self.assertEqual(count, 5)
+        self.assertEqual(types["PID"], "int64")
+        self.assertEqual(types["Offset"], "float64")
+        self.assertEqual(types["Name"], "string")
+        with open_output(out, "rt", encoding="utf-8") as f:
+            self.assertEqual(by_id(json.loads(line) for line in f), by_id(flatten_rows(TREE)))
+
+    def test_columnar_files_decode(self):
+        path = os.path.join(self.tmp.name, "windows.pstree.PsTree.json")
+        with open(path, "w") as f:
+            json.dump(TREE, f)
+        convert_output(path, columnar=True)
+        directory = os.path.join(self.tmp.name, "windows.pstree.PsTree.columns")
+        with open(os.path.join(directory, SCHEMA_FILE)) as f:
+            schema = json.load(f)
+        self.assertEqual(schema["rows"], 5)
+        columns = {c["name"]: c for c in schema["columns"]}
+
+        def read(column, kind):
+            with open(os.path.join(directory, columns[column]["files"][kind]), "rb") as f:
+                return f.read()
+
+        self.assertEqual(list(struct.unpack("<5q", read("PID", "data"))), [90, 88, 92, 4, 123456789012])
+        self.assertEqual(list(struct.unpack("<5d", read("Offset", "data")))[2], 2600.5)
+        self.assertEqual(read("Name", "valid"), b"\x01\x01\x00\x01\x01")
+        offsets = struct.unpack("<6Q", read("Name", "offsets"))
+        data = read("Name", "data")
+        self.assertEqual(data[offsets[0]:offsets[1]].decode(), 'a "quoted" ]}, name')
+        self.assertEqual(data[offsets[4]:offsets[5]].decode(), "smss.exe")
+
+
+if __name__ == "__main__":
+    unittest.main()
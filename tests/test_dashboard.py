@@ -0,0 +1,64 @@
+import unittest
+import os
+import sys
+import asyncio
+import queue
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from dashboard import VolDashboard
+from events import EventBus, TaskQueued, TaskStarted, TaskProgress, status_event
+from utils import PluginStatus
+
+
+class FakeExecutor:
+    def __init__(self, plugins):
+        self.plugins = plugins
+        self.events = EventBus()
+        self.status_queue = queue.Queue()
+
+    def execute_with_status(self):
+        for image in ("a", "b"):
+            for plugin in self.plugins:
+                self.events.emit(TaskQueued(plugin, image))
+                self.status_queue.put(PluginStatus(plugin, "queued", 0.0, 0.0, 0.0, image=image))
+        return self.status_queue
+
+
+class TestDashboard(unittest.TestCase):
+
+    def test_rows_update_in_place(self):
+        executor = FakeExecutor([f"p{n}" for n in range(500)])
+
+        async def scenario():
+            app = VolDashboard(executor)
+            async with app.run_test() as pilot:
+                await asyncio.sleep(0.3)
+                await pilot.pause()
+                self.assertEqual(app.table.row_count, 1000)
+                # Rows come from events; the status queue is drained rather than left to grow
+                self.assertTrue(executor.status_queue.empty())
+
+                # A burst of updates for one task coalesces into one row
+                executor.events.emit(TaskStarted("p1", "a"))
+                for n in range(100):
+                    executor.events.emit(TaskProgress("p1", "a", progress=n / 100))
+                executor.events.emit(status_event(PluginStatus("p1", "done", 1.0, 12.5, 80.0, 3.0, 0, image="a")))
+                executor.events.emit(status_event(PluginStatus("p2", "error", 1.0, 1.0, 1.0, 1.0, 1, image="b")))
+                await asyncio.sleep(0.3)
+                await pilot.pause()
+
+                self.assertEqual(app.table.row_count, 1000)
+                self.assertEqual(app.table.get_cell("a/p1", "status"), "done")
+                self.assertEqual(app.table.get_cell("a/p1", "memory"), "12.50")
+                self.assertEqual(app.table.get_cell("b/p2", "exit"), "1")
+                self.assertEqual(app.table.get_cell("b/p1", "status"), "queued")
+                self.assertIn("2/1000 complete", str(app.summary.render()))
+
+        asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    unittest.main()
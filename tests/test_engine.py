@@ -0,0 +1,50 @@
+import unittest
+import io
+import os
+import sys
+import json
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from engine import TreeGridWriter
+
+
+class TestTreeGridWriter(unittest.TestCase):
+
+    ROWS = [(1, (4, "System")), (2, (100, "smss.exe")), (3, (200, "csrss.exe")), (2, (101, "wininit.exe")), (1, (5, "Idle"))]
+
+    def render(self, fmt):
+        fh = io.StringIO()
+        writer = TreeGridWriter(fmt, fh)
+        writer.begin(["PID", "Name"])
+        for depth, values in self.ROWS:
+            writer.row(depth, values)
+        writer.end()
+        return fh.getvalue()
+
+    def test_json_nests_children(self):
+        data = json.loads(self.render("json"))
+        self.assertEqual([r["PID"] for r in data], [4, 5])
+        system = data[0]
+        self.assertEqual([c["Name"] for c in system["__children"]], ["smss.exe", "wininit.exe"])
+        self.assertEqual(system["__children"][0]["__children"][0]["PID"], 200)
+        self.assertEqual(data[1]["__children"], [])
+
+    def test_txt_marks_depth(self):
+        lines = self.render("txt").splitlines()
+        self.assertEqual(lines[0], "PID\tName")
+        self.assertIn("** 200\tcsrss.exe", lines)
+
+    def test_html_escapes_values(self):
+        fh = io.StringIO()
+        writer = TreeGridWriter("html", fh)
+        writer.begin(["Name"])
+        writer.row(1, ("<script>",))
+        writer.end()
+        self.assertIn("&lt;script&gt;", fh.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
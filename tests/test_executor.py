@@ -3,6 +3,7 @@ import os
 import sys
 import queue
 import shutil
+import tempfile
 from unittest.mock import patch, MagicMock, call, ANY
 
 # Add project root to sys.path
@@ -14,7 +15,7 @@ from utils import PluginStatus # Assuming PluginStatus is imported correctly
 
 # A dummy argparse.Namespace for testing
 class MockArgs:
-    def __init__(self, file="mem.raw", directory="test_output", profile="TestProfile",
+    def __init__(self, file="mem.raw", directory=None, profile="TestProfile",
                  console=None, all=False, volatility_path="vol", threads=1,
                  format="json", tui=False, log_file=None):
         self.file = file
@@ -31,8 +32,7 @@ class MockArgs:
 class TestPluginExecutor(unittest.TestCase):
 
     def setUp(self):
-        self.test_output_dir = "test_executor_output"
-        os.makedirs(self.test_output_dir, exist_ok=True)
+        self.test_output_dir = tempfile.mkdtemp(prefix="autovol-test-")
         # Mock psutil.Process for memory/CPU, as it's hard to control in tests
         self.psutil_process_patch = patch('executor.psutil.Process')
         self.mock_psutil_process = self.psutil_process_patch.start()
@@ -156,7 +156,7 @@ class TestPluginExecutor(unittest.TestCase):
 
 
     def test_executor_init_no_file(self):
-        args = MockArgs(file="non_existent_memdump.raw")
+        args = MockArgs(file="non_existent_memdump.raw", directory=self.test_output_dir)
         with self.assertRaises(FileNotFoundError):
             PluginExecutor(args)
 
@@ -0,0 +1,47 @@
+import unittest
+import os
+import sys
+import importlib.util
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from forkserver import ForkServer, HAS_FORKSERVER
+from metrics import wait_with_rusage
+
+HAS_VOLATILITY = importlib.util.find_spec("volatility3") is not None
+
+
+@unittest.skipUnless(HAS_FORKSERVER and HAS_VOLATILITY, "needs fork(), Unix sockets and volatility3")
+class TestForkServer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ForkServer("vol")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.close()
+
+    def test_child_streams_output_and_reports_rusage(self):
+        for _ in range(2):
+            with self.server.popen(["-q", "-r", "json", "frameworkinfo.FrameworkInfo"]) as proc:
+                out = proc.stdout.read()
+                proc.stderr.read()
+                rusage = wait_with_rusage(proc)
+            self.assertEqual(proc.returncode, 0)
+            self.assertIn(b'"Data": "Automagic"', out)
+            self.assertGreater(rusage.ru_maxrss, 0)
+            self.assertNotEqual(proc.pid, os.getpid())
+
+    def test_failing_plugin_exit_code_and_stderr(self):
+        with self.server.popen(["no.such.Plugin"]) as proc:
+            proc.stdout.read()
+            err = proc.stderr.read()
+        self.assertNotEqual(proc.returncode, 0)
+        self.assertTrue(err)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import os
+import sys
+import json
+import lzma
+import uuid
+import base64
+import struct
+import zipfile
+import tempfile
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from isfstore import ISFStore, scan_identifiers, case_symbols, INDEX_FILE, CASE_SYMBOLS_DIR
+
+GUID = uuid.UUID("3844dbb9-2017-4967-be7a-a4a2c20430fa")
+BANNER = b"Linux version 5.4.0-42-generic (buildd@lgw01-amd64-038) (gcc version 9.3.0) #46-Ubuntu SMP"
+
+
+def isf(symbols):
+    return lzma.compress(json.dumps({"symbols": symbols}).encode())
+
+
+class TestISFStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.packs = os.path.join(self.tmp.name, "packs")
+        os.makedirs(self.packs)
+        with zipfile.ZipFile(os.path.join(self.packs, "windows.zip"), "w") as zf:
+            zf.writestr(f"windows/ntkrnlmp.pdb/{GUID.hex.upper()}-1.json.xz", isf({"KiSystemCall64": {}}))
+            zf.writestr("windows/ntkrnlmp.pdb/00000000000000000000000000000000-1.json.xz", isf({}))
+        with zipfile.ZipFile(os.path.join(self.packs, "linux.zip"), "w") as zf:
+            zf.writestr("linux/Ubuntu/5.4.0-42-generic.json.xz",
+                        isf({"linux_banner": {"constant_data": base64.b64encode(BANNER + b"\n\x00").decode()}}))
+            zf.writestr("linux/Ubuntu/other.json.xz", isf({"linux_banner": {"constant_data": "TGludXg="}}))
+
+        self.image = os.path.join(self.tmp.name, "mem.raw")
+        with open(self.image, "wb") as f:
+            f.write(os.urandom(4096))
+            f.write(b"RSDS" + GUID.bytes_le + struct.pack("<I", 1) + b"ntkrnlmp.pdb\x00")
+            f.write(os.urandom(4096))
+            f.write(BANNER + b"\n\x00")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_scan_finds_kernel_identifiers(self):
+        found = scan_identifiers(self.image)
+        self.assertEqual(found["windows"], [f"ntkrnlmp.pdb|{GUID.hex.upper()}|1"])
+        self.assertEqual(found["linux"], [BANNER.decode()])
+
+    def test_scan_stops_at_the_first_round_with_a_hit(self):
+        # Regions of 4K, one per round: the RSDS record is in the second, the banner in the third
+        found = scan_identifiers(self.image, region_size=4096, workers=1)
+        self.assertEqual(len(found["windows"]), 1)
+        self.assertEqual(found["linux"], [])
+        self.assertEqual(scan_identifiers(self.image, region_size=4096, limit=4096, workers=1)["windows"], [])
+
+    def test_scan_only_looks_for_the_known_os(self):
+        found = scan_identifiers(self.image, os_name="linux", region_size=4096, workers=1)
+        self.assertEqual(found, {"windows": [], "linux": [BANNER.decode()], "mac": []})
+
+    def test_index_is_cached_and_lookup_matches(self):
+        store = ISFStore(self.packs)
+        self.assertEqual(len(store), 4)
+        self.assertTrue(os.path.exists(os.path.join(self.packs, INDEX_FILE)))
+        matches = ISFStore(self.packs).lookup(scan_identifiers(self.image))
+        self.assertEqual([member for _, member in matches],
+                         [f"windows/ntkrnlmp.pdb/{GUID.hex.upper()}-1.json.xz", "linux/Ubuntu/5.4.0-42-generic.json.xz"])
+
+    def test_case_symbols_materializes_only_matches(self):
+        case = os.path.join(self.tmp.name, "case")
+        directory = case_symbols(self.packs, self.image, case, decompress=True)
+        self.assertEqual(directory, os.path.join(case, CASE_SYMBOLS_DIR))
+        target = os.path.join(directory, "windows", "ntkrnlmp.pdb", f"{GUID.hex.upper()}-1.json")
+        with open(target) as f:
+            self.assertIn("KiSystemCall64", json.load(f)["symbols"])
+        files = [name for _, _, names in os.walk(directory) for name in names]
+        self.assertEqual(sorted(files), sorted([f"{GUID.hex.upper()}-1.json", "5.4.0-42-generic.json"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from manifest import RunManifest, fingerprint_image, file_checksum, load_manifest, MANIFEST_FILE, JOURNAL_FILE
+from streaming import OutputWriter
+from utils import PluginTask
+
+
+class TestManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.image = os.path.join(self.tmp.name, "mem.raw")
+        with open(self.image, "wb") as f:
+            f.write(os.urandom(300_000))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_fingerprint_independent_of_worker_count(self):
+        one = fingerprint_image(self.image, chunk_size=65536, workers=1)
+        many = fingerprint_image(self.image, chunk_size=65536, workers=8)
+        self.assertEqual(one, many)
+        with open(self.image, "r+b") as f:
+            f.seek(200_000)
+            f.write(b"\x00" * 16)
+        self.assertNotEqual(fingerprint_image(self.image, chunk_size=65536), one)
+
+    def test_output_writer_checksum_matches_file(self):
+        path = os.path.join(self.tmp.name, "out.txt")
+        with OutputWriter(path) as writer:
+            writer.write(b"a\nb\n")
+            writer.write(b"c\n")
+        self.assertEqual(writer.checksum, file_checksum(path))
+
+    def _run(self, manifest, plugin, body=b"rows\n"):
+        task = PluginTask(plugin, self.image, self.tmp.name, fingerprint=manifest.fingerprint(self.image))
+        out = os.path.join(self.tmp.name, plugin, f"{plugin}.txt")
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+        with OutputWriter(out) as writer:
+            writer.write(body)
+        manifest.record(task, "done", out, writer.checksum)
+        return task, out
+
+    def test_rerun_only_runs_delta(self):
+        manifest = RunManifest(self.tmp.name, "2.7.0", {"format": "txt"})
+        done, out = self._run(manifest, "windows.pslist.PsList")
+        failed, _ = self._run(manifest, "windows.netscan.NetScan")
+        manifest.record(failed, "error", os.path.join(self.tmp.name, "missing.txt"))
+
+        reloaded = RunManifest(self.tmp.name, "2.7.0", {"format": "txt"})
+        fingerprint = reloaded.fingerprint(self.image)
+        tasks = [PluginTask(p, self.image, self.tmp.name, fingerprint=fingerprint)
+                 for p in ("windows.pslist.PsList", "windows.netscan.NetScan", "windows.cmdline.CmdLine")]
+        self.assertEqual([t.plugin for t in reloaded.pending(tasks)],
+                         ["windows.netscan.NetScan", "windows.cmdline.CmdLine"])
+
+        # A different Volatility version or a tampered output invalidates the task
+        self.assertFalse(RunManifest(self.tmp.name, "2.8.0", {"format": "txt"}).is_complete(fingerprint, done.plugin))
+        with open(out, "ab") as f:
+            f.write(b"truncated?")
+        self.assertFalse(reloaded.is_complete(fingerprint, done.plugin))
+
+    def test_records_append_to_a_journal_compacted_on_load(self):
+        manifest = RunManifest(self.tmp.name, "2.7.0", {"format": "txt"})
+        for i in range(5):
+            self._run(manifest, f"plugin.P{i}")
+        journal = os.path.join(self.tmp.name, JOURNAL_FILE)
+        with open(journal) as f:
+            self.assertEqual(len(f.readlines()), 6)  # the image fingerprint and five tasks
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, MANIFEST_FILE)))
+        self.assertEqual(len(load_manifest(self.tmp.name)["tasks"]), 5)
+
+        with open(journal, "a") as f:
+            f.write('{"section": "tasks", "key": "torn')  # crash mid-write
+        reloaded = RunManifest(self.tmp.name, "2.7.0", {"format": "txt"})
+        self.assertFalse(os.path.exists(journal))
+        with open(os.path.join(self.tmp.name, MANIFEST_FILE)) as f:
+            self.assertEqual(len(json.load(f)["tasks"]), 5)
+        self.assertEqual(len(reloaded.data["tasks"]), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
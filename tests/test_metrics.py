@@ -0,0 +1,72 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+import subprocess
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from metrics import ProcessTreeSampler, MetricsLog, wait_with_rusage, METRICS_FILE
+
+MB = 1024 * 1024
+
+# Holds 120MB in a grandchild and 60MB in the child at the same time, then burns some CPU in the child
+CHILD = f"""
+import sys, time, subprocess
+grandchild = subprocess.Popen([sys.executable, "-c",
+    "import sys, time; data = b'x' * {120 * MB}; print('ready', flush=True); time.sleep(1.5)"],
+    stdout=subprocess.PIPE)
+grandchild.stdout.readline()
+data = b'y' * {60 * MB}
+deadline = time.process_time() + 0.3
+while time.process_time() < deadline:
+    pass
+time.sleep(0.5)
+grandchild.wait()
+"""
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_sampler_covers_the_process_tree(self):
+        proc = subprocess.Popen([sys.executable, "-c", CHILD])
+        sampler = ProcessTreeSampler(proc.pid, interval=0.05)
+        sampler.start()
+        rusage = wait_with_rusage(proc)
+        sampler.stop()
+
+        self.assertEqual(proc.returncode, 0)
+        self.assertIsNotNone(rusage)
+        self.assertGreater(rusage.ru_utime + rusage.ru_stime, 0)
+        # Neither process alone reaches this; only the summed tree does
+        self.assertGreater(sampler.peak_rss, 170 * MB)
+
+        metrics = sampler.result("fake.Plugin", proc.returncode, rusage)
+        self.assertGreaterEqual(metrics.peak_rss_mb, 170)
+        self.assertGreater(metrics.cpu_time, 0.2)
+        self.assertGreater(metrics.wall_time, 0)
+
+    def test_metrics_log_appends_records(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            sampler = ProcessTreeSampler(os.getpid())
+            sampler.sample()
+            sampler.stop()
+            metrics = sampler.result("windows.pslist.PsList", 0)
+            metrics_log = MetricsLog(os.path.join(tmp, "case"))
+            metrics_log.write(metrics, image="img1")
+            metrics_log.write(metrics, image="img2")
+            with open(os.path.join(tmp, "case", METRICS_FILE)) as f:
+                records = [json.loads(line) for line in f]
+        self.assertEqual([r["image"] for r in records], ["img1", "img2"])
+        self.assertEqual(records[0]["plugin"], "windows.pslist.PsList")
+        self.assertEqual(records[0]["pid"], os.getpid())
+        self.assertEqual(records[0]["exit_code"], 0)
+        self.assertGreater(records[0]["peak_rss_mb"], 0)
+        self.assertEqual(set(records[0]) - {"image"}, set(metrics.__dataclass_fields__))
+
+
+if __name__ == "__main__":
+    unittest.main()
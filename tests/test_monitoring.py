@@ -0,0 +1,95 @@
+import unittest
+import os
+import sys
+import urllib.request
+import urllib.error
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from monitoring import RunMetrics, serve_metrics, CONTENT_TYPE
+from events import EventBus, TaskQueued, TaskStarted, TaskProgress, status_event
+from utils import PluginStatus
+
+
+def samples(text):
+    """{'name{labels}': value} for every sample line of a Prometheus text exposition."""
+    result = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            result[name] = float(value)
+    return result
+
+
+class TestRunMetrics(unittest.TestCase):
+
+    def run_events(self, metrics):
+        metrics(TaskQueued("windows.pslist.PsList", "img1", time=100.0))
+        metrics(TaskQueued("windows.netscan.NetScan", "img1", time=100.0))
+        metrics(TaskQueued("windows.malfind.Malfind", "img1", time=100.0))
+        metrics(TaskStarted("windows.pslist.PsList", "img1", time=102.0, worker="worker-1"))
+        metrics(TaskStarted("windows.netscan.NetScan", "img1", time=110.0, worker="worker-2"))
+        metrics(TaskProgress("windows.netscan.NetScan", "img1", time=111.0, progress=0.5))
+        done = PluginStatus("windows.pslist.PsList", "done", 1.0, 300.0, 50.0, 40.0, 0, image="img1",
+                            output_bytes=2048)
+        event = status_event(done)
+        event.time = 142.0
+        metrics(event)
+
+    def test_counts_histograms_and_gauges(self):
+        metrics = RunMetrics(workers=2)
+        self.run_events(metrics)
+        values = samples(metrics.render())
+        self.assertEqual(values["autovol_tasks_queued_total"], 3)
+        self.assertEqual(values["autovol_tasks_pending"], 1)
+        self.assertEqual(values["autovol_tasks_running"], 1)
+        self.assertEqual(values["autovol_workers"], 2)
+        self.assertEqual(values['autovol_tasks_finished_total{status="done"}'], 1)
+        self.assertEqual(values["autovol_worker_busy_seconds_total"], 40.0)
+        self.assertEqual(values["autovol_last_event_timestamp_seconds"], 142.0)
+        self.assertEqual(values['autovol_output_bytes_total{plugin="windows.pslist.PsList"}'], 2048)
+        duration = 'autovol_plugin_duration_seconds_bucket{plugin="windows.pslist.PsList",status="done",le="%s"}'
+        self.assertEqual(values[duration % "30"], 0)
+        self.assertEqual(values[duration % "60"], 1)
+        self.assertEqual(values[duration % "+Inf"], 1)
+        self.assertEqual(values["autovol_queue_wait_seconds_count"], 2)
+        self.assertEqual(values["autovol_queue_wait_seconds_sum"], 12.0)
+        rss = 'autovol_plugin_peak_rss_bytes_bucket{plugin="windows.pslist.PsList",le="536870912"}'
+        self.assertEqual(values[rss], 1)
+
+    def test_cancelled_before_start_leaves_no_pending(self):
+        metrics = RunMetrics()
+        metrics(TaskQueued("a", time=1.0))
+        metrics(status_event(PluginStatus("a", "cancelled", 0.0, 0.0, 0.0)))
+        values = samples(metrics.render())
+        self.assertEqual(values["autovol_tasks_pending"], 0)
+        self.assertEqual(values['autovol_tasks_finished_total{status="cancelled"}'], 1)
+
+    def test_label_values_are_escaped(self):
+        metrics = RunMetrics()
+        metrics(status_event(PluginStatus('we"ird\\plugin', "done", 1.0, 0.0, 0.0, output_bytes=1)))
+        self.assertIn('autovol_output_bytes_total{plugin="we\\"ird\\\\plugin"} 1', metrics.render())
+
+
+class TestMetricsServer(unittest.TestCase):
+
+    def test_serves_metrics_from_the_event_bus(self):
+        events = EventBus()
+        server = serve_metrics(events, "127.0.0.1", 0, workers=4)
+        try:
+            events.emit(TaskQueued("windows.pslist.PsList"))
+            with urllib.request.urlopen(server.address) as response:
+                self.assertEqual(response.headers["Content-Type"], CONTENT_TYPE)
+                values = samples(response.read().decode())
+            self.assertEqual(values["autovol_tasks_queued_total"], 1)
+            self.assertEqual(values["autovol_workers"], 4)
+            with self.assertRaises(urllib.error.HTTPError):
+                urllib.request.urlopen(server.address.replace("/metrics", "/other"))
+        finally:
+            server.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import os
+import sys
+import struct
+import tempfile
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from osdetect import detect_image_os, leading_os
+from utils import get_plugins
+from executor import profile_skip_reason
+
+
+class TestOSDetect(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _image(self, *parts):
+        path = os.path.join(self.tmp.name, f"image{len(os.listdir(self.tmp.name))}.raw")
+        with open(path, "wb") as f:
+            for part in parts:
+                f.write(part)
+        return path
+
+    def test_container_headers(self):
+        crash = detect_image_os(self._image(b"PAGEDU64", b"\x00" * 4088))
+        self.assertEqual((crash.container, crash.os), ("crashdump64", "windows"))
+        lime = detect_image_os(self._image(struct.pack("<I", 0x4C694D45), b"\x00" * 60))
+        self.assertEqual((lime.container, lime.os), ("lime", "linux"))
+        self.assertEqual(detect_image_os(self._image(b"hibr", b"\x00" * 100)).os, "windows")
+
+    def test_banner_scan_across_region_boundary(self):
+        # The first "Linux version " straddles the 4 KiB region boundary and still counts
+        banner = b"Linux version 5.15.0-91-generic"
+        image = self._image(b"\x7fELF", b"\x00" * 4086, banner, b"\x00" * 100, banner * 2, b"\x00" * 9000)
+        guess = detect_image_os(image, region_size=4096, workers=2)
+        self.assertEqual((guess.container, guess.os, guess.hits), ("elf", "linux", {"linux": 3}))
+
+    def test_weak_evidence_keeps_scanning_then_gives_up(self):
+        # A stray banner in the first round doesn't decide; the Windows signatures later do
+        image = self._image(b"Linux version 6.1", b"\x00" * 8192, b"ntkrnlmp.pdb\x00" * 4, b"\x00" * 4096)
+        guess = detect_image_os(image, region_size=4096, workers=1)
+        self.assertEqual(guess.os, "windows")
+        self.assertGreater(guess.scanned, 4096)
+        stray = detect_image_os(self._image(b"Linux version 6.1", b"\x00" * 8192), region_size=4096, workers=1)
+        self.assertEqual((stray.os, stray.hits), (None, {"linux": 1}))
+        self.assertIsNone(leading_os({"windows": 5, "linux": 3}))
+
+    def test_explicit_windows_selection_always_detects_the_profile(self):
+        self.assertIsNone(profile_skip_reason("windows", ["windows.pslist.PsList"], "linux"))
+        self.assertIsNotNone(profile_skip_reason("linux", ["linux.bash.Bash"], None))
+        self.assertIsNotNone(profile_skip_reason(None, ["linux.bash.Bash"], "linux"))
+        self.assertIsNone(profile_skip_reason(None, ["yarascan.YaraScan"], None))
+
+    def test_majority_wins_and_unknown(self):
+        image = self._image(b"\x00" * 100, b"RSDS", b"ntkrnlmp.pdb\x00" * 3, b"Linux version 6.1")
+        self.assertEqual(detect_image_os(image).os, "windows")
+        guess = detect_image_os(self._image(b"\x00" * 10000), region_size=4096, limit=8192)
+        self.assertIsNone(guess.os)
+        self.assertEqual(guess.scanned, 8192)
+
+    def test_plugins_follow_detected_os(self):
+        plugins = get_plugins(None, os_name="mac")
+        self.assertIn("mac.pslist.PsList", plugins)
+        self.assertFalse(any(p.startswith("windows.") for p in plugins))
+        self.assertEqual(get_plugins("linux.bash.Bash", os_name="mac"), ["linux.bash.Bash"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from report import build_report, find_json_outputs, REPORT_DIR, DATA_DIR
+from manifest import MANIFEST_FILE
+from metrics import METRICS_FILE
+from streaming import open_output
+
+
+def read_js(path):
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    prefix, _, payload = text.partition(", ")
+    return json.loads(prefix[len("AutoVol.receive("):]), json.loads(payload.rstrip().rstrip(");"))
+
+
+class TestReport(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.case = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _output(self, relative, rows):
+        path = os.path.join(self.case, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open_output(path, "wt", encoding="utf-8") as f:
+            json.dump(rows, f)
+
+    def test_chunks_tokens_and_summary(self):
+        rows = [{"PID": i, "ImageFileName": "svchost.exe" if i == 23 else f"proc{i}.exe", "__children": []}
+                for i in range(25)]
+        self._output("img1/windows.pslist.PsList/windows.pslist.PsList.json.gz", rows)
+        with open(os.path.join(self.case, MANIFEST_FILE), "w") as f:
+            json.dump({"tasks": {
+                "a": {"plugin": "windows.pslist.PsList", "status": "done",
+                      "output": "img1/windows.pslist.PsList/windows.pslist.PsList.json.gz"},
+                "b": {"plugin": "windows.malfind.Malfind", "status": "timeout",
+                      "output": "img1/windows.malfind.Malfind/windows.malfind.Malfind.json"},
+            }}, f)
+        with open(os.path.join(self.case, METRICS_FILE), "w") as f:
+            f.write(json.dumps({"plugin": "windows.pslist.PsList", "image": "img1", "wall_time": 3.5}) + "\n")
+
+        index = build_report(self.case, chunk_rows=10)
+        self.assertTrue(os.path.exists(index))
+        data = os.path.join(self.case, REPORT_DIR, DATA_DIR)
+        _, summary = read_js(os.path.join(data, "summary.js"))
+        pslist, malfind = summary["plugins"]
+        self.assertEqual((pslist["image"], pslist["rows"], pslist["chunks"], pslist["wall_time"]), ("img1", 25, 3, 3.5))
+        self.assertEqual(pslist["columns"][:2], ["PID", "ImageFileName"])
+        self.assertEqual((malfind["status"], malfind["id"]), ("timeout", None))
+
+        key, chunk = read_js(os.path.join(data, pslist["id"], "chunk00002.js"))
+        self.assertEqual(key, f"{pslist['id']}/2")
+        self.assertEqual([r[0] for r in chunk], ["20", "21", "22", "23", "24"])
+        _, tokens = read_js(os.path.join(data, pslist["id"], "tokens00000.js"))
+        self.assertEqual([n for n, t in enumerate(tokens) if "svchost" in t], [2])
+
+    def test_token_index_is_sharded_by_chunk_group(self):
+        rows = [{"PID": i, "ImageFileName": "lsass.exe" if i == 17 else "x.exe"} for i in range(20)]
+        self._output("windows.pslist.PsList/windows.pslist.PsList.json", rows)
+        build_report(self.case, chunk_rows=2, token_group=3)
+        data = os.path.join(self.case, REPORT_DIR, DATA_DIR)
+        _, summary = read_js(os.path.join(data, "summary.js"))
+        self.assertEqual((summary["token_group"], summary["plugins"][0]["chunks"]), (3, 10))
+        shards = sorted(name for name in os.listdir(os.path.join(data, "p0000")) if name.startswith("tokens"))
+        self.assertEqual(shards, [f"tokens{n:05d}.js" for n in range(4)])
+        key, last = read_js(os.path.join(data, "p0000", "tokens00002.js"))
+        self.assertEqual(key, "p0000/tokens/2")
+        # Chunk 8 (rows 16-17) is the third chunk of shard 2
+        self.assertEqual([n for n, t in enumerate(last) if "lsass" in t], [2])
+        self.assertEqual(len(read_js(os.path.join(data, "p0000", "tokens00003.js"))[1]), 1)
+
+    def test_tree_rows_keep_parents_before_children(self):
+        rows = [{"PID": 4, "__children": [{"PID": 100, "__children": [{"PID": 200, "__children": []}]},
+                                          {"PID": 101, "__children": []}]},
+                {"PID": 5, "__children": []}]
+        self._output("windows.pstree.PsTree/windows.pstree.PsTree.json", rows)
+        build_report(self.case, chunk_rows=2)
+        data = os.path.join(self.case, REPORT_DIR, DATA_DIR)
+        _, summary = read_js(os.path.join(data, "summary.js"))
+        pstree = summary["plugins"][0]
+        pids = []
+        for n in range(pstree["chunks"]):
+            pids += [r[0] for r in read_js(os.path.join(data, pstree["id"], f"chunk{n:05d}.js"))[1]]
+        self.assertEqual(pids, ["4", "100", "200", "101", "5"])
+
+    def test_html_escapes_quotes(self):
+        build_report(self.case)
+        with open(os.path.join(self.case, REPORT_DIR, "index.html"), encoding="utf-8") as f:
+            html = f.read()
+        self.assertIn('\'"\': "&quot;"', html)
+        self.assertIn('"\'": "&#39;"', html)
+
+    def test_report_dir_is_not_rescanned(self):
+        self._output("windows.info.Info/windows.info.Info.json", [{"Variable": "Kernel"}])
+        build_report(self.case)
+        self.assertEqual([p for _, p, _ in find_json_outputs(self.case)], ["windows.info.Info"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import unittest
+import os
+import sys
+import json
+import mmap
+import tempfile
+from types import SimpleNamespace
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import scanner
+from scanner import (
+    ScanHit,
+    plan_shards,
+    scan_image,
+    scan_for_args,
+    load_patterns,
+    invert_segments,
+    to_physical,
+    attribute,
+    plugin_arguments,
+    without_raw_scans,
+    SCAN_NAME,
+)
+
+GRANULARITY = mmap.ALLOCATIONGRANULARITY
+
+
+class TestShardedScan(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.image = os.path.join(self.tmp.name, "mem.raw")
+        data = bytearray(GRANULARITY * 4 + 100)
+        # One hit inside a shard, one straddling the first shard boundary, one at the very end
+        for offset in (100, GRANULARITY - 3, len(data) - 12):
+            data[offset:offset + 12] = b"EVIL-PAYLOAD"
+        with open(self.image, "wb") as f:
+            f.write(data)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_plan_shards_are_aligned_and_cover_the_image(self):
+        shards = plan_shards(GRANULARITY * 3 + 5, GRANULARITY + 1)
+        self.assertEqual(shards, [(0, GRANULARITY * 2), (GRANULARITY * 2, GRANULARITY * 3 + 5)])
+        self.assertTrue(all(start % GRANULARITY == 0 for start, _ in shards))
+
+    def test_boundary_hits_are_found_once(self):
+        hits = scan_image(self.image, [rb"EVIL-\w+"], workers=2, shard_size=GRANULARITY, overlap=64)
+        self.assertEqual([hit.offset for hit in hits], [100, GRANULARITY - 3, GRANULARITY * 4 + 88])
+        self.assertTrue(all(hit.length == 12 for hit in hits))
+        self.assertEqual(bytes.fromhex(hits[1].data), b"EVIL-PAYLOAD")
+
+    def test_match_crossing_a_boundary_is_not_reported_again_from_the_next_shard(self):
+        image = os.path.join(self.tmp.name, "runs.raw")
+        data = bytearray(GRANULARITY * 2)
+        data[GRANULARITY - 4:GRANULARITY + 4] = b"A" * 8
+        with open(image, "wb") as f:
+            f.write(data)
+        hits = scan_image(image, [rb"A+"], workers=2, shard_size=GRANULARITY, overlap=64)
+        self.assertEqual([(hit.offset, hit.length) for hit in hits], [(GRANULARITY - 4, 8)])
+
+    def test_hit_cap_is_per_rule_and_reported(self):
+        image = os.path.join(self.tmp.name, "noisy.raw")
+        with open(image, "wb") as f:
+            f.write(b"X" * 64 + b"\0" * (GRANULARITY - 64))
+        cap = scanner.MAX_HITS_PER_RULE
+        scanner.MAX_HITS_PER_RULE = 10
+        try:
+            scanner._init_worker([rb"X", rb"XX"], [])
+            hits, capped = scanner.scan_shard(image, 0, GRANULARITY, 0)
+        finally:
+            scanner.MAX_HITS_PER_RULE = cap
+            scanner._init_worker([], [])
+        self.assertTrue(capped)
+        self.assertEqual(sum(hit.rule == "regex:X" for hit in hits), 10)
+        self.assertEqual(sum(hit.rule == "regex:XX" for hit in hits), 10)
+
+    def test_scan_for_args_writes_store_ready_rows(self):
+        args = SimpleNamespace(scan_pattern=["EVIL"], yara_rules=None, scan_workers=1, scan_shard_size=None,
+                               scan_overlap=None, no_scan_mapping=True)
+        path = scan_for_args(args, self.image, self.tmp.name)
+        self.assertEqual(path, os.path.join(self.tmp.name, SCAN_NAME, f"{SCAN_NAME}.json"))
+        with open(path) as f:
+            rows = json.load(f)
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]["Rule"], "regex:EVIL")
+        self.assertIsNone(rows[0]["PID"])
+
+    def test_load_patterns_reads_files(self):
+        path = os.path.join(self.tmp.name, "patterns.txt")
+        with open(path, "w") as f:
+            f.write("# comment\nfoo\n\nbar\\d+\n")
+        self.assertEqual(load_patterns(["baz", f"@{path}"]), ["baz", "foo", "bar\\d+"])
+
+
+class TestHitMapping(unittest.TestCase):
+
+    def test_file_offsets_to_physical(self):
+        # (physical, length, file offset, file length, layer) as a physical layer's mapping() yields them
+        runs = invert_segments([(0x100000, 0x1000, 0x2000, 0x1000, "file"), (0, 0x1000, 0x1000, 0x1000, "file")])
+        self.assertEqual(to_physical(runs, 0x1010), 0x10)
+        self.assertEqual(to_physical(runs, 0x2fff), 0x100fff)
+        self.assertIsNone(to_physical(runs, 0x10))  # container header
+        self.assertIsNone(to_physical(runs, 0x3000))
+
+    def test_attribute_first_owner_wins(self):
+        hits = [ScanHit("r", 0, 4, "", physical=p) for p in (0x1010, 0x5000, 0x9000)]
+        attribute(hits, [(0x400000, 0x1000, 0x1000, 0x1000, "phys"), (0x7000, 0x1000, 0x5000, 0x1000, "phys")],
+                  4, "lsass.exe")
+        attribute(hits, [(0x800000, 0x1000, 0x1000, 0x1000, "phys")], 8, "other.exe")
+        self.assertEqual((hits[0].pid, hits[0].process, hits[0].virtual), (4, "lsass.exe", 0x400010))
+        self.assertEqual(hits[1].virtual, 0x7000)
+        self.assertIsNone(hits[2].process)
+
+
+class TestPluginIntegration(unittest.TestCase):
+
+    def test_rules_and_patterns_reach_the_vad_plugins(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            rules = [os.path.join(tmp, "a.yar"), os.path.join(tmp, "b.yar")]
+            args = SimpleNamespace(yara_rules=rules, scan_pattern=["foo", "ba+r"])
+            option, path = plugin_arguments("windows.vadyarascan.VadYaraScan", args, tmp)
+            self.assertEqual(option, "--yara-file")
+            with open(path) as f:
+                self.assertEqual(f.read(), "".join(f'include "{rule}"\n' for rule in rules))
+            self.assertEqual(plugin_arguments("linux.vmaregexscan.VmaRegExScan", args, tmp),
+                             ["--pattern", "(?:foo)|(?:ba+r)"])
+            self.assertEqual(plugin_arguments("windows.pslist.PsList", args, tmp), [])
+
+    def test_raw_scans_are_dropped_only_when_scanning(self):
+        plugins = ["windows.pslist.PsList", "yarascan.YaraScan", "regexscan.RegExScan"]
+        self.assertEqual(without_raw_scans(plugins, SimpleNamespace()), plugins)
+        self.assertEqual(without_raw_scans(plugins, SimpleNamespace(scan_pattern=["x"])), ["windows.pslist.PsList"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+import unittest
+import queue
+import os
+import sys
+import tempfile
+import threading
+from unittest.mock import patch, MagicMock
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from utils import PluginTask
+from scheduler import RuntimeHistory, Scheduler, TaskPool, GB, estimate_eta
+
+
+class TestScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.history = RuntimeHistory(os.path.join(self.tmp.name, "history.json"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_history_orders_longest_first(self):
+        self.history.record("windows.pslist.PsList", 4 * GB, 2.0, 1.5, 300)
+        self.history.record("windows.handles.Handles", 4 * GB, 400.0, 380.0, 900)
+        scheduler = Scheduler(self.history, 4 * GB)
+
+        order = scheduler.order(["windows.pslist.PsList", "windows.handles.Handles", "windows.info.Info"])
+        self.assertEqual(order[0], "windows.handles.Handles")
+        self.assertAlmostEqual(scheduler.estimate("windows.handles.Handles"), 400.0)
+
+    def test_history_survives_reload_and_scales_with_image(self):
+        self.history.record("windows.filescan.FileScan", 2 * GB, 60.0, 55.0, 700)
+        reloaded = RuntimeHistory(self.history.path)
+        self.assertAlmostEqual(Scheduler(reloaded, 4 * GB).estimate("windows.filescan.FileScan"), 120.0)
+
+    def test_unknown_plugins_use_default_costs(self):
+        scheduler = Scheduler(self.history, 8 * GB)
+        order = scheduler.order(["windows.info.Info", "windows.strings.Strings"])
+        self.assertEqual(order, ["windows.strings.Strings", "windows.info.Info"])
+
+    def test_predicted_makespan(self):
+        for plugin, wall in (("a", 8.0), ("b", 4.0), ("c", 4.0)):
+            self.history.record(plugin, GB, wall, wall, 100)
+        scheduler = Scheduler(self.history, GB)
+        self.assertAlmostEqual(scheduler.predict_makespan(["a", "b", "c"], 2), 8.0)
+        self.assertAlmostEqual(scheduler.predict_makespan(["a", "b", "c"], 1), 16.0)
+
+
+    def test_eta_blends_history_with_progress(self):
+        self.assertIsNone(estimate_eta(5.0, 0.0))
+        self.assertEqual(estimate_eta(5.0, 0.0, expected=100.0), 95.0)
+        self.assertEqual(estimate_eta(50.0, 0.5), 50.0)
+        # Halfway there after 50s, history says 200s total: 0.5 * 100 + 0.5 * 200 - 50
+        self.assertEqual(estimate_eta(50.0, 0.5, expected=200.0), 100.0)
+        self.assertEqual(estimate_eta(300.0, 0.0, expected=100.0), 0.0)
+
+
+class TestTaskPool(unittest.TestCase):
+
+    PEAKS = {"heavy": 800, "medium": 300, "light": 150}
+
+    def task(self, plugin, image_id=""):
+        return PluginTask(plugin, "mem.raw", "out", image_id=image_id)
+
+    def peak(self, task):
+        return self.PEAKS[task.plugin]
+
+    def get_in_thread(self, pool):
+        result = []
+        t = threading.Thread(target=lambda: result.append(pool.get()), daemon=True)
+        t.start()
+        t.join(timeout=2)
+        if not result:
+            return "blocked"
+        return result[0].plugin if result[0] else None
+
+    @patch('scheduler.psutil.virtual_memory')
+    def test_backfills_lighter_plugins(self, mock_vm):
+        mock_vm.return_value = MagicMock(available=64 * GB)
+        pool = TaskPool(1000, self.peak, poll_interval=0.05)
+        for plugin in ("heavy", "medium", "light"):
+            pool.put(self.task(plugin))
+
+        self.assertEqual(pool.get().plugin, "heavy")  # main thread holds 800MB
+        self.assertEqual(self.get_in_thread(pool), "light")
+        self.assertAlmostEqual(pool.reserved_mb, 950)
+
+        pool.task_done()  # main thread finishes heavy
+        self.assertEqual(self.get_in_thread(pool), "medium")
+
+    @patch('scheduler.psutil.virtual_memory')
+    def test_blocked_heavy_plugin_is_not_starved(self, mock_vm):
+        mock_vm.return_value = MagicMock(available=64 * GB)
+        pool = TaskPool(1000, self.peak, poll_interval=0.05, max_bypasses=2)
+        pool.put(self.task("medium"))
+        pool.put(self.task("heavy"))
+        for _ in range(4):
+            pool.put(self.task("light"))
+
+        self.assertEqual(pool.get(owner="a").plugin, "medium")  # heavy no longer fits
+        self.assertEqual(pool.get(owner="b").plugin, "light")
+        self.assertEqual(pool.get(owner="c").plugin, "light")
+        with self.assertRaises(queue.Empty):  # light would fit, but heavy is next
+            pool.get(block=False, owner="x")
+        for owner in ("a", "b", "c"):
+            pool.task_done(owner=owner)
+        self.assertEqual(pool.get(owner="d").plugin, "heavy")
+        self.assertEqual(pool.bypasses, {})
+
+    @patch('scheduler.psutil.virtual_memory')
+    def test_respects_available_system_memory(self, mock_vm):
+        mock_vm.return_value = MagicMock(available=200 * 1024 * 1024)
+        pool = TaskPool(10000, self.peak, poll_interval=0.05)
+        pool.put(self.task("light"))
+        pool.put(self.task("medium"))
+        self.assertEqual(pool.get().plugin, "light")
+        self.assertEqual(self.get_in_thread(pool), "blocked")
+
+    @patch('scheduler.psutil.virtual_memory')
+    def test_oversized_plugin_runs_alone_and_sentinels_end_work(self, mock_vm):
+        mock_vm.return_value = MagicMock(available=64 * GB)
+        pool = TaskPool(500, self.peak)
+        pool.put(self.task("heavy"))
+        pool.put(None)
+        self.assertEqual(pool.get().plugin, "heavy")
+        pool.task_done()
+        self.assertIsNone(pool.get())
+        pool.task_done()
+        pool.join()
+
+    def test_images_share_workers_fairly(self):
+        pool = TaskPool()
+        for i in range(5):
+            pool.put(self.task(f"big-{i}", "host-a"))
+        pool.put(self.task("small-0", "host-b"))
+        pool.put(self.task("small-1", "host-b"))
+
+        self.assertEqual(pool.get().image_id, "host-a")
+        picks = [self.get_in_thread(pool) for _ in range(3)]
+        self.assertEqual(picks[0], "small-0")
+        self.assertEqual(picks[1:], ["big-1", "small-1"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from store import ResultStore, flatten_rows, table_name
+from streaming import open_output
+
+
+PSTREE = [
+    {"PID": 4, "PPID": 0, "ImageFileName": "System", "Offset(V)": 1000, "__children": [
+        {"PID": 88, "PPID": 4, "ImageFileName": "Registry", "Offset(V)": 2000, "__children": []},
+    ]},
+    {"PID": 500, "PPID": 4, "ImageFileName": "smss.exe", "Offset(V)": 3000, "__children": []},
+]
+
+
+class TestResultStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ResultStore.open(self.tmp.name)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def _ingest(self, plugin, tree, image=""):
+        path = os.path.join(self.tmp.name, f"{plugin}.json")
+        with open(path, "w") as f:
+            json.dump(tree, f)
+        return self.store.ingest(plugin, path, image)
+
+    def test_flatten_keeps_tree_shape(self):
+        rows = list(flatten_rows(PSTREE))
+        self.assertEqual([(r["PID"], r["__parent"], r["__depth"]) for r in rows], [(4, None, 0), (88, 1, 1), (500, None, 0)])
+
+    def test_ingest_typed_indexed_table(self):
+        self.assertEqual(self._ingest("windows.pstree.PsTree", PSTREE), 3)
+        table = table_name("windows.pstree.PsTree")
+        types = {r[1]: r[2] for r in self.store.conn.execute(f'PRAGMA table_info("{table}")')}
+        self.assertEqual(types["PID"], "INTEGER")
+        self.assertEqual(types["ImageFileName"], "TEXT")
+        indexes = {r[1] for r in self.store.conn.execute(f'PRAGMA index_list("{table}")')}
+        self.assertIn(f"ix_{table}_PID", indexes)
+        self.assertIn(f"ix_{table}_Offset(V)", indexes)
+
+    def test_cross_plugin_query_and_reingest(self):
+        self._ingest("windows.pslist.PsList", [{"PID": 4}, {"PID": 500}])
+        self._ingest("windows.psscan.PsScan", [{"PID": 4}, {"PID": 500}, {"PID": 666}])
+        # Re-ingesting replaces rather than duplicates
+        self._ingest("windows.psscan.PsScan", [{"PID": 4}, {"PID": 500}, {"PID": 666}])
+        _, rows = self.store.query(
+            "SELECT PID FROM windows_psscan_PsScan WHERE PID NOT IN (SELECT PID FROM windows_pslist_PsList)")
+        self.assertEqual(rows, [(666,)])
+        _, plugins = self.store.tables()
+        self.assertEqual([(p, n) for p, _, _, n in plugins], [("windows.pslist.PsList", 2), ("windows.psscan.PsScan", 3)])
+
+    def test_ingest_compressed_output(self):
+        path = os.path.join(self.tmp.name, "windows.pstree.PsTree.json.gz")
+        with open_output(path, "wt", encoding="utf-8") as f:
+            json.dump(PSTREE, f)
+        self.assertEqual(self.store.ingest("windows.pstree.PsTree", path), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
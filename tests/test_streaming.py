@@ -0,0 +1,69 @@
+import unittest
+import io
+import os
+import sys
+import tempfile
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+from streaming import OutputWriter, StderrTail, copy_stream, open_output, find_output, HAS_ZSTD
+
+
+class TestStreaming(unittest.TestCase):
+
+    def test_copy_stream_counts_bytes_and_lines(self):
+        data = b"".join(f"row {i}\n".encode() for i in range(50000))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out.txt")
+            with OutputWriter(path) as writer:
+                copy_stream(io.BufferedReader(io.BytesIO(data)), writer, chunk_size=4096)
+            self.assertEqual(writer.bytes_written, len(data))
+            self.assertEqual(writer.lines, 50000)
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), data)
+
+    def test_stderr_tail_is_bounded(self):
+        data = b"".join(f"warning {i}\n".encode() for i in range(1000)) + b"Progress:  50.00\r\tlast"
+        progress = []
+        tail = StderrTail(io.BufferedReader(io.BytesIO(data)), max_lines=10,
+                          on_progress=lambda *update: progress.append(update))
+        tail.run()
+        self.assertEqual(len(tail.lines), 10)
+        self.assertEqual(tail.lines[-1], "\tlast")
+        self.assertEqual(tail.lines[-2], "warning 999")
+        self.assertEqual(progress, [(0.5, "")])
+        self.assertEqual(tail.bytes_read, len(data))
+
+    def test_progress_parsed_across_chunks(self):
+        progress = []
+        tail = StderrTail(None, on_progress=lambda *update: progress.append(update))
+        for chunk in (b"Progress:   12.5", b"0\t\tScanning FileLayer using PageMapScanner\rProgress:  100.00\t\tPDB scanning finished\r"):
+            tail.feed(chunk)
+        self.assertEqual(progress, [(0.125, "Scanning FileLayer using PageMapScanner"), (1.0, "PDB scanning finished")])
+        self.assertEqual(list(tail.lines), [])
+
+
+    def _roundtrip(self, suffix):
+        data = b"".join(f"0x{i:x}\tsvchost.exe\n".encode() for i in range(20000))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, f"windows.handles.Handles.txt{suffix}")
+            with OutputWriter(path, level=1) as writer:
+                copy_stream(io.BufferedReader(io.BytesIO(data)), writer, chunk_size=4096)
+            self.assertEqual(writer.bytes_written, len(data))
+            self.assertLess(writer.stored_bytes, len(data) / 4)
+            self.assertEqual(find_output(tmp, "windows.handles.Handles", ["json", "txt"]), path)
+            with open_output(path) as f:
+                self.assertEqual(f.read(), data)
+
+    def test_gzip_output_roundtrip(self):
+        self._roundtrip(".gz")
+
+    @unittest.skipUnless(HAS_ZSTD, "zstandard not installed")
+    def test_zstd_output_roundtrip(self):
+        self._roundtrip(".zst")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import unittest
+import os
+import io
+import sys
+import json
+import hashlib
+import zipfile
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import symbols
+from symbols import download_symbols, SegmentedDownload, marker_path
+
+
+def make_zip(pack, size):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as zf:
+        zf.writestr(f"{pack}/ntkrnlmp.pdb/ABC123.json.xz", os.urandom(size))
+    return buffer.getvalue()
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Serves server.files with Range support; server.cut_after truncates GET bodies after that many bytes."""
+
+    def log_message(self, *args):
+        pass
+
+    def _file(self):
+        data = self.server.files.get(self.path.rsplit("/", 1)[-1])
+        if data is None:
+            self.send_error(404)
+        return data
+
+    def do_HEAD(self):
+        data = self._file()
+        if data is not None:
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(data)))
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("ETag", f'"{hashlib.md5(data).hexdigest()}"')
+            self.end_headers()
+
+    def do_GET(self):
+        data = self._file()
+        if data is None:
+            return
+        start, end = 0, len(data) - 1
+        header = self.headers.get("Range")
+        if header:
+            first, last = header.split("=")[1].split("-")
+            start, end = int(first), int(last)
+        with self.server.lock:
+            self.server.requested += end + 1 - start
+        self.send_response(206 if header else 200)
+        self.send_header("Content-Length", str(end + 1 - start))
+        self.end_headers()
+        body = data[start:end + 1]
+        if self.server.cut_after is not None:
+            body = body[:self.server.cut_after]
+        self.wfile.write(body)
+
+
+class TestSymbolDownloader(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+        self.server.files = {f"{pack}.zip": make_zip(pack, 300_000) for pack in ("windows", "linux")}
+        self.server.cut_after = None
+        self.server.requested = 0
+        self.server.lock = threading.Lock()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/symbols"
+        self.retries = symbols.RETRIES
+        symbols.RETRIES = 1
+
+    def tearDown(self):
+        symbols.RETRIES = self.retries
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def test_parallel_segments_extract_and_skip(self):
+        results = download_symbols(self.tmp.name, self.url, ("windows", "linux"), connections=4,
+                                   segment_size=64 * 1024)
+        self.assertEqual(results, {"windows": "installed", "linux": "installed"})
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "windows", "ntkrnlmp.pdb", "ABC123.json.xz")))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "windows.zip.part")))
+        results = download_symbols(self.tmp.name, self.url, ("windows",))
+        self.assertEqual(results, {"windows": "skipped"})
+
+    def test_kept_zip_does_not_count_as_extracted(self):
+        results = download_symbols(self.tmp.name, self.url, ("windows",), extract=False)
+        self.assertEqual(results, {"windows": "installed"})
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "windows.zip")))
+        self.assertEqual(download_symbols(self.tmp.name, self.url, ("windows",), extract=False),
+                         {"windows": "skipped"})
+        self.assertEqual(download_symbols(self.tmp.name, self.url, ("windows",)), {"windows": "installed"})
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "windows", "ntkrnlmp.pdb", "ABC123.json.xz")))
+        with open(marker_path(self.tmp.name, "windows")) as f:
+            self.assertTrue(json.load(f)["extracted"])
+
+    def test_resume_after_interruption(self):
+        data = self.server.files["windows.zip"]
+        self.server.cut_after = 100_000
+        results = download_symbols(self.tmp.name, self.url, ("windows",), connections=2, segment_size=128 * 1024)
+        self.assertNotEqual(results["windows"], "installed")
+        part = os.path.join(self.tmp.name, "windows.zip.part")
+        with open(f"{part}.json") as f:
+            segments = json.load(f)["segments"]
+        done = sum(seg[2] - seg[0] for seg in segments)
+        self.assertTrue(all(seg[2] > seg[0] for seg in segments))
+
+        self.server.cut_after = None
+        self.server.requested = 0
+        results = download_symbols(self.tmp.name, self.url, ("windows",), connections=2, segment_size=128 * 1024)
+        self.assertEqual(results, {"windows": "installed"})
+        # Only the missing tail of each segment is fetched again
+        self.assertEqual(self.server.requested, len(data) - done)
+
+    def test_checksum_mismatch_discards_download(self):
+        self.server.files["SHA256SUMS"] = b"0" * 64 + b"  windows.zip\n"
+        results = download_symbols(self.tmp.name, self.url, ("windows",))
+        self.assertIn("SHA256 mismatch", results["windows"])
+        self.assertFalse(os.path.exists(marker_path(self.tmp.name, "windows")))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "windows")))
+        self.assertFalse(os.path.exists(SegmentedDownload("", os.path.join(self.tmp.name, "windows.zip")).part_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+import threading
+from types import SimpleNamespace
+
+# Add project root to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, project_root)
+
+import tracing
+from executor import PluginRunner, task_key
+from scheduler import TaskPool
+from utils import PluginTask
+
+FAKE_VOL = """#!{python}
+import sys
+sys.stderr.write("\\rProgress:   50.00\\t\\tScanning\\r")
+print("row 1")
+print("row 2")
+"""
+
+
+class TestTracing(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.trace = os.path.join(self.tmp.name, "trace.json")
+
+    def tearDown(self):
+        tracing.stop()
+        self.tmp.cleanup()
+
+    def load(self):
+        with open(self.trace) as f:
+            return json.load(f)["traceEvents"]
+
+    def test_disabled_spans_are_a_shared_no_op(self):
+        self.assertIs(tracing.span("a"), tracing.span("b", phase="c", x=1))
+        with tracing.span("a"):
+            tracing.begin_async("queue wait", "x")
+            tracing.end_async("queue wait", "x")
+            tracing.add("output write", 1.0)
+        self.assertIsNone(tracing.stop())
+        self.assertFalse(os.path.exists(self.trace))
+
+    def test_nested_spans_async_spans_and_summary(self):
+        tracing.start(self.trace)
+        with tracing.span("outer", phase="task", plugin="p"):
+            with tracing.span("inner"):
+                pass
+        tracing.begin_async("queue wait", "p")
+        thread = threading.Thread(target=tracing.end_async, args=("queue wait", "p"), name="worker-1")
+        thread.start()
+        thread.join()
+        tracing.add("output write", 0.25)
+        summary = {row[0]: row for row in tracing.stop().summary()}
+
+        events = self.load()
+        spans = {e["name"]: e for e in events if e["ph"] == "X"}
+        outer, inner = spans["outer"], spans["inner"]
+        self.assertEqual(outer["args"], {"plugin": "p"})
+        self.assertLessEqual(outer["ts"], inner["ts"])
+        self.assertGreaterEqual(outer["ts"] + outer["dur"], inner["ts"] + inner["dur"])
+        self.assertEqual(sorted(e["ph"] for e in events if e["name"] == "queue wait"), ["b", "e"])
+        self.assertIn("worker-1", [e["args"]["name"] for e in events if e["ph"] == "M"])
+        self.assertEqual(set(summary), {"task", "inner", "queue wait", "output write"})
+        self.assertEqual(summary["output write"][1:3], (1, 0.25))
+
+    def test_plugin_runner_phases_on_a_worker_track(self):
+        vol = os.path.join(self.tmp.name, "vol")
+        with open(vol, "w") as f:
+            f.write(FAKE_VOL.format(python=sys.executable))
+        os.chmod(vol, 0o755)
+        pool = TaskPool()
+        tasks = [PluginTask(p, "mem.raw", self.tmp.name) for p in ("one", "two")]
+
+        tracing.start(self.trace)
+        for task in tasks:
+            tracing.begin_async("queue wait", task_key(task))
+            pool.put(task)
+        pool.put(None)
+        runner = PluginRunner(pool, SimpleNamespace(volatility_path=vol, format="txt"))
+        runner.name = "worker-1"
+        runner.start()
+        runner.join(timeout=30)
+        phases = {row[0]: row[1] for row in tracing.stop().summary()}
+
+        self.assertEqual(phases["task"], 2)
+        for phase in ("prepare", "spawn", "execute", "reap", "finish", "queue wait", "output write"):
+            self.assertEqual(phases[phase], 2, phase)
+        events = self.load()
+        track = next(e["tid"] for e in events if e["ph"] == "M" and e["args"]["name"] == "worker-1")
+        self.assertEqual(sorted(e["name"] for e in events if e["ph"] == "X" and e["tid"] == track
+                                and e["name"] in ("one", "two")), ["one", "two"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import nullcontext
+
+log = logging.getLogger("AutoVol")
+
+# The active Tracer, or None; span() and friends cost one global read while tracing is off
+_tracer = None
+_NULL_SPAN = nullcontext()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "phase", "args", "start")
+
+    def __init__(self, tracer, name, phase, args):
+        self.tracer = tracer
+        self.name = name
+        self.phase = phase
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.complete(self.name, self.start, time.perf_counter(), self.phase, self.args)
+
+
+class Tracer:
+    """Collects spans as Chrome trace events (one track per thread) plus per-phase totals.
+
+    The output opens in chrome://tracing and ui.perfetto.dev. Spans on one
+    thread must nest, so work that overlaps others on the same thread (e.g. a
+    task waiting in the queue) is recorded as an async span instead.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.pid = os.getpid()
+        self.origin = time.perf_counter()
+        self.started_at = time.time()
+        self.events = []
+        self.phases = {}  # phase -> [count, total seconds, max seconds]
+        self.threads = set()
+        self.pending = {}  # async key -> start
+        self.lock = threading.Lock()
+
+    def _us(self, t):
+        return round((t - self.origin) * 1e6, 3)
+
+    def _count(self, phase, seconds):
+        stats = self.phases.setdefault(phase, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += seconds
+        stats[2] = max(stats[2], seconds)
+
+    def _add(self, event, phase, seconds):
+        with self.lock:
+            self.events.append(event)
+            if phase:
+                self._count(phase, seconds)
+
+    def _tid(self):
+        tid = threading.get_native_id()
+        with self.lock:
+            if tid not in self.threads:
+                # Names the track, e.g. "worker-2"
+                self.threads.add(tid)
+                self.events.append({"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid,
+                                    "args": {"name": threading.current_thread().name}})
+        return tid
+
+    def complete(self, name, start, end, phase=None, args=None):
+        """Records a finished span on the calling thread's track."""
+        event = {"name": name, "cat": "autovol", "ph": "X", "pid": self.pid, "tid": self._tid(),
+                 "ts": self._us(start), "dur": self._us(end) - self._us(start)}
+        if args:
+            event["args"] = args
+        self._add(event, phase or name, end - start)
+
+    def begin_async(self, name, key):
+        with self.lock:
+            self.pending[(name, key)] = time.perf_counter()
+
+    def end_async(self, name, key, args=None):
+        """Closes an async span opened (possibly on another thread) by begin_async()."""
+        end = time.perf_counter()
+        with self.lock:
+            start = self.pending.pop((name, key), None)
+        if start is None:
+            return
+        common = {"name": name, "cat": name, "id": str(key), "pid": self.pid, "tid": self._tid()}
+        self._add(dict(common, ph="b", ts=self._us(start), args=args or {}), None, 0)
+        self._add(dict(common, ph="e", ts=self._us(end)), name, end - start)
+
+    def add(self, phase, seconds):
+        """Counts time towards a phase without drawing it (e.g. output writes spread over a whole run)."""
+        with self.lock:
+            self._count(phase, seconds)
+
+    def summary(self):
+        """[(phase, count, total seconds, mean seconds, max seconds)], largest total first."""
+        with self.lock:
+            rows = [(phase, count, total, total / count, peak) for phase, (count, total, peak) in self.phases.items()]
+        return sorted(rows, key=lambda row: row[2], reverse=True)
+
+    def write(self):
+        with self.lock:
+            trace = {"traceEvents": list(self.events), "displayTimeUnit": "ms",
+                     "otherData": {"tool": "AutoVol", "started_at": self.started_at,
+                                   "wall_seconds": time.perf_counter() - self.origin}}
+        tmp_file = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(trace, f)
+        os.replace(tmp_file, self.path)
+        return self.path
+
+
+def start(path):
+    """Enables tracing for the rest of the process; stop() writes the trace."""
+    global _tracer
+    _tracer = Tracer(path)
+    return _tracer
+
+
+def stop():
+    """Writes the trace file and disables tracing; returns the Tracer (for its summary) or None."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is None:
+        return None
+    try:
+        tracer.write()
+        log.info(f"🧵 Trace written to {tracer.path} (open in chrome://tracing or ui.perfetto.dev)")
+    except OSError as e:
+        log.warning(f"⚠️ Could not write trace {tracer.path}: {e}")
+    return tracer
+
+
+def enabled():
+    return _tracer is not None
+
+
+def span(name, phase=None, **args):
+    """Context manager timing a block as `name`; totals go to `phase` (default: name)."""
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return _Span(tracer, name, phase, args)
+
+
+def begin_async(name, key):
+    tracer = _tracer
+    if tracer is not None:
+        tracer.begin_async(name, key)
+
+
+def end_async(name, key, **args):
+    tracer = _tracer
+    if tracer is not None:
+        tracer.end_async(name, key, args)
+
+
+def add(phase, seconds):
+    tracer = _tracer
+    if tracer is not None:
+        tracer.add(phase, seconds)
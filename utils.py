@@ -2,10 +2,11 @@ import os
 import json
 import re
 import logging
-import requests
-import zipfile
+import tracing
 from dataclasses import dataclass
 from subprocess import Popen, PIPE
+from capabilities import CapabilityIndex
+from symbols import download_symbols, SYMBOL_BASE_URL
 
 @dataclass
 class PluginStatus:
@@ -14,8 +15,25 @@ class PluginStatus:
     progress: float
     memory_used_mb: float
     cpu_used_percent: float
+    wall_time: float = 0.0
+    exit_code: int = None
+    image: str = ""
+    stage: str = ""
+    eta: float = None
+    output_bytes: int = 0
 
-def get_plugins(console_arg=None, dump_flag=False):
+@dataclass
+class PluginTask:
+    plugin: str
+    image: str
+    directory: str
+    image_id: str = ""
+    image_size: int = 0
+    config_path: str = None
+    fingerprint: str = ""
+    symbol_dir: str = None
+
+def get_plugins(console_arg=None, dump_flag=False, os_name=None):
     # Plugin categories
     volatility_plugins = {
         "linux": [
@@ -227,20 +245,48 @@ def get_plugins(console_arg=None, dump_flag=False):
             "windows.dumpfiles.DumpFiles",
             "linux.pagecache.RecoverFs",
         }
+    elif os_name in volatility_plugins:
+        # No -c: use the category of the OS detected in the image
+        selected_plugins = set(volatility_plugins[os_name])
     else:
         selected_plugins = set(volatility_plugins["common"])
 
     return sorted(selected_plugins)
 
 
-def detect_profile_and_kdbg(memfile, vol_path):
+def parse_windows_info(output):
+    """Extracts (profile, KDBG offset) from text output of the `windows.info` plugin."""
+    profile = None
+    kdbg = None
+
+    # 1. Extract profile from "Symbols" line
+    match_profile = re.search(r"Symbols\s+(.*)", output)
+    if match_profile:
+        symbol_path = match_profile.group(1).strip()
+        # Extract profile: filename before first '/' in the pdb path
+        profile_match = re.search(r"windows/([\w\.]+)/", symbol_path)
+        if profile_match:
+            profile = profile_match.group(1)
+            logging.info(f"🧠 Detected profile: {profile}")
+
+    # 2. Extract KDBG from KdVersionBlock line
+    match_kdbg = re.search(r"KdVersionBlock\s+(0x[0-9a-fA-F]+)", output)
+    if match_kdbg:
+        kdbg = match_kdbg.group(1)
+        logging.info(f"🎯 Detected KDBG offset: {kdbg}")
+
+    return profile, kdbg
+
+
+def detect_profile_and_kdbg(memfile, vol_path, symbol_dir=None):
     """Parses text output of `windows.info` plugin to extract profile and KDBG offset."""
-    cmd = [vol_path, "-f", memfile, "windows.info"]
+    cmd = [vol_path] + (["-s", symbol_dir] if symbol_dir else []) + ["-f", memfile, "windows.info"]
     logging.info(f"📌 Detecting profile/KDBG: {' '.join(cmd)}")
 
     try:
-        process = Popen(cmd, stdout=PIPE, stderr=PIPE)
-        stdout, stderr = process.communicate()
+        with tracing.span("profile detect (windows.info)"):
+            process = Popen(cmd, stdout=PIPE, stderr=PIPE)
+            stdout, stderr = process.communicate()
 
         if process.returncode != 0:
             logging.error("❌ windows.info failed")
@@ -251,91 +297,126 @@ def detect_profile_and_kdbg(memfile, vol_path):
 
         # Log raw output for debugging/investigation
         logging.debug("ℹ️ windows.info output:\n" + output)
-
-        profile = None
-        kdbg = None
-
-        # 1. Extract profile from "Symbols" line
-        match_profile = re.search(r"Symbols\s+(.*)", output)
-        if match_profile:
-            symbol_path = match_profile.group(1).strip()
-            # Extract profile: filename before first '/' in the pdb path
-            profile_match = re.search(r"windows/([\w\.]+)/", symbol_path)
-            if profile_match:
-                profile = profile_match.group(1)
-                logging.info(f"🧠 Detected profile: {profile}")
-
-        # 2. Extract KDBG from KdVersionBlock line
-        match_kdbg = re.search(r"KdVersionBlock\s+(0x[0-9a-fA-F]+)", output)
-        if match_kdbg:
-            kdbg = match_kdbg.group(1)
-            logging.info(f"🎯 Detected KDBG offset: {kdbg}")
-
-        return profile, kdbg
+        return parse_windows_info(output)
     except Exception as e:
         logging.exception(f"❌ Exception during profile/KDBG detection: {e}")
         return None, None
 
 
 
-def download_and_extract_symbols(destination="/opt/volatility3/symbols"):
-    """Download all available OS symbols (Windows, macOS, Linux)."""
-    SYMBOL_URLS = {
-        "windows": "https://downloads.volatilityfoundation.org/volatility3/symbols/windows.zip",
-        "mac": "https://downloads.volatilityfoundation.org/volatility3/symbols/mac.zip",
-        "linux": "https://downloads.volatilityfoundation.org/volatility3/symbols/linux.zip",
-    }
-
-    os.makedirs(destination, exist_ok=True)
-
-    for os_name, url in SYMBOL_URLS.items():
-        zip_path = os.path.join(destination, f"{os_name}.zip")
+CONFIG_DIR = "autovol.Config"
+CONFIG_SOURCE = "source.json"
+# Cheap plugins that take the `kernel` module requirement modern plugins share, so their saved config resolves it
+CONFIG_PLUGINS = {
+    "windows": "windows.info.Info",
+    "linux": "linux.pslist.PsList",
+    "mac": "mac.pslist.PsList",
+}
 
-        # Only if not present
-        if any(fname.startswith(os_name) for fname in os.listdir(destination)):
-            logging.info(f"✅ {os_name.capitalize()} symbols already extracted.")
-            continue
 
-        try:
-            logging.info(f"⬇️ Downloading {os_name} symbols...")
-            response = requests.get(url, stream=True)
-            response.raise_for_status()
-            with open(zip_path, "wb") as f:
-                for chunk in response.iter_content(8192):
-                    f.write(chunk)
+def handoff_config(saved):
+    """Reduces a --save-config dump to the kernel module, plus its layer as `primary` for layer-only plugins.
 
-            logging.info(f"📦 Extracting {os_name} symbols...")
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(destination)
+    `vol -c` splices the file in at plugins.<Plugin>, so these keys satisfy a
+    plugin's `kernel` (or `primary`) requirement without any automagic.
+    """
+    config = {key: value for key, value in saved.items() if key.startswith("kernel.")}
+    for key, value in saved.items():
+        if key.startswith("kernel.layer_name."):
+            config["primary." + key[len("kernel.layer_name."):]] = value
+    return config
 
-            os.remove(zip_path)
-            logging.info(f"✅ {os_name} symbols ready.")
-        except Exception as e:
-            logging.warning(f"⚠️ Failed to download {os_name} symbols: {e}")
 
-def list_json_capable_plugins(vol_path):
-    """Lists available plugins that support --output json."""
-    cmd = [vol_path, "--info"]
-    try:
+def _save_config(memfile, vol_path, config_dir, plugin, symbol_dir=None):
+    """Runs `plugin` with --save-config and returns its hand-off keys, or None if the kernel wasn't resolved."""
+    saved_path = os.path.join(config_dir, f"{plugin}.saved.json")
+    if os.path.exists(saved_path):
+        os.remove(saved_path)  # vol.py refuses to overwrite it
+    cmd = [vol_path] + (["-s", symbol_dir] if symbol_dir else []) + \
+        ["--save-config", saved_path, "-f", memfile, plugin]
+    logging.info(f"📌 Resolving layer/symbol configuration: {' '.join(cmd)}")
+    with tracing.span("config handoff", plugin=plugin):
         process = Popen(cmd, stdout=PIPE, stderr=PIPE)
         stdout, stderr = process.communicate()
-        output = stdout.decode(errors='ignore')
 
-        plugin_support_map = {}
+    with open(os.path.join(config_dir, f"{plugin}.txt"), "w", encoding="utf-8") as f:
+        f.write(stdout.decode(errors='replace'))
+    if process.returncode != 0 or not os.path.exists(saved_path):
+        logging.debug(f"{plugin} could not resolve the kernel: {stderr.decode(errors='ignore')}")
+        return None
+    with open(saved_path, "r", encoding="utf-8") as f:
+        config = handoff_config(json.load(f))
+    return config if "kernel.symbol_table_name.isf_url" in config else None
 
-        cur_plugin = None
-        for line in output.splitlines():
-            line = line.strip()
-            if line.startswith("Plugin:"):
-                cur_plugin = line.split(":", 1)[1].strip()
-                plugin_support_map[cur_plugin] = []
-            elif line.startswith("Supported Output Formats:") and cur_plugin:
-                formats = [fmt.strip() for fmt in line.split(":")[1].split(",")]
-                plugin_support_map[cur_plugin] = formats
 
-        json_plugins = [name for name, formats in plugin_support_map.items() if "JSON" in (fmt.upper() for fmt in formats)]
-        return json_plugins
+def write_volatility_config(memfile, vol_path, output_dir, symbol_dir=None, os_name=None, fingerprint=None):
+    """Resolves the kernel once and returns the path of a config.json for every plugin's `-c`.
 
+    An existing config is reused only if it was written for the same image
+    (by fingerprint) and, when the OS is known, the same OS.
+    """
+    config_dir = os.path.join(output_dir, CONFIG_DIR)
+    config_path = os.path.join(config_dir, "config.json")
+    source_path = os.path.join(config_dir, CONFIG_SOURCE)
+
+    try:
+        with open(source_path, "r", encoding="utf-8") as f:
+            source = json.load(f)
+    except (OSError, ValueError):
+        source = {}
+    if (fingerprint and source.get("fingerprint") == fingerprint and os_name in (None, source.get("os"))
+            and os.path.exists(config_path)):
+        logging.info(f"♻️ Reusing Volatility config: {config_path}")
+        return config_path
+
+    os.makedirs(config_dir, exist_ok=True)
+    candidates = [os_name] if os_name in CONFIG_PLUGINS else list(CONFIG_PLUGINS)
+    try:
+        for candidate in candidates:
+            config = _save_config(memfile, vol_path, config_dir, CONFIG_PLUGINS[candidate], symbol_dir)
+            if config is None:
+                continue
+            with open(config_path, "w", encoding="utf-8") as f:
+                json.dump(config, f, indent=2, sort_keys=True)
+            with open(source_path, "w", encoding="utf-8") as f:
+                json.dump({"fingerprint": fingerprint, "os": candidate, "plugin": CONFIG_PLUGINS[candidate]}, f)
+            logging.info(f"🧾 Volatility config for the {candidate} kernel written to {config_path}")
+            return config_path
     except Exception as e:
-        logging.exception("❌ Failed to fetch plugin output support list.")
+        logging.exception(f"❌ Exception while writing Volatility config: {e}")
+        return None
+
+    logging.error("❌ Could not resolve the kernel for the config hand-off; plugins will run their own automagic")
+    return None
+
+
+def config_profile_and_kdbg(output_dir):
+    """Profile and KDBG offset from the pre-flight windows.info output, without another pass over the image."""
+    config_dir = os.path.join(output_dir, CONFIG_DIR)
+    try:
+        with open(os.path.join(config_dir, CONFIG_SOURCE), "r", encoding="utf-8") as f:
+            plugin = json.load(f).get("plugin")
+        if plugin != CONFIG_PLUGINS["windows"]:
+            return None, None
+        with open(os.path.join(config_dir, f"{plugin}.txt"), "r", encoding="utf-8") as f:
+            return parse_windows_info(f.read())
+    except (OSError, ValueError):
+        return None, None
+
+
+def download_and_extract_symbols(destination="/opt/volatility3/symbols", base_url=None, connections=8):
+    """Download all available OS symbols (Windows, macOS, Linux).
+
+    base_url (or $AUTOVOL_SYMBOLS_URL) points at a mirror holding windows.zip,
+    mac.zip and linux.zip. See symbols.download_symbols.
+    """
+    base_url = base_url or os.environ.get("AUTOVOL_SYMBOLS_URL") or SYMBOL_BASE_URL
+    with tracing.span("symbol download"):
+        return download_symbols(destination, base_url, connections=connections)
+
+def list_json_capable_plugins(vol_path):
+    """Lists available plugins that support JSON output."""
+    index = CapabilityIndex.load(vol_path)
+    if not index.renderer_for("json"):
         return []
+    return sorted(name for name in index.plugins if index.is_available(name))